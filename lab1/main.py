@@ -1,27 +1,257 @@
 import pygame
 import math
-import random
-import tkinter as tk
-from tkinter import simpledialog
+import numpy as np
 
-def run_animation(max_circles, growth_speed):
+MAX_RADIUS = 500
+
+
+class CircleField:
+    # Кола як структура масивів: радіуси, швидкості і кольори лежать у заздалегідь виділених
+    # масивах. Живі кола - це зріз [start, stop), відсортований за спаданням радіуса, тобто
+    # у порядку малювання (більші спершу). Тоді кола з radius > MAX_RADIUS завжди на початку
+    # зрізу, і відсікання - це лише зсув start
+    def __init__(self, capacity, max_radius=MAX_RADIUS, seed=None):
+        self.capacity = capacity
+        self.max_radius = max_radius
+        size = 2 * capacity          # запас, щоб ущільнення масивів було рідкісним
+        self.radius = np.zeros(size)
+        self.speed = np.zeros(size)
+        self.color = np.zeros((size, 3), dtype=np.uint8)
+        self.start = self.stop = 0
+        self._unsorted = False
+        self._flags = np.empty(size, dtype=bool)
+        self._rng = np.random.default_rng(seed)
+
+    def __len__(self):
+        return self.stop - self.start
+
+    def spawn(self, count, radius, speed):
+        # Додає до count нових кіл випадкового кольору, не перевищуючи capacity
+        count = min(count, self.capacity - len(self))
+        if count <= 0:
+            return 0
+        if self.stop + count > len(self.radius):
+            self._compact()
+        s, e = self.stop, self.stop + count
+        self.radius[s:e] = radius
+        self.speed[s:e] = speed
+        self.color[s:e] = self._rng.integers(50, 256, size=(count, 3), dtype=np.uint8)
+        self.stop = e
+        self._unsorted = True
+        return count
+
+    def step(self, pulsation):
+        # Один кадр: ріст, упорядкування для малювання, відсікання завеликих кіл
+        s, e = self.start, self.stop
+        n = e - s
+        if n == 0:
+            return
+        r = self.radius[s:e]
+        r += self.speed[s:e]
+        r += pulsation
+        self._unsorted = True
+        self._order()
+        self.start += np.count_nonzero(np.greater(r, self.max_radius, out=self._flags[:n]))
+
+    def _order(self):
+        # Перевпорядкування потрібне, лише якщо порядок порушився (різні швидкості чи нові кола)
+        s, e = self.start, self.stop
+        n = e - s
+        r = self.radius[s:e]
+        if self._unsorted and n > 1 and np.less(r[:-1], r[1:], out=self._flags[:n - 1]).any():
+            self._sort()
+        self._unsorted = False
+
+    def _sort(self):
+        s, e = self.start, self.stop
+        order = np.argsort(-self.radius[s:e], kind="stable")
+        for a in (self.radius, self.speed, self.color):
+            a[s:e] = a[s:e][order]
+
+    def _compact(self):
+        n = len(self)
+        for a in (self.radius, self.speed, self.color):
+            a[:n] = a[self.start:self.stop]
+        self.start, self.stop = 0, n
+
+    def arrays(self):
+        # Подання живих кіл (radius, color) у порядку малювання
+        self._order()
+        return self.radius[self.start:self.stop], self.color[self.start:self.stop]
+
+
+class RingRenderer:
+    # Малює всі концентричні кільця за один прохід по пікселях. Для кожного пікселя наперед
+    # обчислено кошик відстані до центру; за кадр будується таблиця "кошик -> колір верхнього
+    # кільця" (пошуком серед відсортованих радіусів), і кадр - це вибірка з цієї таблиці.
+    # Вартість кадру майже не залежить від кількості кілець
+    OVERSAMPLE = 16                  # кошиків на піксель відстані
+
+    def __init__(self, size, center, line_width):
+        width, height = size
+        self.line_width = line_width
+        # Відстань від центру пікселя, як у растеризації pygame
+        x = np.arange(width)[:, None] + 0.5 - center[0]
+        y = np.arange(height)[None, :] + 0.5 - center[1]
+        dist = np.sqrt(x * x + y * y)
+        # Розкладка (width, height), як у pygame.surfarray
+        self.bins = (dist * self.OVERSAMPLE).astype(np.int32)
+        nbins = int(self.bins.max()) + 1
+        self.bin_dist = (np.arange(nbins) + 0.5) / self.OVERSAMPLE
+        self.lut = np.zeros((nbins, 3), dtype=np.uint8)
+        self.frame = np.zeros((width, height, 3), dtype=np.uint8)
+        self._whole = np.empty(0)
+
+    def draw(self, screen, field):
+        radius, color = field.arrays()
+        n = len(radius)
+        self.lut[:] = 0
+        if n:
+            if len(self._whole) < len(field.radius):
+                self._whole = np.empty(len(field.radius))
+            # Кільце радіуса R = int(r) товщини w покриває R - w - 0.1 < d <= R - 0.2. pygame.draw.circle
+            # малює кільце за Брезенхемом, і його межі - не пороги відстані; ці пороги найближчі
+            # до нього, але близько 6% освітлених пікселів кадру розходяться на піксель по краях кілець
+            whole = np.floor(radius, out=self._whole[:n])
+            ascending = whole[::-1]
+            # Найменше кільце, що дістає до d, малюється останнім, тож воно зверху
+            idx = np.searchsorted(ascending, self.bin_dist + 0.2)
+            top = np.minimum(idx, n - 1)
+            covered = (idx < n) & (ascending[top] - self.line_width - 0.1 < self.bin_dist)
+            self.lut[covered] = color[n - 1 - top[covered]]
+        np.take(self.lut, self.bins, axis=0, out=self.frame)
+        pygame.surfarray.blit_array(screen, self.frame)
+
+
+class PaletteRings:
+    # Режим циклічної палітри: 8-бітне зображення будується один раз, піксель на відстані d
+    # від центру має індекс радіальної смуги 1 + floor(d / band_width), 0 - фон за MAX_RADIUS.
+    # Кільце - це колір смуги в палітрі, тож рух кілець назовні - лише поворот палітри,
+    # а вартість кадру стала і не залежить від кількості кілець.
+    # Кольори смуг зберігаються у "світових" координатах (bands), екранна смуга b показує
+    # bands[(b - shift) % len(bands)], де shift - накопичений зсув у смугах. Під центром є ще
+    # hidden невидимих смуг: кільця, які пульсація занесла в від'ємний радіус, не гасяться,
+    # а повертаються, коли пульсація змінить напрям, як і в CircleField
+    NBANDS = 255
+
+    def __init__(self, size, center, line_width, max_circles, max_radius=MAX_RADIUS, min_radius=0.0, seed=None):
+        width, height = size
+        self.max_circles = max_circles
+        self.band_width = max_radius / self.NBANDS
+        # Кільце товщини w займає найближчу цілу кількість смуг, що закінчуються на R
+        self.thickness = max(1, round(line_width / self.band_width))
+        x = np.arange(width)[:, None] + 0.5 - center[0]
+        y = np.arange(height)[None, :] + 0.5 - center[1]
+        band = (np.sqrt(x * x + y * y) / self.band_width).astype(np.int32)
+        index = np.where(band < self.NBANDS, band + 1, 0).astype(np.uint8)
+        self.image = pygame.Surface(size, depth=8)
+        pygame.surfarray.blit_array(self.image, index)
+
+        # Невидимі смуги для радіусів від min_radius до 0
+        self.hidden = max(0, math.ceil(-min_radius / self.band_width))
+        self.bands = np.zeros((self.NBANDS + self.hidden, 3), dtype=np.uint8)
+        self.alive = np.zeros(self.NBANDS + self.hidden, dtype=bool)     # смуга, де лежить радіус кільця
+        self.palette = np.zeros((self.NBANDS + 1, 3), dtype=np.uint8)
+        self.speed = 0.0
+        self.offset = 0.0
+        self.shift = 0
+        self._screen_bands = np.arange(self.NBANDS)
+        self._world = np.empty(self.NBANDS, dtype=np.intp)
+        self._rng = np.random.default_rng(seed)
+
+    def __len__(self):
+        return int(np.count_nonzero(self.alive))
+
+    def _to_world(self, screen_band):
+        return (screen_band - self.shift) % len(self.bands)
+
+    def spawn(self, count, radius, speed):
+        # Усі кільця рухаються разом із палітрою, тож швидкість спільна, а кілька нових
+        # кілець в одній смузі збігаються в одне
+        if count <= 0 or len(self) >= self.max_circles:
+            return 0
+        self.speed = speed
+        top = int(radius / self.band_width)
+        world = self._to_world(np.arange(top - self.thickness + 1, top + 1))
+        self.bands[world] = self._rng.integers(50, 256, size=3, dtype=np.uint8)
+        self.alive[world[-1]] = True
+        return 1
+
+    def step(self, pulsation):
+        # Зсув усіх кілець на speed + pulsation пікселів; кільця, що вийшли за MAX_RADIUS
+        # або опустилися нижче за min_radius, гасяться, інакше по колу потрапили б на інший край
+        self.offset += (self.speed + pulsation) / self.band_width
+        shift = math.floor(self.offset)
+        moved, self.shift = shift - self.shift, shift
+        n = min(abs(moved), len(self.bands))
+        if moved > 0:
+            cleared = self._to_world(np.arange(-self.hidden, n - self.hidden))
+        elif moved < 0:
+            cleared = self._to_world(np.arange(self.NBANDS - n, self.NBANDS))
+        else:
+            return
+        self.bands[cleared] = 0
+        self.alive[cleared] = False
+
+    def draw(self, screen):
+        np.subtract(self._screen_bands, self.shift, out=self._world)
+        np.mod(self._world, len(self.bands), out=self._world)
+        np.take(self.bands, self._world, axis=0, out=self.palette[1:])
+        self.image.set_palette(self.palette)
+        screen.blit(self.image, (0, 0))
+
+
+class RingAnimation:
+    # Стан анімації з фіксованим кроком: один виклик step() - один кадр (time += DT), нові
+    # кола з'являються щоп'ятий кадр за лічильником, а не за годинником, тож з тим самим seed
+    # послідовність кадрів однакова за будь-якої швидкості рендерингу
+    DT = 0.05
+    SPAWN_EVERY = 5
+    LINE_WIDTH = 2
+    PULSATION_AMPLITUDE = 5
+
+    def __init__(self, size, max_circles, growth_speed, spawn_per_frame=None, palette=False, seed=None):
+        # spawn_per_frame - скільки кіл додавати щокадру (для навантажувального тесту)
+        center = (size[0] // 2, size[1] // 2)
+        self.growth_speed = growth_speed
+        self.spawn_per_frame = spawn_per_frame
+        self.palette = palette
+        if palette:
+            # Найглибше, куди пульсація заносить кільце: розмах її накопиченого зсуву 2 * A / DT
+            min_radius = -2 * self.PULSATION_AMPLITUDE / self.DT
+            self.field = PaletteRings(size, center, self.LINE_WIDTH, max_circles, min_radius=min_radius, seed=seed)
+        else:
+            self.field = CircleField(max_circles, seed=seed)
+            self.renderer = RingRenderer(size, center, self.LINE_WIDTH)
+        self.time = 0.0
+        self.frame = 0
+
+    def step(self):
+        self.time += self.DT
+        # Пульсація однакова для всіх кіл, тож рахується раз за кадр
+        self.field.step(self.PULSATION_AMPLITUDE * math.sin(self.time))
+        if self.spawn_per_frame:
+            self.field.spawn(self.spawn_per_frame, 10, self.growth_speed)
+        elif self.frame % self.SPAWN_EVERY == 0:
+            self.field.spawn(1, 10, self.growth_speed)
+        self.frame += 1
+
+    def draw(self, screen):
+        if self.palette:
+            self.field.draw(screen)
+        else:
+            self.renderer.draw(screen, self.field)
+
+
+def run_animation(max_circles, growth_speed, spawn_per_frame=None, palette=False, seed=None):
+    # palette=True - режим циклічної палітри (PaletteRings) для слабких машин
     pygame.init()
     WIDTH, HEIGHT = 800, 600
     screen = pygame.display.set_mode((WIDTH, HEIGHT))
     pygame.display.set_caption("Анімація концентричних кіл")
     clock = pygame.time.Clock()
-    CENTER = (WIDTH // 2, HEIGHT // 2)
-
-    circles = []
-    time = 0
-    line_width = 2  
-    pulsation_amplitude = 5  
 
-    def add_circle():
-        if len(circles) < max_circles:
-            new_radius = 10
-            new_color = (random.randint(50, 255), random.randint(50, 255), random.randint(50, 255))
-            circles.append([new_radius, new_color, growth_speed])
+    animation = RingAnimation((WIDTH, HEIGHT), max_circles, growth_speed, spawn_per_frame, palette, seed)
 
     running = True
     while running:
@@ -29,36 +259,42 @@ def run_animation(max_circles, growth_speed):
             if event.type == pygame.QUIT:
                 running = False
 
-        screen.fill((0, 0, 0))
-        time += 0.05
-        new_circles = []
-
-        for circle in sorted(circles, key=lambda c: c[0], reverse=True):
-            radius, color, speed = circle
-            pulsation = pulsation_amplitude * math.sin(time)
-            radius += speed + pulsation
-
-            if radius > 500:
-                continue
-
-            pygame.draw.circle(screen, color, CENTER, int(radius), line_width)
-            new_circles.append([radius, color, speed])
-
-        circles = new_circles
-
-        if pygame.time.get_ticks() % 5 == 0:
-            add_circle()
+        animation.step()
+        animation.draw(screen)
 
         pygame.display.flip()
         clock.tick(60)
+        if animation.frame % 60 == 0:
+            pygame.display.set_caption(f"Анімація концентричних кіл - {len(animation.field)} кіл, "
+                                       f"{clock.get_fps():.0f} FPS")
 
     pygame.quit()
 
 
-root = tk.Tk()
-root.withdraw()  
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Анімація концентричних кіл")
+    parser.add_argument("--palette", action="store_true", help="режим циклічної палітри")
+    parser.add_argument("--max-circles", type=int, help="без діалогу; для навантажувального тесту - десятки тисяч")
+    parser.add_argument("--growth-speed", type=float)
+    parser.add_argument("--spawn-per-frame", type=int, help="скільки кіл додавати щокадру замість одного раз на 5 кадрів")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    # Параметри, не задані в командному рядку, питаються діалогом
+    if args.max_circles is None or args.growth_speed is None:
+        import tkinter as tk
+        from tkinter import simpledialog
 
-max_circles = simpledialog.askinteger("Параметр", "Введіть кількість кіл:", minvalue=1, maxvalue=50)
-growth_speed = simpledialog.askfloat("Параметр", "Швидкість росту кіл:", minvalue=0.1, maxvalue=10.0)
+        root = tk.Tk()
+        root.withdraw()
+        if args.max_circles is None:
+            args.max_circles = simpledialog.askinteger("Параметр", "Введіть кількість кіл:",
+                                                       minvalue=1, maxvalue=100000)
+        if args.growth_speed is None:
+            args.growth_speed = simpledialog.askfloat("Параметр", "Швидкість росту кіл:",
+                                                      minvalue=0.1, maxvalue=10.0)
+        root.destroy()
 
-run_animation(max_circles, growth_speed)
+    run_animation(args.max_circles, args.growth_speed, args.spawn_per_frame, args.palette, args.seed)
@@ -0,0 +1,250 @@
+import os
+import numpy as np
+
+# ---- Завантаження каркасних моделей ----
+# OBJ, OFF і PLY (ascii та binary) читаються у компактні масиви: вершини (V, 3) float64 і
+# унікальні ребра (E, 2) int32 з i < j. Грані довільної довжини подаються плоским масивом
+# індексів flat разом із counts (кількість вершин кожної грані), ребра граней виділяються
+# векторно, без списків Python на кожне ребро
+
+PLY_TYPES = {
+    "char": "i1", "int8": "i1", "uchar": "u1", "uint8": "u1",
+    "short": "i2", "int16": "i2", "ushort": "u2", "uint16": "u2",
+    "int": "i4", "int32": "i4", "uint": "u4", "uint32": "u4",
+    "float": "f4", "float32": "f4", "double": "f8", "float64": "f8",
+}
+PLY_FORMATS = {"ascii": None, "binary_little_endian": "<", "binary_big_endian": ">"}
+
+
+def polygon_edges(flat, counts, closed=True):
+    # Ребра між сусідніми вершинами кожного многокутника (для closed - і від останньої до першої)
+    flat = np.asarray(flat, dtype=np.int64)
+    counts = np.asarray(counts, dtype=np.int64)
+    counts = counts[counts > 0]
+    ends = np.cumsum(counts)
+    starts = ends - counts
+    nxt = np.arange(1, len(flat) + 1)
+    nxt[ends - 1] = starts
+    a, b = flat, flat[nxt]
+    if not closed:
+        keep = np.ones(len(flat), dtype=bool)
+        keep[ends - 1] = False
+        a, b = a[keep], b[keep]
+    return np.stack((a, b), axis=1)
+
+
+def unique_edges(pairs, vertex_count):
+    # Унікальні неорієнтовані ребра (E, 2) int32, вироджені (i, i) відкидаються
+    pairs = np.asarray(pairs, dtype=np.int64).reshape(-1, 2)
+    if len(pairs) and (pairs.min() < 0 or pairs.max() >= vertex_count):
+        raise ValueError("Індекс вершини поза межами моделі")
+    lo, hi = pairs.min(axis=1), pairs.max(axis=1)
+    key = np.unique((lo * vertex_count + hi)[lo != hi])
+    return np.stack((key // vertex_count, key % vertex_count), axis=1).astype(np.int32)
+
+
+def normalize(vertices):
+    # Центр рамки в початок координат, найбільший розмір - 1 (як у вбудованих фігур)
+    lo, hi = vertices.min(axis=0), vertices.max(axis=0)
+    extent = (hi - lo).max()
+    vertices = vertices - (lo + hi) / 2
+    if extent > 0:
+        vertices /= extent
+    return vertices
+
+
+# ---- OBJ ----
+def load_obj(path):
+    vertices, flat, counts, lines = [], [], [], []
+    with open(path, encoding="utf-8", errors="replace") as f:
+        for line in f:
+            words = line.split()
+            if not words:
+                continue
+            if words[0] == "v":
+                vertices.append([float(x) for x in words[1:4]])
+            elif words[0] in ("f", "l"):
+                # "i", "i/t", "i//n", "i/t/n"; від'ємні індекси - відносно кінця списку вершин
+                index = [int(w.split("/")[0]) for w in words[1:]]
+                index = [i - 1 if i > 0 else len(vertices) + i for i in index]
+                if words[0] == "f":
+                    flat.extend(index)
+                    counts.append(len(index))
+                else:
+                    lines.extend(zip(index[:-1], index[1:]))
+    vertices = np.array(vertices, dtype=float).reshape(-1, 3)
+    pairs = np.concatenate((polygon_edges(flat, counts), np.array(lines, dtype=np.int64).reshape(-1, 2)))
+    return vertices, unique_edges(pairs, len(vertices))
+
+
+# ---- OFF ----
+def load_off(path):
+    with open(path, encoding="utf-8", errors="replace") as f:
+        rows = [r for r in (line.split("#")[0].split() for line in f) if r]
+    if not rows or not rows[0][0].endswith("OFF"):
+        raise ValueError("Файл OFF має починатися з OFF")
+    # Кількості можуть стояти в рядку заголовка або в наступному
+    header = rows[0][1:] or rows[1]
+    body = rows[1:] if rows[0][1:] else rows[2:]
+    nv, nf = int(header[0]), int(header[1])
+    # Зайві числа в рядках (кольори, нормалі COFF/NOFF) ігноруються
+    vertices = np.array([r[:3] for r in body[:nv]], dtype=float).reshape(-1, 3)
+    counts = [int(r[0]) for r in body[nv:nv + nf]]
+    flat = [int(i) for r, n in zip(body[nv:nv + nf], counts) for i in r[1:n + 1]]
+    return vertices, unique_edges(polygon_edges(flat, counts), len(vertices))
+
+
+# ---- PLY ----
+def read_ply_header(f):
+    # (формат, [(назва, кількість, [(назва, тип або (тип кількості, тип індексу))])])
+    if f.readline().strip() != b"ply":
+        raise ValueError("Файл PLY має починатися з ply")
+    fmt, elements = None, []
+    while True:
+        line = f.readline()
+        if not line:
+            raise ValueError("PLY без end_header")
+        words = line.decode("ascii").split()
+        if not words or words[0] in ("comment", "obj_info"):
+            continue
+        if words[0] == "format":
+            fmt = words[1]
+        elif words[0] == "element":
+            elements.append((words[1], int(words[2]), []))
+        elif words[0] == "property" and words[1] == "list":
+            elements[-1][2].append((words[4], (PLY_TYPES[words[2]], PLY_TYPES[words[3]])))
+        elif words[0] == "property":
+            elements[-1][2].append((words[2], PLY_TYPES[words[1]]))
+        elif words[0] == "end_header":
+            break
+    if fmt not in PLY_FORMATS:
+        raise ValueError(f"Невідомий формат PLY {fmt!r}")
+    return fmt, elements
+
+
+def _ply_binary_element(data, offset, count, props, order):
+    # Елемент зі списками: {назва: масив} для скалярних властивостей і {назва: (flat, counts)}
+    # для списків, та новий offset. Властивості читаються в порядку заголовка, тож скаляри
+    # (колір, прапорці) можуть стояти до списку індексів або після нього
+    lists = [name for name, t in props if isinstance(t, tuple)]
+    if count == 0:
+        return {name: (np.empty(0, np.int64), np.empty(0, np.int64)) if isinstance(t, tuple) else np.empty(0)
+                for name, t in props}, offset
+    # Найчастіше всі записи однакові (трикутники), тоді весь блок читається одним структурованим
+    # dtype з довжинами списків першого запису
+    fields, pos = [], offset
+    for name, t in props:
+        if isinstance(t, tuple):
+            ctype, itype = np.dtype(order + t[0]), np.dtype(order + t[1])
+            n = int(np.frombuffer(data, ctype, 1, pos)[0])
+            fields += [(name + "/count", ctype), (name, itype, (n,))]
+            pos += ctype.itemsize + n * itype.itemsize
+        else:
+            fields.append((name, order + t))
+            pos += np.dtype(order + t).itemsize
+    uniform = np.dtype(fields)
+    if offset + count * uniform.itemsize <= len(data):
+        rec = np.frombuffer(data, uniform, count, offset)
+        if all((rec[name + "/count"] == uniform[name].shape[0]).all() for name in lists):
+            result = {name: rec[name] for name, t in props}
+            for name in lists:
+                result[name] = (rec[name].reshape(-1), rec[name + "/count"])
+            return result, offset + count * uniform.itemsize
+    # Інакше - запис за записом
+    columns = {name: [] for name, t in props}
+    counts = {name: np.empty(count, np.int64) for name in lists}
+    types = {name: ([np.dtype(order + x) for x in t] if isinstance(t, tuple) else np.dtype(order + t))
+             for name, t in props}
+    for k in range(count):
+        for name, t in props:
+            if name in counts:
+                ctype, itype = types[name]
+                n = counts[name][k] = int(np.frombuffer(data, ctype, 1, offset)[0])
+                offset += ctype.itemsize
+                columns[name].append(np.frombuffer(data, itype, n, offset))
+                offset += n * itype.itemsize
+            else:
+                columns[name].append(np.frombuffer(data, types[name], 1, offset))
+                offset += types[name].itemsize
+    result = {name: np.concatenate(columns[name]) for name, t in props}
+    for name in lists:
+        result[name] = (result[name], counts[name])
+    return result, offset
+
+
+def _ply_ascii_element(tokens, pos, count, props):
+    # Те саме для ascii: рядок - значення властивостей у порядку заголовка, список - кількість і значення
+    columns = {name: [] for name, t in props}
+    counts = {name: np.empty(count, np.int64) for name, t in props if isinstance(t, tuple)}
+    for k in range(count):
+        for name, t in props:
+            if name in counts:
+                n = counts[name][k] = int(tokens[pos])
+                columns[name] += tokens[pos + 1:pos + 1 + n]
+                pos += n + 1
+            else:
+                columns[name].append(tokens[pos])
+                pos += 1
+    rec = {name: np.array(columns[name], dtype=float) for name in columns if name not in counts}
+    for name, t in props:
+        if name in counts:
+            # Цілі списки (індекси) - int64, решта (texcoord) - float
+            dtype = np.int64 if np.dtype(t[1]).kind in "iu" else float
+            rec[name] = (np.array(columns[name], dtype=dtype), counts[name])
+    return rec, pos
+
+
+def load_ply(path):
+    with open(path, "rb") as f:
+        fmt, elements = read_ply_header(f)
+        data = f.read()
+    order = PLY_FORMATS[fmt]
+    vertices, flat, counts, pairs = None, [], [], []
+    if order is None:
+        tokens, pos = data.split(), 0
+    else:
+        offset = 0
+    for name, count, props in elements:
+        lists = [p[0] for p in props if isinstance(p[1], tuple)]
+        if order is None:
+            if not lists:
+                values = np.array(tokens[pos:pos + count * len(props)], dtype=float).reshape(count, len(props))
+                pos += count * len(props)
+                rec = {p[0]: values[:, k] for k, p in enumerate(props)}
+            else:
+                rec, pos = _ply_ascii_element(tokens, pos, count, props)
+        else:
+            if not lists:
+                dtype = np.dtype([(p[0], order + p[1]) for p in props])
+                rec = np.frombuffer(data, dtype, count, offset)
+                offset += count * dtype.itemsize
+            else:
+                rec, offset = _ply_binary_element(data, offset, count, props, order)
+        if name == "vertex":
+            vertices = np.stack([np.asarray(rec[axis], dtype=float) for axis in "xyz"], axis=1)
+        elif name == "face" and lists:
+            # Індекси вершин - vertex_indices (або vertex_index), інші списки (texcoord) пропускаються
+            key = next((k for k in ("vertex_indices", "vertex_index") if k in lists), lists[0])
+            flat_k, counts_k = rec[key]
+            flat.append(flat_k)
+            counts.append(counts_k)
+        elif name == "edge" and {"vertex1", "vertex2"} <= set(p[0] for p in props):
+            pairs.append(np.stack((rec["vertex1"], rec["vertex2"]), axis=1))
+    if vertices is None:
+        raise ValueError("PLY без елемента vertex")
+    if flat:
+        pairs.append(polygon_edges(np.concatenate(flat), np.concatenate(counts)))
+    pairs = np.concatenate(pairs) if pairs else np.empty((0, 2), np.int64)
+    return vertices, unique_edges(pairs, len(vertices))
+
+
+LOADERS = {".obj": load_obj, ".off": load_off, ".ply": load_ply}
+
+
+def load_mesh(path, fit=True):
+    # (вершини (V, 3), ребра (E, 2) int32); fit - вписати модель у куб зі стороною 1
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in LOADERS:
+        raise ValueError(f"Невідомий формат {ext!r}, очікується один з {tuple(LOADERS)}")
+    vertices, edges = LOADERS[ext](path)
+    return (normalize(vertices) if fit and len(vertices) else vertices), edges
@@ -0,0 +1,93 @@
+import os
+
+# Без дисплея і звуку: драйвери SDL мають бути задані до ініціалізації pygame
+os.environ["SDL_VIDEODRIVER"] = "dummy"
+os.environ["SDL_AUDIODRIVER"] = "dummy"
+
+import argparse
+import sys
+import pygame
+
+from main import RingAnimation
+from tst import InstancedScene, PolyhedronScene
+
+# ---- Детермінований рендеринг без дисплея ----
+# Сцена просувається фіксованим кроком (step() - рівно один кадр) без clock.tick і без
+# годинника pygame, тож кадри рендеряться так швидко, як дозволяє процесор, а з тим самим
+# seed і параметрами результат однаковий побітово. Кадри пишуться послідовністю PNG або
+# сирим потоком RGB24 (наприклад, для ffmpeg -f rawvideo -pix_fmt rgb24 -s 800x600)
+
+SIZE = (800, 600)
+
+
+def render_frames(scene, frames, size=SIZE):
+    # Генератор кадрів: поверхня pygame після кожного кроку сцени
+    pygame.display.init()
+    try:
+        screen = pygame.display.set_mode(size)
+        for _ in range(frames):
+            scene.step()
+            scene.draw(screen)
+            yield screen
+    finally:
+        pygame.display.quit()
+
+
+def write_png(frames, out_dir, prefix="frame"):
+    os.makedirs(out_dir, exist_ok=True)
+    count = 0
+    for index, screen in enumerate(frames):
+        pygame.image.save(screen, os.path.join(out_dir, f"{prefix}_{index:05d}.png"))
+        count += 1
+    return count
+
+
+def write_raw(frames, stream):
+    count = 0
+    for screen in frames:
+        stream.write(pygame.image.tobytes(screen, "RGB"))
+        count += 1
+    stream.flush()
+    return count
+
+
+def make_scene(args):
+    if args.scene == "circles":
+        return RingAnimation(SIZE, args.max_circles, args.growth_speed, args.spawn_per_frame,
+                             palette=args.palette, seed=args.seed)
+    if args.scene == "instances":
+        return InstancedScene.random(args.count, seed=args.seed, size=SIZE)
+    return PolyhedronScene(args.shape, args.angular_speed, args.trajectory_speed, size=SIZE)
+
+
+# ---- Командний рядок ----
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Рендеринг анімацій lab1 у файли без дисплея")
+    parser.add_argument("scene", choices=("circles", "polyhedron", "instances"))
+    parser.add_argument("output", help="каталог для PNG; для --raw - файл або '-' (stdout)")
+    parser.add_argument("--frames", type=int, default=600)
+    parser.add_argument("--raw", action="store_true", help="сирий потік RGB24 замість PNG")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-circles", type=int, default=50)
+    parser.add_argument("--growth-speed", type=float, default=1.0)
+    parser.add_argument("--spawn-per-frame", type=int, help="скільки кіл додавати щокадру (навантажувальний тест)")
+    parser.add_argument("--palette", action="store_true", help="режим циклічної палітри")
+    parser.add_argument("--shape", default="cube", help="cube, tetrahedron, octahedron або файл OBJ/OFF/PLY")
+    parser.add_argument("--angular-speed", type=float, default=0.05)
+    parser.add_argument("--trajectory-speed", type=float, default=0.03)
+    parser.add_argument("--count", type=int, default=5000, help="кількість фігур для instances")
+    args = parser.parse_args(argv)
+
+    frames = render_frames(make_scene(args), args.frames)
+    if not args.raw:
+        count = write_png(frames, args.output)
+    elif args.output == "-":
+        count = write_raw(frames, sys.stdout.buffer)
+    else:
+        with open(args.output, "wb") as stream:
+            count = write_raw(frames, stream)
+    print(f"{count} frames {SIZE[0]}x{SIZE[1]}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
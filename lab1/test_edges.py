@@ -0,0 +1,18 @@
+import numpy as np
+import pygame
+
+from tst import draw_edges
+
+
+# ---- Пакетна растеризація ребер ----
+def test_draw_edges_with_coordinates_near_int32_limits():
+    # Вершини біля площини камери проектуються на межу int32: різниця кінців ребра
+    # не вміщається в int32, а видима частина має лишитись тим самим відрізком
+    screen = pygame.Surface((800, 600))
+    pixels = pygame.surfarray.pixels2d(screen)
+    points = np.array([[-2_000_000_000, 310], [2_000_000_000, 310],
+                       [300, -2_147_483_000], [300, 2_147_483_000]], dtype=np.int32)
+    draw_edges(pixels, points, np.array([[0, 1], [2, 3]]), 1)
+    lit = np.zeros((800, 600), dtype=bool)
+    lit[:, 310] = lit[300, :] = True
+    assert np.array_equal(pixels != 0, lit)
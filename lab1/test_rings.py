@@ -0,0 +1,75 @@
+import numpy as np
+import pygame
+
+from main import PaletteRings, RingAnimation
+
+SIZE = (800, 600)
+CENTER = (400, 300)
+
+
+# ---- Режим циклічної палітри ----
+def test_palette_colors_follow_circles_after_wrap():
+    # З тим самим seed CircleField і PaletteRings отримують однакові кольори, тож кожне видиме
+    # коло має бути намальоване своїм кольором і після того, як зсув палітри обійшов усі смуги.
+    # Кільця, народжені, коли пульсація майже гасить ріст, потрапляють в одну смугу і зливаються -
+    # такі не перевіряються
+    reference = RingAnimation(SIZE, 1000, 1.0, seed=3)
+    animation = RingAnimation(SIZE, 1000, 1.0, palette=True, seed=3)
+    rings = animation.field
+    screen = pygame.Surface(SIZE)
+    for _ in range(900):
+        reference.step()
+        animation.step()
+    assert rings.shift > len(rings.bands)
+
+    animation.draw(screen)
+    index = pygame.surfarray.array2d(rings.image)
+    radius, color = reference.field.arrays()[:2]
+    # Кільця перевіряються вздовж променя вправо від центру
+    reach = SIZE[0] - CENTER[0] - 2 * rings.band_width
+    gap = np.diff(radius[::-1])[::-1]
+    isolated = np.minimum(np.append(np.inf, gap), np.append(gap, np.inf)) > 3 * rings.band_width
+    checked = 0
+    for r, c in zip(radius[isolated], color[isolated]):
+        if not 2 * rings.band_width < r < reach:
+            continue
+        # Квантування радіуса до смуги дає похибку до однієї смуги в будь-який бік
+        band = int(r / rings.band_width)
+        seen = set()
+        for b in (band - 1, band, band + 1):
+            x = np.flatnonzero(index[CENTER[0]:, CENTER[1]] == b + 1)
+            if len(x):
+                seen.add(tuple(screen.get_at((CENTER[0] + int(x[0]), CENTER[1]))[:3]))
+        assert tuple(int(v) for v in c) in seen
+        checked += 1
+    assert checked > 10
+
+
+# ---- Растеризація кілець однією вибіркою ----
+def test_renderer_close_to_pygame_circles():
+    # Межі кілець pygame - не пороги відстані, тож збіг лише з допуском: з порогами
+    # RingRenderer розходиться близько 6% освітлених пікселів кадру
+    animation = RingAnimation(SIZE, 1000, 1.0, seed=1)
+    for _ in range(600):
+        animation.step()
+    screen = pygame.Surface(SIZE)
+    animation.draw(screen)
+    reference = pygame.Surface(SIZE)
+    radius, color = animation.field.arrays()[:2]
+    for r, c in zip(radius, color):
+        pygame.draw.circle(reference, [int(v) for v in c], CENTER, int(r), RingAnimation.LINE_WIDTH)
+    drawn = pygame.surfarray.array2d(screen)
+    expected = pygame.surfarray.array2d(reference)
+    lit = (drawn != 0) | (expected != 0)
+    assert (lit & (drawn != expected)).sum() < 0.07 * lit.sum()
+
+
+def test_palette_keeps_rings_pulsed_below_center():
+    rings = PaletteRings(SIZE, CENTER, 2, 10, min_radius=-100)
+    rings.spawn(1, 10, 0.0)
+    rings.step(-60)
+    assert len(rings) == 1
+    rings.step(60)
+    assert len(rings) == 1
+    rings.step(-200)
+    assert len(rings) == 0
@@ -1,9 +1,8 @@
-import tkinter as tk          # Імпортуємо бібліотеку Tkinter для створення GUI
-from tkinter import ttk       # Імпортуємо ttk (розширені віджети Tkinter)
-import threading              # Імпортуємо threading для запуску pygame у фоні
 import pygame                 # Імпортуємо pygame для візуалізації поліедра
 import numpy as np            # Імпортуємо numpy для роботи з масивами та векторами
 import math                   # Імпортуємо math для математичних функцій
+import sys                    # Імпортуємо sys для аргументів командного рядка
+from mesh import load_mesh    # Завантаження моделей OBJ/OFF/PLY
 
 # ==== Глобальні змінні ====
 current_shape = "cube"        # Поточна фігура (за замовчуванням куб)
@@ -13,6 +12,9 @@ shape_changed = True          # Прапорець, що означає: фіг
 
 
 # ==== Геометрія ====
+SHAPES = ("cube", "tetrahedron", "octahedron")  # Вбудовані фігури
+
+
 def get_vertices(shape):      # Функція повертає координати вершин вибраної фігури
     if shape == 'cube':       # Якщо вибраний куб
         return np.array([[x, y, z] for x in [-0.5, 0.5] 
@@ -37,58 +39,53 @@ def get_vertices(shape):      # Функція повертає координа
         ], dtype=float)
 
 
-def rotate_around_axis(vertices, y0, z0, dphi):  # Функція обертання навколо осі (y0,z0)
-    cos_dphi = math.cos(dphi)    # Косинус кута обертання
-    sin_dphi = math.sin(dphi)    # Синус кута обертання
-    new_vertices = vertices.copy()  # Копія вершин
-    new_vertices[:, 1] -= y0     # Зміщення по осі y
-    new_vertices[:, 2] -= z0     # Зміщення по осі z
-    y_new = new_vertices[:, 1] * cos_dphi - new_vertices[:, 2] * sin_dphi  # Нова координата y
-    z_new = new_vertices[:, 1] * sin_dphi + new_vertices[:, 2] * cos_dphi  # Нова координата z
-    new_vertices[:, 1] = y_new + y0  # Повертаємо зміщення
-    new_vertices[:, 2] = z_new + z0
-    return new_vertices            # Повертаємо обернені вершини
-
-
-def get_edges(shape):              # Функція повертає список ребер для фігури
+def pose_vertices(rest_y, rest_z, angle, ty, tz, out, scratch):
+    # Поза у замкненій формі: поворот навколо x на накопичений кут angle плюс зсув (ty, tz),
+    # записується в out (n, 3) на місці; scratch - допоміжний буфер (n,). Координата x не
+    # змінюється, тож її задають один раз
+    cos_a = math.cos(angle)
+    sin_a = math.sin(angle)
+    y, z = out[:, 1], out[:, 2]
+    np.multiply(rest_y, cos_a, out=y)            # y = y0 cos - z0 sin + ty
+    np.multiply(rest_z, sin_a, out=scratch)
+    y -= scratch
+    y += ty
+    np.multiply(rest_y, sin_a, out=z)            # z = y0 sin + z0 cos + tz
+    np.multiply(rest_z, cos_a, out=scratch)
+    z += scratch
+    z += tz
+    return out
+
+
+def get_edges(shape):              # Функція повертає масив ребер (E, 2) int32 для фігури
     if shape == 'cube':            # Ребра куба
-        return [
+        return np.array([
             [0, 1], [0, 2], [0, 4], [1, 3], [1, 5], [2, 3], [2, 6], [3, 7],
             [4, 5], [4, 6], [5, 7], [6, 7]
-        ]
+        ], dtype=np.int32)
     elif shape == 'tetrahedron':   # Ребра тетраедра
-        return [
+        return np.array([
             [0, 1], [0, 2], [0, 3], [1, 2], [1, 3], [2, 3]
-        ]
+        ], dtype=np.int32)
     elif shape == 'octahedron':    # Ребра октаедра
-        return [
+        return np.array([
             [0, 2], [0, 3], [0, 4], [0, 5],
             [1, 2], [1, 3], [1, 4], [1, 5],
             [2, 4], [2, 5], [3, 4], [3, 5]
-        ]
+        ], dtype=np.int32)
 
 
 def create_trajectory_circle(radius=1.5, segments=64):
-    # Створюємо суцільне коло
-    points = []
-    for i in range(segments):
-        theta = 2 * math.pi * i / segments
-        y = radius * math.cos(theta)
-        z = radius * math.sin(theta)
-        points.append([0, y, z])  # Додаємо точку
+    # Вершини замкненого кола траєкторії в площині x=0: масив (segments, 3)
+    theta = 2 * np.pi * np.arange(segments) / segments
+    points = np.zeros((segments, 3))
+    points[:, 1] = radius * np.cos(theta)
+    points[:, 2] = radius * np.sin(theta)
+    return points
 
-    solid_segments = []
-    for i in range(segments):
-        start = points[i]
-        end = points[(i + 1) % segments]
-        solid_segments.append([start, end])  # Всі сегменти малюємо цілими
 
-    return solid_segments  # Повертаємо список сегментів
-
-
-
-def project(vertices, width, height, fov=256, distance=4, camera_theta=0, camera_phi=0):
-    # Проекція 3D-точок у 2D-координати екрана
+def camera_matrix(camera_theta=0, camera_phi=0):
+    # Матриця обертання камери: спершу навколо Y (theta), потім навколо X (phi)
     cos_theta = math.cos(camera_theta)
     sin_theta = math.sin(camera_theta)
     cos_phi = math.cos(camera_phi)
@@ -106,20 +103,337 @@ def project(vertices, width, height, fov=256, distance=4, camera_theta=0, camera
         [0, cos_phi, -sin_phi],
         [0, sin_phi, cos_phi]
     ])
-    rot = np.dot(rot_x, rot_y)  # Загальна матриця обертання
+    return np.dot(rot_x, rot_y)  # Загальна матриця обертання
+
+
+class Projector:             # Перспективна проекція пакетами вершин у заздалегідь виділені буфери
+    def __init__(self, width, height, fov=256, distance=4):
+        self.width, self.height = width, height
+        self.fov, self.distance = fov, distance
+        self._camera = None      # Кут камери, для якого обчислено матрицю
+        self._rot_t = None       # Транспонована матриця камери (для vertices @ rot.T)
+        self._allocate(0)        # Порожні буфери: проекція нуля вершин теж коректна
+
+    def matrix(self, camera_theta, camera_phi):
+        # Матриця перераховується лише після зміни кутів камери
+        if self._camera != (camera_theta, camera_phi):
+            self._camera = (camera_theta, camera_phi)
+            self._rot_t = np.ascontiguousarray(camera_matrix(camera_theta, camera_phi).T)
+        return self._rot_t
+
+    def _allocate(self, n):
+        self._size = n
+        self._rotated = np.empty((n, 3))
+        self._factor = np.empty(n)
+        self._nonzero = np.empty(n, dtype=bool)
+        self._screen = np.empty((n, 2), dtype=np.int32)
+
+    def _buffers(self, n):
+        if n > self._size:       # Буфери ростуть лише за потреби
+            self._allocate(n)
+        return self._rotated[:n], self._factor[:n], self._nonzero[:n], self._screen[:n]
+
+    def project(self, vertices, camera_theta=0, camera_phi=0):
+        # Усі вершини (n, 3) одним множенням на матрицю; результат - подання (n, 2) int32
+        # у внутрішній буфер, дійсне до наступного виклику
+        rotated, factor, nonzero, screen = self._buffers(len(vertices))
+        np.matmul(vertices, self.matrix(camera_theta, camera_phi), out=rotated)
+        np.add(rotated[:, 2], self.distance, out=factor)
+        # Масштаб залежно від глибини; у площині камери (distance + z == 0) лишається 0
+        np.not_equal(factor, 0, out=nonzero)
+        np.divide(self.fov, factor, out=factor, where=nonzero)
+        x, y = rotated[:, 0], rotated[:, 1]
+        x *= factor
+        x += self.width / 2       # Перетворення у координати екрана
+        y *= factor
+        np.subtract(self.height / 2, y, out=y)  # -y: вгору в 3D - вгору на екрані
+        np.copyto(screen, rotated[:, :2], casting="unsafe")  # Відкидання дробової частини, як int()
+        return screen
 
-    projected = []  # Масив 2D-точок
-    for v in vertices:          # Перетворюємо кожну вершину
-        v_rot = np.dot(rot, v)  # Повертаємо в просторі
-        x, y, z = v_rot
-        factor = fov / (distance + z) if distance + z != 0 else 0  # Масштаб залежно від глибини
-        proj_x = x * factor + width / 2   # Перетворення у координати екрана
-        proj_y = -y * factor + height / 2 #-y робить так, щоб вгору в 3D відповідав вверх на екрані, а не вниз.
-        projected.append((int(proj_x), int(proj_y)))  # Додаємо точку
-    return projected
 
+def project(vertices, width, height, fov=256, distance=4, camera_theta=0, camera_phi=0):
+    # Проекція 3D-точок у 2D-координати екрана: список кортежів (x, y)
+    projector = Projector(width, height, fov, distance)
+    points = projector.project(np.asarray(vertices, dtype=float).reshape(-1, 3), camera_theta, camera_phi)
+    return [tuple(p) for p in points.tolist()]
+
+
+def clip_segments(p0, p1, width, height):
+    # Відсікання відрізків прямокутником екрана (Ліанг-Барскі) для всіх відрізків разом:
+    # (маска видимих, t0, t1) - видима частина відрізка відповідає параметрам [t0, t1]
+    d = p1 - p0
+    t0 = np.zeros(len(d))
+    t1 = np.ones(len(d))
+    visible = np.ones(len(d), dtype=bool)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for axis, limit in ((0, width - 1), (1, height - 1)):
+            for p, q in ((-d[:, axis], p0[:, axis]), (d[:, axis], limit - p0[:, axis])):
+                visible &= (p != 0) | (q >= 0)   # Паралельний межі і зовні
+                r = q / p
+                np.maximum(t0, r, out=t0, where=p < 0)
+                np.minimum(t1, r, out=t1, where=p > 0)
+    visible &= t0 <= t1
+    return visible, t0, t1
+
+
+def map_colors(surface, colors):
+    # Кольори RGB (n, 3) у піксельні значення поверхні, як surface.map_rgb для кожного
+    colors = np.asarray(colors, dtype=np.uint32)
+    masks, shifts, losses = surface.get_masks(), surface.get_shifts(), surface.get_losses()
+    mapped = np.full(len(colors), masks[3], dtype=np.uint32)   # Непрозорий альфа-канал
+    for k in range(3):
+        mapped |= (colors[:, k] >> losses[k]) << shifts[k]
+    return mapped.astype(np.int64)
+
+
+def draw_edges(pixels, points, edges, color, width=1):
+    # Растеризація всіх ребер одразу в масив пікселів (W, H) (pygame.surfarray.pixels2d).
+    # color - піксельне значення (surface.map_rgb) або масив (E,) таких значень для кожного ребра.
+    # Точки відрізка з n = max(|dx|, |dy|) кроками: по головній осі рівно k пікселів, по другій -
+    # round(k * нахил). Запис іде через плоске подання пікселів (індекс x + y * row), товщина -
+    # зсув поперек головної осі, як у pygame.draw.line. Внутрішні точки генеруються за k:
+    # ребра відсортовані за довжиною, тож на кроці k активний префікс масиву ребер
+    W, H = pixels.shape
+    lo, hi = (width - 1) // 2, width // 2      # Поля під товщину: зсуви -lo..hi не виходять за екран
+    per_edge = np.ndim(color) > 0
+    # (2, E): рядок 0 - початки ребер, рядок 1 - кінці. Координати int64: біля площини камери
+    # проекція дає значення на межі int32, і різниці кінців та плоскі індекси переповнились би
+    x = np.take(points[:, 0], edges.T).astype(np.int64)
+    y = np.take(points[:, 1], edges.T).astype(np.int64)
+    inside = (x >= lo) & (x < W - hi) & (y >= lo) & (y < H - hi)
+    inside = inside[0] & inside[1]
+    if not inside.all():                  # Відсікаються лише ребра, що виходять за екран
+        p0 = np.stack((x[0, ~inside], y[0, ~inside]), axis=1) - lo
+        p1 = np.stack((x[1, ~inside], y[1, ~inside]), axis=1) - lo
+        visible, t0, t1 = clip_segments(p0.astype(float), p1.astype(float), W - lo - hi, H - lo - hi)
+        p0, d = p0[visible], (p1 - p0)[visible]
+        a = np.rint(p0 + t0[visible, None] * d).astype(x.dtype) + lo
+        b = np.rint(p0 + t1[visible, None] * d).astype(x.dtype) + lo
+        x = np.concatenate((x[:, inside], np.stack((a[:, 0], b[:, 0]))), axis=1)
+        y = np.concatenate((y[:, inside], np.stack((a[:, 1], b[:, 1]))), axis=1)
+        if per_edge:
+            color = np.concatenate((color[inside], color[~inside][visible]))
+
+    row = pixels.strides[1] // pixels.strides[0]
+    flat = np.lib.stride_tricks.as_strided(pixels, shape=(H * row,), strides=(pixels.strides[0],))
+
+    def plot(index, minor, color):
+        for offset in range(-lo, hi + 1):
+            flat[index + offset * minor if offset else index] = color
+
+    dx, dy = x[1] - x[0], y[1] - y[0]
+    adx, ady = np.abs(dx), np.abs(dy)
+    n = np.maximum(adx, ady)
+    steep = ady >= adx                     # Крутий відрізок товщають по x, пологий - по y
+    minor = np.where(steep, 1, row)        # Крок поперек головної осі
+    start = y[0] * row + x[0]
+    plot(np.concatenate((start, y[1] * row + x[1])), np.tile(minor, 2),
+         np.tile(color, 2) if per_edge else color)
+
+    longer = np.flatnonzero(n > 1)
+    if not len(longer):
+        return
+    order = longer[np.argsort(-n[longer], kind="stable")]
+    steps = n[order]                       # За спаданням
+    base = start[order]
+    major = np.where(steep, np.sign(dy) * row, np.sign(dx))[order]
+    slope = np.where(steep, dx, dy)[order] / steps
+    minor = minor[order]
+    color = color[order] if per_edge else color
+    # active[k - 1] - кількість ребер з n > k, тобто з внутрішньою точкою k
+    active = np.searchsorted(-steps, -np.arange(1, steps[0]), side="left")
+    k = 1
+    while k < steps[0] and active[k - 1] >= 64:
+        m = active[k - 1]
+        t = slope[:m] * k
+        t += 0.5
+        index = np.floor(t).astype(np.intp)
+        index *= minor[:m]
+        index += base[:m]
+        index += k * major[:m]
+        plot(index, minor[:m], color[:m] if per_edge else color)
+        k += 1
+    if k < steps[0]:                       # Довгі ребра, що лишились, - усі точки одним пакетом
+        m = active[k - 1]
+        rest = steps[:m] - k
+        owner = np.repeat(np.arange(m), rest)
+        kk = np.arange(owner.size) - np.repeat(np.cumsum(rest) - rest, rest) + k
+        index = base[owner] + kk * major[owner]
+        index += np.floor(kk * slope[owner] + 0.5).astype(np.intp) * minor[owner]
+        plot(index, minor[owner], color[owner] if per_edge else color)
+
+
+class PolyhedronScene:        # Стан сцени з фіксованим кроком часу (один step() - один кадр)
+    DT = 1 / 60                  # Крок часу симуляції
+    LINE_EDGES = 2000            # Більші каркаси растеризуються пакетно (draw_edges)
+
+    def __init__(self, shape="cube", angular_speed=0.0, trajectory_speed=0.03, radius=1.5, size=(800, 600)):
+        self.width, self.height = size
+        self.radius = radius
+        self.angular_speed = angular_speed         # Кут повороту фігури за кадр
+        self.trajectory_speed = trajectory_speed   # Обертів осі по колу за секунду
+        self.trajectory_circle = create_trajectory_circle(radius=radius)  # Коло для осі
+        self.projector = Projector(self.width, self.height)
+        self.t = 0.0                 # Час для руху по колу
+        self.camera_theta = 0        # Кут камери навколо Y
+        self.camera_phi = 0          # Кут камери навколо X
+        self.set_shape(shape)
+
+    def set_shape(self, shape):   # Назва вбудованої фігури або шлях до файлу OBJ/OFF/PLY
+        self.shape = shape
+        if shape in SHAPES:
+            rest = get_vertices(shape)        # Отримуємо вершини
+            self.edges = get_edges(shape)     # Отримуємо ребра
+        else:
+            rest, self.edges = load_mesh(shape)  # Модель, вписана в куб зі стороною 1
+        # Вершини у стані спокою (окремі неперервні стовпці) і поза відносно них:
+        # vertices = R(angle) @ rest + (0, ty, tz). Кут накопичується як число, тож фігура
+        # завжди жорстка, скільки б кадрів не минуло
+        self.rest_y = np.ascontiguousarray(rest[:, 1])
+        self.rest_z = np.ascontiguousarray(rest[:, 2])
+        self.angle = 0.0
+        self.ty = self.tz = 0.0
+        self._scratch = np.empty(len(rest))
+        # Спільний буфер вершин кадру: [фігура | коло траєкторії | два кінці осі]
+        n, m = len(rest), len(self.trajectory_circle)
+        self.buffer = np.empty((n + m + 2, 3))
+        self.mesh = self.buffer[:n]
+        self.vertices = self.mesh             # Поточна поза фігури
+        self.mesh[:] = rest
+        self.buffer[n:n + m] = self.trajectory_circle
+        self.axis = self.buffer[n + m:]
+        self.axis[:, 0] = (-2, 2)             # Лінія осі вздовж x
+        self._circle = slice(n, n + m)
+
+    def rotate_camera(self, dx, dy):          # Поворот камери на зсув миші
+        self.camera_theta += dx * 0.005       # Обертаємо камеру по Y
+        self.camera_phi += dy * 0.005         # Обертаємо камеру по X
+        self.camera_phi = max(-math.pi/2 + 0.01, min(math.pi/2 - 0.01, self.camera_phi))  # Обмежуємо
+
+    def step(self):
+        theta = 2 * math.pi * self.t * self.trajectory_speed  # Кут для руху по колу
+        self.y0 = self.radius * math.cos(theta)  # Центр осі по y
+        self.z0 = self.radius * math.sin(theta)  # Центр осі по z
+        # Поворот на angular_speed навколо осі (y0, z0) застосовується до пози, а не до вершин:
+        # кут додається до накопиченого, а зсув (ty, tz) повертається навколо центру осі
+        dphi = self.angular_speed
+        cos_d, sin_d = math.cos(dphi), math.sin(dphi)
+        dy, dz = self.ty - self.y0, self.tz - self.z0
+        self.ty = dy * cos_d - dz * sin_d + self.y0
+        self.tz = dy * sin_d + dz * cos_d + self.z0
+        self.angle = (self.angle + dphi) % (2 * math.pi)  # Обмежений кут не втрачає точності
+        pose_vertices(self.rest_y, self.rest_z, self.angle, self.ty, self.tz, self.mesh, self._scratch)
+        self.t += self.DT            # Збільшуємо час
+
+    def draw(self, screen):
+        self.axis[:, 1] = self.y0
+        self.axis[:, 2] = self.z0
+        # Уся геометрія кадру проектується одним викликом
+        points = self.projector.project(self.buffer, self.camera_theta, self.camera_phi)
+        screen.fill((0, 0, 0))   # Очищаємо екран чорним
 
-def run_pygame(radius=1.5):   # Основний цикл pygame
+        pygame.draw.lines(screen, (100, 100, 100), True, points[self._circle].tolist(), 1)  # Коло траєкторії
+
+        if len(self.edges) > self.LINE_EDGES:   # Великий каркас - усі ребра одним проходом
+            pixels = pygame.surfarray.pixels2d(screen)
+            draw_edges(pixels, points, self.edges, screen.map_rgb((255, 255, 255)), 2)
+            del pixels           # Знімаємо блокування поверхні
+        else:
+            projected = points[:len(self.mesh)].tolist()
+            for edge in self.edges.tolist():  # Малюємо ребра
+                pygame.draw.line(screen, (255, 255, 255), projected[edge[0]], projected[edge[1]], 2) # Малюємо лінію між двома вершинами ребра (edge[0] та edge[1]) після проекції у 2D
+        start, end = points[-2:].tolist()
+        pygame.draw.line(screen, (255, 0, 0), start, end, 2)  # Червона вісь
+
+
+class InstancedScene:         # Тисячі фігур, що обертаються, з одним пакетним конвеєром на кадр
+    # Кожен тип фігури має спільну сітку у стані спокою, доповнену до MAX_VERTICES вершин
+    # (зайві вершини не входять у жодне ребро). Екземпляр i - це тип, вісь обертання
+    # (паралельна x) у точці offsets[i], фаза, кутова швидкість за кадр і колір. Вершини всіх
+    # екземплярів лежать в одному буфері (N * MAX_VERTICES, 3): поза всіх екземплярів - одна
+    # широкомовна операція (N, MAX_VERTICES), проекція - одне множення на матрицю камери
+    DT = 1 / 60
+    MAX_VERTICES = 8
+
+    def __init__(self, types, offsets, phases, speeds, colors, scale=1.0, size=(800, 600)):
+        self.width, self.height = size
+        self.types = np.asarray(types, dtype=np.intp)           # Номери в SHAPES
+        self.offsets = np.asarray(offsets, dtype=float)         # (N, 3)
+        self.speeds = np.asarray(speeds, dtype=float)           # (N,)
+        self.colors = np.asarray(colors, dtype=np.uint8)        # (N, 3)
+        count, V = len(self.types), self.MAX_VERTICES
+        self.projector = Projector(self.width, self.height)
+        self.camera_theta = 0
+        self.camera_phi = 0
+
+        rest = np.zeros((len(SHAPES), V, 3))
+        edges = []
+        for k, shape in enumerate(SHAPES):
+            vertices = get_vertices(shape) * scale
+            rest[k, :len(vertices)] = vertices
+            edges.append(get_edges(shape))
+        # Вершини кожного екземпляра у стані спокою, стовпцями (N, V)
+        self.rest_y = np.ascontiguousarray(rest[self.types, :, 1])
+        self.rest_z = np.ascontiguousarray(rest[self.types, :, 2])
+        # Ребра всіх екземплярів з глобальними номерами вершин і номер екземпляра кожного ребра
+        per_type = np.array([len(e) for e in edges])
+        self.edges = np.concatenate([edges[t] for t in self.types.tolist()]) if count else np.empty((0, 2), np.int32)
+        self.edge_owner = np.repeat(np.arange(count), per_type[self.types])
+        self.edges += (self.edge_owner * V).astype(np.int32)[:, None]
+
+        self.buffer = np.empty((count * V, 3))
+        self.vertices = self.buffer.reshape(count, V, 3)
+        self.vertices[:, :, 0] = rest[self.types, :, 0] + self.offsets[:, None, 0]
+        self.angles = np.mod(np.asarray(phases, dtype=float), 2 * np.pi)
+        self._cos = np.empty((count, 1))
+        self._sin = np.empty((count, 1))
+        self._scratch = np.empty((count, V))
+        self._mapped = self._format = None
+
+    @classmethod
+    def random(cls, count, seed=None, extent=(3.0, 2.0, 1.5), scale=0.15, max_speed=0.1, size=(800, 600)):
+        # Випадкова сцена для навантажувального тесту: екземпляри в коробці +-extent
+        rng = np.random.default_rng(seed)
+        return cls(rng.integers(0, len(SHAPES), count),
+                   rng.uniform(-1, 1, (count, 3)) * extent,
+                   rng.uniform(0, 2 * np.pi, count),
+                   rng.uniform(-max_speed, max_speed, count),
+                   rng.integers(80, 256, (count, 3)),
+                   scale, size)
+
+    def __len__(self):
+        return len(self.types)
+
+    rotate_camera = PolyhedronScene.rotate_camera
+
+    def step(self):
+        # Кути накопичуються в обмеженому діапазоні, поза рахується в замкненій формі
+        self.angles += self.speeds
+        np.mod(self.angles, 2 * np.pi, out=self.angles)
+        np.cos(self.angles, out=self._cos[:, 0])
+        np.sin(self.angles, out=self._sin[:, 0])
+        y, z, tmp = self.vertices[:, :, 1], self.vertices[:, :, 2], self._scratch
+        np.multiply(self.rest_y, self._cos, out=y)      # y = y0 cos - z0 sin + oy
+        np.multiply(self.rest_z, self._sin, out=tmp)
+        y -= tmp
+        y += self.offsets[:, 1:2]
+        np.multiply(self.rest_y, self._sin, out=z)      # z = y0 sin + z0 cos + oz
+        np.multiply(self.rest_z, self._cos, out=tmp)
+        z += tmp
+        z += self.offsets[:, 2:3]
+
+    def draw(self, screen):
+        points = self.projector.project(self.buffer, self.camera_theta, self.camera_phi)
+        if self._format != screen.get_masks():   # Піксельні кольори залежать лише від формату поверхні
+            self._format = screen.get_masks()
+            self._mapped = map_colors(screen, self.colors)[self.edge_owner]
+        screen.fill((0, 0, 0))
+        pixels = pygame.surfarray.pixels2d(screen)
+        draw_edges(pixels, points, self.edges, self._mapped, 2)
+        del pixels
+
+
+def run_pygame(radius=1.5, instances=None):   # Основний цикл pygame; instances - кількість фігур у сцені з екземплярами
     global current_shape, current_angular_speed, current_trajectory_speed, shape_changed
 
     pygame.init()             # Ініціалізуємо pygame
@@ -128,14 +442,13 @@ def run_pygame(radius=1.5):   # Основний цикл pygame
     pygame.display.set_caption("Polyhedron Viewer")    # Заголовок вікна
     clock = pygame.time.Clock()                       # Годинник для FPS
 
-    vertices = get_vertices(current_shape)            # Отримуємо вершини
-    edges = get_edges(current_shape)                  # Отримуємо ребра
-    trajectory_circle = create_trajectory_circle(radius=radius)  # Коло для осі
+    if instances:             # Випадкова сцена з екземплярами замість однієї фігури з GUI
+        scene = InstancedScene.random(instances, size=(width, height))
+    else:
+        scene = PolyhedronScene(current_shape, radius=radius, size=(width, height))
+    frames = 0
 
     running = True
-    t = 0.0                      # Час для руху по колу
-    camera_theta = 0             # Кут камери навколо Y
-    camera_phi = 0               # Кут камери навколо X
     mouse_dragging = False       # Чи тягнемо мишею
     last_mouse_pos = None        # Попередня позиція миші
 
@@ -152,41 +465,24 @@ def run_pygame(radius=1.5):   # Основний цикл pygame
                     mouse_dragging = False
             elif event.type == pygame.MOUSEMOTION and mouse_dragging:  # Рух мишею
                 current_pos = event.pos
-                dx = current_pos[0] - last_mouse_pos[0]
-                dy = current_pos[1] - last_mouse_pos[1]
-                camera_theta += dx * 0.005   # Обертаємо камеру по Y
-                camera_phi += dy * 0.005     # Обертаємо камеру по X
-                camera_phi = max(-math.pi/2 + 0.01, min(math.pi/2 - 0.01, camera_phi))  # Обмежуємо
+                scene.rotate_camera(current_pos[0] - last_mouse_pos[0], current_pos[1] - last_mouse_pos[1])
                 last_mouse_pos = current_pos
 
-        if shape_changed:   # Якщо змінили фігуру
-            vertices = get_vertices(current_shape) # отримуємо нові вершини
-            edges = get_edges(current_shape) # отримуємо нові ребра
-            shape_changed = False
+        if not instances:         # Значення з GUI
+            if shape_changed:   # Якщо змінили фігуру
+                scene.set_shape(current_shape) # отримуємо нові вершини і ребра
+                shape_changed = False
+            scene.angular_speed = current_angular_speed
+            scene.trajectory_speed = current_trajectory_speed
 
-        screen.fill((0, 0, 0))   # Очищаємо екран чорним
-
-        theta = 2 * math.pi * t * current_trajectory_speed  # Кут для руху по колу
-        y0 = radius * math.cos(theta)  # Центр осі по y
-        z0 = radius * math.sin(theta)  # Центр осі по z
-
-        vertices = rotate_around_axis(vertices, y0, z0, current_angular_speed)  # Обертання фігури
-
-        for segment in trajectory_circle:   # Малюємо пунктирне коло
-            proj_segment = project(segment, width, height, camera_theta=camera_theta, camera_phi=camera_phi)
-            pygame.draw.line(screen, (100, 100, 100), proj_segment[0], proj_segment[1], 1)
-
-        projected = project(vertices, width, height, camera_theta=camera_theta, camera_phi=camera_phi)  # Проекція фігури
-
-        for edge in edges:  # Малюємо ребра
-            pygame.draw.line(screen, (255, 255, 255), projected[edge[0]], projected[edge[1]], 2) # Малюємо лінію між двома вершинами ребра (edge[0] та edge[1]) після проекції у 2D
-        axis_pts = np.array([[-2, y0, z0], [2, y0, z0]], dtype=float)  # Лінія осі
-        proj_axis = project(axis_pts, width, height, camera_theta=camera_theta, camera_phi=camera_phi)
-        pygame.draw.line(screen, (255, 0, 0), proj_axis[0], proj_axis[1], 2)  # Червона вісь
+        scene.step()
+        scene.draw(screen)
 
         pygame.display.flip()  # Оновлюємо екран
         clock.tick(60)         # FPS = 60
-        t += 1 / 60            # Збільшуємо час
+        frames += 1
+        if instances and frames % 60 == 0:   # Кількість фігур і FPS у заголовку
+            pygame.display.set_caption(f"Polyhedron Viewer - {len(scene)} shapes, {clock.get_fps():.0f} FPS")
 
     pygame.quit()  # Виходимо з pygame
 
@@ -198,31 +494,53 @@ def update_shape(event=None):    # Функція зміни фігури з Com
     shape_changed = True
 
 
+def open_model():                # Функція вибору файлу моделі
+    global current_shape, shape_changed
+    path = filedialog.askopenfilename(filetypes=[("Моделі", "*.obj *.off *.ply"), ("Усі файли", "*")])
+    if path:
+        current_shape = path
+        shape_changed = True
+
+
 def update_angular_speed(val):   # Функція зміни швидкості обертання
     global current_angular_speed
     current_angular_speed = float(val)
 
 
-root = tk.Tk()                   # Створюємо вікно Tkinter
-root.title("Керування поліедром")# Назва вікна
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--instances"]:  # Сцена з екземплярами без GUI: python tst.py --instances 5000
+        run_pygame(instances=int(sys.argv[2]))
+        sys.exit()
+
+    import tkinter as tk          # Імпортуємо бібліотеку Tkinter для створення GUI
+    from tkinter import ttk       # Імпортуємо ttk (розширені віджети Tkinter)
+    from tkinter import filedialog  # Діалог вибору файлу моделі
+    import threading              # Імпортуємо threading для запуску pygame у фоні
+
+    root = tk.Tk()                   # Створюємо вікно Tkinter
+    root.title("Керування поліедром")# Назва вікна
+
+    # Вибір фігури
+    tk.Label(root, text="Оберіть фігуру:").pack(pady=5)
+    shape_var = tk.StringVar(value="cube")  # Значення за замовчуванням
+    shape_combo = ttk.Combobox(root, textvariable=shape_var, 
+                               values=list(SHAPES), state="readonly")
+    shape_combo.bind("<<ComboboxSelected>>", update_shape) # Викликає зміну фігури
+    shape_combo.pack(pady=5)
+    tk.Button(root, text="Відкрити модель...", command=open_model).pack(pady=5)  # OBJ/OFF/PLY
 
-# Вибір фігури
-tk.Label(root, text="Оберіть фігуру:").pack(pady=5)
-shape_var = tk.StringVar(value="cube")  # Значення за замовчуванням
-shape_combo = ttk.Combobox(root, textvariable=shape_var, 
-                           values=["cube", "tetrahedron", "octahedron"], state="readonly")
-shape_combo.bind("<<ComboboxSelected>>", update_shape) # Викликає зміну фігури
-shape_combo.pack(pady=5)
+    # Повзунок швидкості обертання фігури
+    tk.Label(root, text="Швидкість обертання фігури:").pack(pady=5)
+    tk.Scale(root, from_=0.0, to=0.2, resolution=0.01, orient="horizontal",
+             command=update_angular_speed).pack(pady=5)
 
-# Повзунок швидкості обертання фігури
-tk.Label(root, text="Швидкість обертання фігури:").pack(pady=5)
-tk.Scale(root, from_=0.0, to=0.2, resolution=0.01, orient="horizontal",
-         command=update_angular_speed).pack(pady=5)
+    if len(sys.argv) > 1:            # Модель з командного рядка: python tst.py model.obj
+        current_shape = sys.argv[1]
 
-# Фіксована швидкість руху осі (не змінюється користувачем)
-current_trajectory_speed = 0.03  # Константа швидкості руху осі
+    # Фіксована швидкість руху осі (не змінюється користувачем)
+    current_trajectory_speed = 0.03  # Константа швидкості руху осі
 
-# Запускаємо pygame у фоні в окремому потоці
-threading.Thread(target=run_pygame, daemon=True).start()
+    # Запускаємо pygame у фоні в окремому потоці
+    threading.Thread(target=run_pygame, daemon=True).start()
 
-root.mainloop()  # Запускаємо головний цикл Tkinter
+    root.mainloop()  # Запускаємо головний цикл Tkinter
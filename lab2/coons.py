@@ -0,0 +1,313 @@
+import threading
+from collections import OrderedDict, namedtuple
+import numpy as np
+
+def bump(t, amp=0.12, freq=1.0):
+    return amp * np.sin(np.pi * t * freq) ** 2
+
+def Q(u, v, P00, P10, P01, P11, amp_C0, amp_C1, amp_D0, amp_D1):
+    def C0(u): return (1-u)*P00 + u*P10 + np.array([0,0,bump(u, amp=amp_C0)])
+    def C1(u): return (1-u)*P01 + u*P11 + np.array([bump(u, amp=amp_C1),0,0])
+    def D0(v): return (1-v)*P00 + v*P01 + np.array([bump(v, amp=amp_D0),0,0])
+    def D1(v): return (1-v)*P10 + v*P11 + np.array([0,bump(v, amp=amp_D1),0])
+    B = (1-u)*(1-v)*P00 + u*(1-v)*P10 + (1-u)*v*P01 + u*v*P11
+    return (1-v)*C0(u) + v*C1(u) + (1-u)*D0(v) + u*D1(v) - B
+
+# ---- Параметри патча ----
+# Плоскі назви параметрів (як у повзунків GUI) і значення за замовчуванням
+PARAM_NAMES = ("P00_x","P00_y","P00_z","P10_x","P10_y","P10_z",
+               "P01_x","P01_y","P01_z","P11_x","P11_y","P11_z",
+               "amp_C0","amp_C1","amp_D0","amp_D1")
+DEFAULT_PARAMS = dict(zip(PARAM_NAMES, (0.0, 0.0, 0.0, 1.0, 0.2, 0.2,
+                                        0.0, 1.0, 0.5, 1.0, 1.0, 0.8,
+                                        0.25, 0.12, 0.12, 0.15)))
+
+def unpack_params(values):
+    # Словник плоских параметрів -> (P00,P10,P01,P11,amp_C0,amp_C1,amp_D0,amp_D1)
+    flat = [float(values.get(name, DEFAULT_PARAMS[name])) for name in PARAM_NAMES]
+    points = [np.array(flat[k:k+3]) for k in range(0, 12, 3)]
+    return (*points, *flat[12:])
+
+# ---- Обчислення в довільних точках ----
+# Лінійні частини C0, C1, D0, D1 разом дають 2B, тож Q = B + bump-зміщення кривих.
+# u, v - масиви однакової форми, результат має форму (..., 3)
+def evaluate(u, v, P00, P10, P01, P11, amp_C0, amp_C1, amp_D0, amp_D1):
+    u = np.asarray(u, dtype=float)[..., None]
+    v = np.asarray(v, dtype=float)[..., None]
+    P00,P10,P01,P11 = (np.asarray(P, dtype=float) for P in (P00,P10,P01,P11))
+    S = (1-u)*(1-v)*P00 + u*(1-v)*P10 + (1-u)*v*P01 + u*v*P11
+    S[..., 0] += v[..., 0]*bump(u[..., 0], amp=amp_C1) + (1-u[..., 0])*bump(v[..., 0], amp=amp_D0)
+    S[..., 1] += u[..., 0]*bump(v[..., 0], amp=amp_D1)
+    S[..., 2] += (1-v[..., 0])*bump(u[..., 0], amp=amp_C0)
+    return S
+
+def bump_derivatives(t, amp):
+    # Перша і друга похідні bump(t, amp) = amp*sin^2(pi*t)
+    return amp*np.pi*np.sin(2*np.pi*t), 2*amp*np.pi**2*np.cos(2*np.pi*t)
+
+def derivatives(u, v, P00, P10, P01, P11, amp_C0, amp_C1, amp_D0, amp_D1):
+    # Аналітичні Q, Q_u, Q_v, Q_uu, Q_uv, Q_vv у точках (u, v); кожен масив (..., 3)
+    u = np.asarray(u, dtype=float)
+    v = np.asarray(v, dtype=float)
+    P00,P10,P01,P11 = (np.asarray(P, dtype=float) for P in (P00,P10,P01,P11))
+    S = evaluate(u, v, P00,P10,P01,P11,amp_C0,amp_C1,amp_D0,amp_D1)
+    uu, vv = u[..., None], v[..., None]
+    Su = (1-vv)*(P10-P00) + vv*(P11-P01)
+    Sv = (1-uu)*(P01-P00) + uu*(P11-P10)
+    Suv = np.broadcast_to(P00-P10-P01+P11, S.shape).copy()
+    Suu, Svv = np.zeros_like(S), np.zeros_like(S)
+
+    b0, b1 = bump(u, amp=amp_C0), bump(u, amp=amp_C1)
+    d0, d1 = bump(v, amp=amp_D0), bump(v, amp=amp_D1)
+    (b0u, b0uu), (b1u, b1uu) = bump_derivatives(u, amp_C0), bump_derivatives(u, amp_C1)
+    (d0v, d0vv), (d1v, d1vv) = bump_derivatives(v, amp_D0), bump_derivatives(v, amp_D1)
+    # x: v*bC1(u) + (1-u)*bD0(v);  y: u*bD1(v);  z: (1-v)*bC0(u)
+    Su[..., 0] += v*b1u - d0;        Sv[..., 0] += b1 + (1-u)*d0v
+    Suu[..., 0] += v*b1uu;           Svv[..., 0] += (1-u)*d0vv;      Suv[..., 0] += b1u - d0v
+    Su[..., 1] += d1;                Sv[..., 1] += u*d1v
+    Svv[..., 1] += u*d1vv;           Suv[..., 1] += d1v
+    Su[..., 2] += (1-v)*b0u;         Sv[..., 2] -= b0
+    Suu[..., 2] += (1-v)*b0uu;       Suv[..., 2] -= b0u
+    return S, Su, Sv, Suu, Suv, Svv
+
+# ---- Кеш обчислених масивів ----
+class ArrayCache:
+    # LRU-кеш кортежів масивів з обмеженням за сумарним обсягом пам'яті
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()   # кеш використовують і GUI, і фоновий потік
+
+    def get(self, key):
+        with self._lock:
+            arrays = self._items.get(key)
+            if arrays is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return arrays
+
+    def put(self, key, arrays):
+        size = sum(a.nbytes for a in arrays)
+        if size > self.max_bytes:
+            return arrays
+        for a in arrays:
+            a.setflags(write=False)   # масиви з кешу спільні для всіх викликів
+        with self._lock:
+            if key in self._items:
+                self.nbytes -= sum(a.nbytes for a in self._items.pop(key))
+            self._items[key] = arrays
+            self.nbytes += size
+            while self.nbytes > self.max_bytes:
+                _, old = self._items.popitem(last=False)
+                self.nbytes -= sum(a.nbytes for a in old)
+        return arrays
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self.nbytes = 0
+
+
+surface_cache = ArrayCache(max_bytes=256 * 2**20)   # сітки X, Y, Z
+curve_cache = ArrayCache(max_bytes=16 * 2**20)      # вибірки граничних кривих
+
+
+def point_key(P):
+    return tuple(float(c) for c in np.ravel(P))
+
+
+# ---- Граничні криві ----
+# Кожна крива залежить лише від своїх параметрів, тож зміна однієї амплітуди
+# перераховує тільки відповідну криву
+def bump_samples(amp, N, dtype=np.float64):
+    key = ("bump", float(amp), N, np.dtype(dtype).str)
+    cached = curve_cache.get(key)
+    if cached is None:
+        t = np.linspace(0,1,N,dtype=dtype)
+        cached = curve_cache.put(key, (bump(t, amp=amp).astype(dtype),))
+    return cached[0]
+
+
+def edge_samples(Pa, Pb, amp, axis, N, dtype=np.float64):
+    # (1-t)*Pa + t*Pb + bump(t) уздовж осі axis, масив (3, N)
+    key = ("edge", point_key(Pa), point_key(Pb), float(amp), axis, N, np.dtype(dtype).str)
+    cached = curve_cache.get(key)
+    if cached is None:
+        t = np.linspace(0,1,N,dtype=dtype)
+        curve = np.outer(np.asarray(Pa,dtype=dtype),1-t) + np.outer(np.asarray(Pb,dtype=dtype),t)
+        curve[axis] += bump_samples(amp, N, dtype)
+        cached = curve_cache.put(key, (curve,))
+    return cached[0]
+
+
+# ---- Функція побудови поверхні ----
+# Для кожної координати поверхня Кунса розкладається в добуток L(u) @ R(v):
+#   L = [C0(u) - лін.(P00,P10), C1(u) - лін.(P01,P11), 1-u, u]
+#   R = [1-v, v, D0(v), D1(v)]
+# Перші два стовпці L - це лише bump-зміщення кривих C0, C1, бо білінійна частина B
+# скорочується з лінійною частиною C0, C1. Уся сітка обчислюється одним matmul.
+def grid_factors(P00,P10,P01,P11,amp_C0,amp_C1,amp_D0,amp_D1,Nu=50,Nv=50,dtype=np.float64):
+    # Множники L (3, Nu, 4) і R (3, 4, Nv); L[:, i0:i1] @ R - рядки i0..i1-1 сітки
+    u = np.linspace(0,1,Nu,dtype=dtype)
+    v = np.linspace(0,1,Nv,dtype=dtype)
+
+    L = np.zeros((3,Nu,4),dtype=dtype)
+    L[2,:,0] = bump_samples(amp_C0, Nu, dtype)   # C0 зміщена по z
+    L[0,:,1] = bump_samples(amp_C1, Nu, dtype)   # C1 зміщена по x
+    L[:,:,2] = 1-u
+    L[:,:,3] = u
+
+    R = np.empty((3,4,Nv),dtype=dtype)
+    R[:,0] = 1-v
+    R[:,1] = v
+    R[:,2] = edge_samples(P00, P01, amp_D0, 0, Nv, dtype)   # D0 зміщена по x
+    R[:,3] = edge_samples(P10, P11, amp_D1, 1, Nv, dtype)   # D1 зміщена по y
+    return L, R
+
+
+# ---- Бікубічне (ермітове) змішування ----
+# Замість (1-u), u кривими змішуються ермітові функції H0..H3, а крім самих граничних
+# кривих використовуються похідні поперек меж: Cv0, Cv1 = dQ/dv при v=0, 1 і
+# Du0, Du1 = dQ/du при u=0, 1. Для кожної координати
+#   Q = Hu @ [D0; D1; Du0; Du1] + [C0, C1, Cv0, Cv1] @ Hv^T - Hu @ M @ Hv^T,
+# де M (4x4) - кути, похідні в кутах і вектори скруту. Це один matmul рангу 8:
+#   L = [Hu, [C0, C1, Cv0, Cv1] - Hu @ M],  R = [[D0; D1; Du0; Du1], Hv^T]
+def hermite_table(N, dtype=np.float64):
+    # Таблиця (N, 4) значень H0..H3 у рівномірних точках, кешується для кожної роздільності
+    key = ("hermite", N, np.dtype(dtype).str)
+    cached = curve_cache.get(key)
+    if cached is None:
+        t = np.linspace(0,1,N,dtype=dtype)
+        H = np.column_stack((1 - 3*t**2 + 2*t**3, 3*t**2 - 2*t**3, t - 2*t**2 + t**3, t**3 - t**2))
+        cached = curve_cache.put(key, (H.astype(dtype),))
+    return cached[0]
+
+
+def hermite_surface(C0, C1, D0, D1, Cv0=None, Cv1=None, Du0=None, Du1=None, twists=None):
+    # Криві - вибірки (3, Nu) для C* і (3, Nv) для D*; результат (X, Y, Z) розміру (Nu, Nv).
+    # Кожна відсутня похідна поперек межі окремо замінюється лінійною C1 - C0 (D1 - D0),
+    # як у лінійного патча, а не похідною з протилежної межі
+    C0, C1, D0, D1 = (np.asarray(c) for c in (C0, C1, D0, D1))
+    dtype = np.result_type(C0, D0)
+    Nu, Nv = C0.shape[1], D0.shape[1]
+    Cv0, Cv1 = (C1 - C0 if c is None else np.asarray(c) for c in (Cv0, Cv1))
+    Du0, Du1 = (D1 - D0 if d is None else np.asarray(d) for d in (Du0, Du1))
+    if twists is None:
+        # Скрут у кутах (3, 2, 2) [u-кут, v-кут] - середнє похідних кривих поперек меж
+        dCv = [np.gradient(c, axis=1, edge_order=2) * (Nu - 1) for c in (Cv0, Cv1)]
+        dDu = [np.gradient(d, axis=1, edge_order=2) * (Nv - 1) for d in (Du0, Du1)]
+        twists = np.empty((3, 2, 2), dtype=dtype)
+        for a in (0, 1):
+            for b in (0, 1):
+                twists[:, a, b] = (dCv[b][:, -a] + dDu[a][:, -b]) / 2
+    twists = np.asarray(twists)
+
+    # M[:, рядок - базис по u, стовпець - базис по v]
+    M = np.empty((3, 4, 4), dtype=dtype)
+    M[:, 0, :2] = np.stack((C0[:, 0], C1[:, 0]), axis=1)
+    M[:, 1, :2] = np.stack((C0[:, -1], C1[:, -1]), axis=1)
+    M[:, 0, 2:] = np.stack((Cv0[:, 0], Cv1[:, 0]), axis=1)
+    M[:, 1, 2:] = np.stack((Cv0[:, -1], Cv1[:, -1]), axis=1)
+    M[:, 2, :2] = np.stack((Du0[:, 0], Du0[:, -1]), axis=1)
+    M[:, 3, :2] = np.stack((Du1[:, 0], Du1[:, -1]), axis=1)
+    M[:, 2:, 2:] = twists
+
+    Hu, Hv = hermite_table(Nu, dtype), hermite_table(Nv, dtype)
+    Cmat = np.stack((C0, C1, Cv0, Cv1), axis=2)                  # (3, Nu, 4)
+    L = np.concatenate((np.broadcast_to(Hu, (3, Nu, 4)), Cmat - np.einsum('ua,cab->cub', Hu, M)), axis=2)
+    R = np.concatenate((np.stack((D0, D1, Du0, Du1), axis=1), np.broadcast_to(Hv.T, (3, 4, Nv))), axis=1)
+    return tuple(L @ R)
+
+
+def build_surface(P00,P10,P01,P11,amp_C0,amp_C1,amp_D0,amp_D1,Nu=50,Nv=50,dtype=np.float64,blend="linear",
+                  Cv0=None,Cv1=None,Du0=None,Du1=None,twists=None):
+    # blend: "linear" - класичний патч Кунса, "hermite" - бікубічне змішування тих самих кривих.
+    # Для "hermite" Cv0, Cv1 (3, Nu) - похідні dQ/dv уздовж меж v=0, 1, Du0, Du1 (3, Nv) - dQ/du
+    # уздовж u=0, 1, twists (3, 2, 2) - скрут у кутах, як у hermite_surface. Без них похідні
+    # беруться з лінійного патча і поверхня з ним збігається. Сітки із заданими похідними не кешуються
+    cross = (Cv0, Cv1, Du0, Du1, twists)
+    custom = any(c is not None for c in cross)
+    if custom and blend != "hermite":
+        raise ValueError("Похідні поперек меж задаються лише для blend='hermite'")
+    key = (point_key(P00), point_key(P10), point_key(P01), point_key(P11),
+           float(amp_C0), float(amp_C1), float(amp_D0), float(amp_D1), Nu, Nv, np.dtype(dtype).str, blend)
+    cached = None if custom else surface_cache.get(key)
+    if cached is not None:
+        return cached
+
+    if blend == "hermite":
+        cross = [None if c is None else np.asarray(c, dtype=dtype) for c in cross]
+        X, Y, Z = hermite_surface(edge_samples(P00, P10, amp_C0, 2, Nu, dtype),   # C0 зміщена по z
+                                  edge_samples(P01, P11, amp_C1, 0, Nu, dtype),   # C1 зміщена по x
+                                  edge_samples(P00, P01, amp_D0, 0, Nv, dtype),
+                                  edge_samples(P10, P11, amp_D1, 1, Nv, dtype), *cross)
+        return (X, Y, Z) if custom else surface_cache.put(key, (X, Y, Z))
+    if blend != "linear":
+        raise ValueError(f"Невідоме змішування {blend!r}")
+
+    L, R = grid_factors(P00,P10,P01,P11,amp_C0,amp_C1,amp_D0,amp_D1,Nu,Nv,dtype)
+    X, Y, Z = L @ R
+    return surface_cache.put(key, (X, Y, Z))
+
+
+# ---- Диференціальна геометрія ----
+Geometry = namedtuple("Geometry", "points normals K H area")
+
+
+def grid_derivatives(P00,P10,P01,P11,amp_C0,amp_C1,amp_D0,amp_D1,Nu=50,Nv=50,dtype=np.float64):
+    # Q і її похідні на сітці (Nu, Nv, 3) з тих самих множників L @ R, що й build_surface:
+    # Q_u = L_u @ R, Q_v = L @ R_v, Q_uu = L_uu @ R, Q_uv = L_u @ R_v, Q_vv = L @ R_vv
+    L, R = grid_factors(P00,P10,P01,P11,amp_C0,amp_C1,amp_D0,amp_D1,Nu,Nv,dtype)
+    u = np.linspace(0,1,Nu,dtype=dtype)
+    v = np.linspace(0,1,Nv,dtype=dtype)
+    (b0u, b0uu), (b1u, b1uu) = bump_derivatives(u, amp_C0), bump_derivatives(u, amp_C1)
+    (d0v, d0vv), (d1v, d1vv) = bump_derivatives(v, amp_D0), bump_derivatives(v, amp_D1)
+
+    Lu = np.zeros_like(L)
+    Lu[2,:,0], Lu[0,:,1] = b0u, b1u
+    Lu[:,:,2], Lu[:,:,3] = -1, 1
+    Luu = np.zeros_like(L)
+    Luu[2,:,0], Luu[0,:,1] = b0uu, b1uu
+
+    P00,P10,P01,P11 = (np.asarray(P, dtype=dtype) for P in (P00,P10,P01,P11))
+    Rv = np.zeros_like(R)
+    Rv[:,0], Rv[:,1] = -1, 1
+    Rv[:,2] = (P01-P00)[:, None]
+    Rv[:,3] = (P11-P10)[:, None]
+    Rv[0,2] += d0v
+    Rv[1,3] += d1v
+    Rvv = np.zeros_like(R)
+    Rvv[0,2], Rvv[1,3] = d0vv, d1vv
+
+    return tuple(np.moveaxis(a, 0, -1) for a in (L @ R, Lu @ R, L @ Rv, Luu @ R, Lu @ Rv, L @ Rvv))
+
+
+def differential_geometry(Su, Sv, Suu, Suv, Svv):
+    # Нормалі, гаусова K і середня H кривина, елемент площі |Q_u x Q_v|; масиви (..., 3).
+    # У виродженних точках (Q_u || Q_v) нормаль нульова, а кривини - NaN
+    cross = np.cross(Su, Sv)
+    dA = np.linalg.norm(cross, axis=-1)
+    normals = np.divide(cross, dA[..., None], out=np.zeros_like(cross), where=dA[..., None] > 0)
+    E, F, G = (np.einsum('...c,...c->...', a, b) for a, b in ((Su, Su), (Su, Sv), (Sv, Sv)))
+    L, M, N = (np.einsum('...c,...c->...', a, normals) for a in (Suu, Suv, Svv))
+    det = E*G - F*F
+    with np.errstate(divide='ignore', invalid='ignore'):
+        K = np.where(det > 0, (L*N - M*M) / det, np.nan)
+        H = np.where(det > 0, (E*N - 2*F*M + G*L) / (2*det), np.nan)
+    return normals, K, H, dA
+
+
+def surface_geometry(P00,P10,P01,P11,amp_C0,amp_C1,amp_D0,amp_D1,Nu=50,Nv=50,dtype=np.float64):
+    # Точки, нормалі, кривини і площа поверхні за один прохід по сітці.
+    # Площа - інтеграл |Q_u x Q_v| формулою трапецій по тій самій сітці
+    S, Su, Sv, Suu, Suv, Svv = grid_derivatives(P00,P10,P01,P11,amp_C0,amp_C1,amp_D0,amp_D1,Nu,Nv,dtype)
+    normals, K, H, dA = differential_geometry(Su, Sv, Suu, Suv, Svv)
+    wu, wv = (np.full(n, 1.0/(n-1)) for n in (Nu, Nv))
+    wu[[0,-1]] /= 2
+    wv[[0,-1]] /= 2
+    return Geometry(S, normals, K, H, float(wu @ dA @ wv))
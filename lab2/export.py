@@ -0,0 +1,190 @@
+import argparse
+import os
+import sys
+import numpy as np
+
+from coons import DEFAULT_PARAMS, grid_factors
+
+# ---- Потоковий експорт поверхні ----
+# Сітка Nu x Nv обчислюється і записується смугами рядків, тож пам'ять обмежена розміром
+# смуги, а не всієї сітки. Записані файли читаються назад через np.memmap без копіювання.
+# Вершина (i, j) сітки має номер i*Nv + j, кожна клітинка - два трикутники (a,b,c), (a,c,d)
+
+TILE_BYTES = 64 * 2**20      # орієнтовний обсяг пам'яті на одну смугу
+
+STL_DTYPE = np.dtype([("normal", "<f4", (3,)), ("vertices", "<f4", (3, 3)), ("attr", "<u2")])
+PLY_FACE_DTYPE = np.dtype([("count", "u1"), ("vertex_indices", "<i4", (3,))])
+PLY_TYPES = {"float": "<f4", "double": "<f8"}
+
+FORMATS = (".stl", ".ply", ".npy")
+
+
+def detect_format(path, fmt=None):
+    fmt = (fmt or os.path.splitext(path)[1]).lower()
+    fmt = fmt if fmt.startswith(".") else "." + fmt
+    if fmt not in FORMATS:
+        raise ValueError(f"Невідомий формат {fmt!r}, очікується один з {FORMATS}")
+    return fmt
+
+
+def band_rows(Nv, bytes_per_point, tile_bytes=TILE_BYTES):
+    # Кількість рядків сітки в одній смузі
+    return max(1, tile_bytes // max(1, Nv * bytes_per_point))
+
+
+def grid_rows(params, Nu, Nv, rows, overlap=0):
+    # Смуги (i0, точки (r, Nv, 3)); з overlap=1 смуга захоплює перший рядок наступної,
+    # щоб утворити клітинки на межі смуг
+    L, R = grid_factors(*params, Nu, Nv)
+    for i0 in range(0, Nu - overlap, rows):
+        i1 = min(i0 + rows + overlap, Nu)
+        yield i0, np.moveaxis(L[:, i0:i1] @ R, 0, -1)
+
+
+def grid_faces(i0, i1, Nv):
+    # Трикутники клітинок у рядках i0..i1-1, номери вершин глобальні
+    a = np.arange(i0, i1)[:, None] * Nv + np.arange(Nv - 1)
+    b, d = a + Nv, a + 1
+    c = b + 1
+    return np.stack((np.stack((a, b, c), axis=-1), np.stack((a, c, d), axis=-1)), axis=2).reshape(-1, 3)
+
+
+def write_npy(path, params, Nu, Nv, dtype=np.float32, tile_bytes=TILE_BYTES):
+    # Масив (Nu, Nv, 3) у форматі .npy, заповнюється через memmap
+    out = np.lib.format.open_memmap(path, mode="w+", dtype=dtype, shape=(Nu, Nv, 3))
+    try:
+        for i0, points in grid_rows(params, Nu, Nv, band_rows(Nv, 48, tile_bytes)):
+            out[i0:i0 + len(points)] = points
+        out.flush()
+    finally:
+        del out
+
+
+def write_stl(path, params, Nu, Nv, tile_bytes=TILE_BYTES):
+    # Бінарний STL: 80 байтів заголовка, кількість трикутників, записи по 50 байтів
+    count = 2 * (Nu - 1) * (Nv - 1)
+    if count >= 2**32:
+        raise ValueError("Забагато трикутників для бінарного STL")
+    with open(path, "wb") as f:
+        f.write(f"Coons patch {Nu}x{Nv}".encode("ascii").ljust(80, b"\0"))
+        f.write(np.uint32(count).astype("<u4").tobytes())
+        rows = band_rows(Nv, 400, tile_bytes)
+        for i0, points in grid_rows(params, Nu, Nv, rows, overlap=1):
+            tri = points.reshape(-1, 3)[grid_faces(0, len(points) - 1, Nv)]
+            normal = np.cross(tri[:, 1] - tri[:, 0], tri[:, 2] - tri[:, 0])
+            length = np.linalg.norm(normal, axis=1, keepdims=True)
+            np.divide(normal, length, out=normal, where=length > 0)
+            rec = np.zeros(len(tri), dtype=STL_DTYPE)
+            rec["normal"] = normal
+            rec["vertices"] = tri
+            rec.tofile(f)
+
+
+def write_ply(path, params, Nu, Nv, dtype=np.float32, tile_bytes=TILE_BYTES):
+    # Бінарний PLY (little endian): спершу всі вершини, потім трикутники
+    if Nu * Nv >= 2**31:
+        raise ValueError("Забагато вершин для індексів int32 у PLY")
+    vtype = "double" if np.dtype(dtype).itemsize == 8 else "float"
+    header = ("ply\nformat binary_little_endian 1.0\n"
+              f"comment Coons patch {Nu}x{Nv}\n"
+              f"element vertex {Nu * Nv}\n"
+              f"property {vtype} x\nproperty {vtype} y\nproperty {vtype} z\n"
+              f"element face {2 * (Nu - 1) * (Nv - 1)}\n"
+              "property list uchar int vertex_indices\nend_header\n")
+    with open(path, "wb") as f:
+        f.write(header.encode("ascii"))
+        for _, points in grid_rows(params, Nu, Nv, band_rows(Nv, 48, tile_bytes)):
+            points.astype(PLY_TYPES[vtype]).tofile(f)
+        rows = band_rows(Nv, 100, tile_bytes)
+        for i0 in range(0, Nu - 1, rows):
+            faces = grid_faces(i0, min(i0 + rows, Nu - 1), Nv)
+            rec = np.empty(len(faces), dtype=PLY_FACE_DTYPE)
+            rec["count"] = 3
+            rec["vertex_indices"] = faces
+            rec.tofile(f)
+
+
+def export_surface(path, P00,P10,P01,P11,amp_C0,amp_C1,amp_D0,amp_D1, Nu=1000, Nv=1000,
+                   fmt=None, dtype=np.float32, tile_bytes=TILE_BYTES):
+    params = (P00,P10,P01,P11,amp_C0,amp_C1,amp_D0,amp_D1)
+    fmt = detect_format(path, fmt)
+    if fmt == ".stl":
+        write_stl(path, params, Nu, Nv, tile_bytes)     # STL завжди float32
+    elif fmt == ".ply":
+        write_ply(path, params, Nu, Nv, dtype, tile_bytes)
+    else:
+        write_npy(path, params, Nu, Nv, dtype, tile_bytes)
+    return path
+
+
+# ---- Читання без копіювання ----
+def load_npy(path):
+    # Масив (Nu, Nv, 3)
+    return np.load(path, mmap_mode="r")
+
+
+def load_stl(path):
+    # (normals (T, 3), triangles (T, 3, 3)) - подання одного memmap
+    with open(path, "rb") as f:
+        f.seek(80)
+        count = int(np.frombuffer(f.read(4), dtype="<u4")[0])
+    rec = np.memmap(path, dtype=STL_DTYPE, mode="r", offset=84, shape=(count,))
+    return rec["normal"], rec["vertices"]
+
+
+def load_ply(path):
+    # (vertices (V, 3), faces (F, 3)) для PLY, записаного write_ply
+    counts, vtype = {}, None
+    with open(path, "rb") as f:
+        while True:
+            line = f.readline()
+            if not line:
+                raise ValueError("PLY без end_header")
+            words = line.decode("ascii").split()
+            if words[:1] == ["element"]:
+                counts[words[1]] = int(words[2])
+            elif words[:1] == ["property"] and words[1] in PLY_TYPES:
+                vtype = PLY_TYPES[words[1]]
+            elif words == ["end_header"]:
+                offset = f.tell()
+                break
+    V, F = counts["vertex"], counts["face"]
+    vertices = np.memmap(path, dtype=vtype, mode="r", offset=offset, shape=(V, 3))
+    faces = np.memmap(path, dtype=PLY_FACE_DTYPE, mode="r",
+                      offset=offset + vertices.nbytes, shape=(F,))
+    return vertices, faces["vertex_indices"]
+
+
+def load_mesh(path, fmt=None):
+    fmt = detect_format(path, fmt)
+    return {".stl": load_stl, ".ply": load_ply, ".npy": load_npy}[fmt](path)
+
+
+# ---- Командний рядок ----
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Потоковий експорт поверхні Кунса у STL, PLY або .npy")
+    parser.add_argument("output", help="файл результату; формат визначається розширенням")
+    parser.add_argument("--format", choices=[f[1:] for f in FORMATS])
+    parser.add_argument("--nu", type=int, default=1000)
+    parser.add_argument("--nv", type=int, default=1000)
+    parser.add_argument("--double", action="store_true", help="координати float64 (PLY, .npy)")
+    parser.add_argument("--tile-mb", type=float, default=TILE_BYTES / 2**20,
+                        help="орієнтовний обсяг пам'яті на смугу рядків")
+    # Значення за замовчуванням - ті самі, що в GUI (coons.DEFAULT_PARAMS)
+    corners = ("P00", "P10", "P01", "P11")
+    for name in corners:
+        parser.add_argument(f"--{name}", type=float, nargs=3, metavar=("X", "Y", "Z"),
+                            default=[DEFAULT_PARAMS[f"{name}_{axis}"] for axis in "xyz"])
+    for name in ("C0", "C1", "D0", "D1"):
+        parser.add_argument(f"--amp-{name}", type=float, default=DEFAULT_PARAMS[f"amp_{name}"])
+    args = parser.parse_args(argv)
+
+    export_surface(args.output, *(np.array(getattr(args, name)) for name in corners),
+                   args.amp_C0, args.amp_C1, args.amp_D0, args.amp_D1, Nu=args.nu, Nv=args.nv,
+                   fmt=args.format, dtype=np.float64 if args.double else np.float32,
+                   tile_bytes=int(args.tile_mb * 2**20))
+    print(f"{args.output}: {os.path.getsize(args.output)} bytes", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
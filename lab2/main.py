@@ -4,32 +4,88 @@ from tkinter import ttk
 from tkinter import filedialog
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import matplotlib.pyplot as plt
+from matplotlib.colors import to_rgba
 from mpl_toolkits.mplot3d import Axes3D  
+from mpl_toolkits.mplot3d.art3d import Poly3DCollection
 import os
+import threading
 
-def bump(t, amp=0.12, freq=1.0):
-    return amp * np.sin(np.pi * t * freq) ** 2
-
-def Q(u, v, P00, P10, P01, P11, amp_C0, amp_C1, amp_D0, amp_D1):
-    def C0(u): return (1-u)*P00 + u*P10 + np.array([0,0,bump(u, amp=amp_C0)])
-    def C1(u): return (1-u)*P01 + u*P11 + np.array([bump(u, amp=amp_C1),0,0])
-    def D0(v): return (1-v)*P00 + v*P01 + np.array([bump(v, amp=amp_D0),0,0])
-    def D1(v): return (1-v)*P10 + v*P11 + np.array([0,bump(v, amp=amp_D1),0])
-    B = (1-u)*(1-v)*P00 + u*(1-v)*P10 + (1-u)*v*P01 + u*v*P11
-    return (1-v)*C0(u) + v*C1(u) + (1-u)*D0(v) + u*D1(v) - B
-
-# ---- Функція побудови поверхні ----
-def build_surface(P00,P10,P01,P11,amp_C0,amp_C1,amp_D0,amp_D1,Nu=50,Nv=50):
-    u_vals = np.linspace(0,1,Nu)
-    v_vals = np.linspace(0,1,Nv)
-    X = np.zeros((Nu,Nv))
-    Y = np.zeros((Nu,Nv))
-    Z = np.zeros((Nu,Nv))
-    for i,u in enumerate(u_vals):
-        for j,v in enumerate(v_vals):
-            pt = Q(u,v,P00,P10,P01,P11,amp_C0,amp_C1,amp_D0,amp_D1)
-            X[i,j], Y[i,j], Z[i,j] = pt
-    return X, Y, Z
+from coons import build_surface
+from tessellation import tessellate
+from export import export_surface
+from render import ProjectionRenderer
+
+
+# ---- Фонове обчислення поверхні ----
+PREVIEW_RES = 15     # роздільність попереднього перегляду під час руху повзунка
+FULL_RES = 50        # роздільність після зупинки повзунка
+DEBOUNCE_MS = 200    # пауза, після якої рух повзунка вважається завершеним
+PREVIEW_TOL = 1e-2   # допуск адаптивної сітки для попереднього перегляду
+FULL_TOL = 1e-3      # допуск адаптивної сітки після зупинки повзунка
+POLL_MS = 16         # як часто GUI забирає готові результати (~1 кадр)
+EXPORT_RES = 1000    # роздільність сітки, що записується у файл
+
+
+def surface_polygons(X, Y, Z):
+    # Чотирикутники сітки з тим самим порядком вершин, що й у plot_surface(rstride=1, cstride=1)
+    P = np.stack((X, Y, Z), axis=-1)
+    return np.stack((P[:-1,:-1], P[:-1,1:], P[1:,1:], P[1:,:-1]), axis=2).reshape(-1, 4, 3)
+
+
+def surface_artist(surface, adaptive):
+    # Колекція граней з уже затіненими кольорами і дані для меж осей (x, y, z) - те саме,
+    # що будують plot_surface / plot_trisurf, але без осей, тож це можна робити у фоновому потоці
+    if adaptive:
+        vertices, triangles, uv = surface
+        polys = vertices[triangles]
+        style = dict(linewidth=0.2, edgecolor='k', alpha=0.9)
+        data = vertices.T
+    else:
+        polys = surface_polygons(*surface)
+        style = dict(linewidth=0, alpha=0.9)
+        data = surface
+    # C0 - перший колір циклу, який plot_surface бере для щойно очищених осей
+    return Poly3DCollection(polys, facecolors=to_rgba("C0"), shade=True, **style), data
+
+
+class SurfaceWorker:
+    # Потік, що рахує поверхню поза циклом Tk. Зберігається лише найновіший запит:
+    # якщо повзунок рухається швидше, ніж рахується поверхня, проміжні запити відкидаються.
+    # Разом із сіткою готуються і грані для matplotlib, щоб потоку Tk лишилося лише їх показати
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._request = None
+        self._result = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, generation, params, N, adaptive=False):
+        with self._cond:
+            self._request = (generation, params, N, adaptive)
+            self._cond.notify()
+
+    def take_result(self):
+        with self._cond:
+            result, self._result = self._result, None
+        return result
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._request is None:
+                    self._cond.wait()
+                generation, params, N, adaptive = self._request
+                self._request = None
+            if adaptive:
+                # Адаптивна сітка: (vertices, triangles, uv); допуск залежить від етапу
+                surface = tessellate(*params, tol=FULL_TOL if N == FULL_RES else PREVIEW_TOL)
+            else:
+                surface = build_surface(*params, Nu=N, Nv=N)
+            artist = surface_artist(surface, adaptive)
+            with self._cond:
+                # Повна сітка тієї ж генерації не поступається попередньому перегляду
+                if self._result is None or self._result[:2] <= (generation, N):
+                    self._result = (generation, N, adaptive, surface, artist)
 
 # ---- Головна Tkinter аплікація ----
 class CoonsApp:
@@ -66,6 +122,14 @@ class CoonsApp:
         btn_save = ttk.Button(root, text="Save Projections", command=self.save_projections)
         btn_save.grid(row=6, column=2, columnspan=2, sticky="we", pady=5)
 
+        self.adaptive = tk.BooleanVar(value=False)
+        chk_adaptive = ttk.Checkbutton(root, text="Adaptive mesh", variable=self.adaptive,
+                                       command=self.update_surface)
+        chk_adaptive.grid(row=5, column=0, columnspan=2, sticky="w", pady=5)
+
+        btn_export = ttk.Button(root, text="Export Mesh", command=self.export_mesh)
+        btn_export.grid(row=5, column=2, columnspan=2, sticky="we", pady=5)
+
         self.fig = plt.figure(figsize=(7,5))
         self.ax = self.fig.add_subplot(111, projection='3d')
         self.canvas = FigureCanvasTkAgg(self.fig, master=root)
@@ -73,6 +137,16 @@ class CoonsApp:
         
         self.canvas.mpl_connect("scroll_event", self.zoom)
 
+        # ---- Живе оновлення під час руху повзунків ----
+        self.generation = 0          # номер останньої зміни параметрів
+        self.debounce_job = None
+        self.worker = SurfaceWorker()
+        self.renderer = ProjectionRenderer(N=FULL_RES)
+        for var in self.params.values():
+            var.trace_add("write", self.on_param_change)
+        self.root.after(POLL_MS, self.poll_surface)
+        root.protocol("WM_DELETE_WINDOW", self.close)
+
         self.update_surface()
 
     def create_sliders(self):
@@ -90,7 +164,7 @@ class CoonsApp:
                 col=0
                 row += 1
 
-    def update_surface(self):
+    def get_params(self):
         P00 = np.array([self.params["P00_x"].get(), self.params["P00_y"].get(), self.params["P00_z"].get()])
         P10 = np.array([self.params["P10_x"].get(), self.params["P10_y"].get(), self.params["P10_z"].get()])
         P01 = np.array([self.params["P01_x"].get(), self.params["P01_y"].get(), self.params["P01_z"].get()])
@@ -99,14 +173,64 @@ class CoonsApp:
         amp_C1 = self.params["amp_C1"].get()
         amp_D0 = self.params["amp_D0"].get()
         amp_D1 = self.params["amp_D1"].get()
+        return P00,P10,P01,P11,amp_C0,amp_C1,amp_D0,amp_D1
 
-        X,Y,Z = build_surface(P00,P10,P01,P11,amp_C0,amp_C1,amp_D0,amp_D1)
+    def update_surface(self):
+        # Результати фонового потоку для попередніх параметрів стають застарілими
+        self.generation += 1
+        if self.debounce_job is not None:
+            self.root.after_cancel(self.debounce_job)
+            self.debounce_job = None
+        if self.adaptive.get():
+            self.draw_mesh(*tessellate(*self.get_params(), tol=FULL_TOL))
+        else:
+            X,Y,Z = build_surface(*self.get_params(), Nu=FULL_RES, Nv=FULL_RES)
+            self.draw_surface(X,Y,Z)
+        self.canvas.draw()
 
-        self.ax.clear()
-        self.ax.plot_surface(X,Y,Z,rstride=1,cstride=1,linewidth=0, alpha=0.9)
+    def show_artist(self, artist, title):
+        # Підстановка готових граней: на потоці Tk лишаються тільки межі осей і підписи.
+        # Замість ax.clear(), який перебудовує осі й поділки, замінюється лише колекція
+        collection, (x, y, z) = artist
+        for old in list(self.ax.collections):
+            old.remove()
+        self.ax.add_collection3d(collection, autolim=False)
+        self.ax.autoscale()          # після масштабування колесом межі знову за даними, як після clear()
+        self.ax.auto_scale_xyz(x, y, z, had_data=False)
         self.ax.set_xlabel('x'); self.ax.set_ylabel('y'); self.ax.set_zlabel('z')
-        self.ax.set_title("Coons Patch 3D Surface")
-        self.canvas.draw()
+        self.ax.set_title(title)
+
+    def draw_surface(self, X, Y, Z, artist=None):
+        self.show_artist(artist or surface_artist((X, Y, Z), False), "Coons Patch 3D Surface")
+
+    def draw_mesh(self, vertices, triangles, uv, artist=None):
+        # Трикутники адаптивної сітки: дрібні там, де поверхня викривлена
+        self.show_artist(artist or surface_artist((vertices, triangles, uv), True),
+                         f"Coons Patch 3D Surface ({len(triangles)} triangles)")
+
+    def on_param_change(self, *args):
+        # Одразу - грубий попередній перегляд, повна сітка - коли повзунок зупиниться
+        self.generation += 1
+        self.worker.submit(self.generation, self.get_params(), PREVIEW_RES, self.adaptive.get())
+        if self.debounce_job is not None:
+            self.root.after_cancel(self.debounce_job)
+        self.debounce_job = self.root.after(DEBOUNCE_MS, self.request_full_surface)
+
+    def request_full_surface(self):
+        self.debounce_job = None
+        self.worker.submit(self.generation, self.get_params(), FULL_RES, self.adaptive.get())
+
+    def poll_surface(self):
+        result = self.worker.take_result()
+        if result is not None:
+            generation, N, adaptive, surface, artist = result
+            if generation == self.generation:
+                if adaptive:
+                    self.draw_mesh(*surface, artist=artist)
+                else:
+                    self.draw_surface(*surface, artist=artist)
+                self.canvas.draw_idle()
+        self.root.after(POLL_MS, self.poll_surface)
 
     def zoom(self, event):
         scale_factor = 1.2 if event.button == 'up' else 0.8
@@ -131,53 +255,27 @@ class CoonsApp:
 
 
     def save_projections(self):
-        import os
-        P00 = np.array([self.params["P00_x"].get(), self.params["P00_y"].get(), self.params["P00_z"].get()])
-        P10 = np.array([self.params["P10_x"].get(), self.params["P10_y"].get(), self.params["P10_z"].get()])
-        P01 = np.array([self.params["P01_x"].get(), self.params["P01_y"].get(), self.params["P01_z"].get()])
-        P11 = np.array([self.params["P11_x"].get(), self.params["P11_y"].get(), self.params["P11_z"].get()])
-        amp_C0 = self.params["amp_C0"].get()
-        amp_C1 = self.params["amp_C1"].get()
-        amp_D0 = self.params["amp_D0"].get()
-        amp_D1 = self.params["amp_D1"].get()
-
-        X, Y, Z = build_surface(P00, P10, P01, P11, amp_C0, amp_C1, amp_D0, amp_D1)
-
+        # Проекції рендеряться паралельно в пулі процесів без pyplot
         save_dir = os.getcwd()
-
-        # ---- 3D поверхня ----
-        fig1 = plt.figure()
-        ax1 = fig1.add_subplot(111, projection='3d')
-        ax1.plot_surface(X,Y,Z,rstride=1,cstride=1,linewidth=0, alpha=0.9, cmap='viridis')
-        fig1.savefig(os.path.join(save_dir, "coons_surface_3D.png"))
-        plt.close(fig1)
-
-        # ---- Проекція x=0 (yz) ----
-        fig2 = plt.figure()
-        plt.pcolormesh(Y, Z, Z, shading='auto', cmap='viridis')
-        plt.xlabel('y'); plt.ylabel('z'); plt.title('Projection x=0 (yz)')
-        plt.colorbar(label='z')
-        fig2.savefig(os.path.join(save_dir, "coons_surface_x0.png"))
-        plt.close(fig2)
-
-        # ---- Проекція y=0 (xz) ----
-        fig3 = plt.figure()
-        plt.pcolormesh(X, Z, Z, shading='auto', cmap='viridis')
-        plt.xlabel('x'); plt.ylabel('z'); plt.title('Projection y=0 (xz)')
-        plt.colorbar(label='z')
-        fig3.savefig(os.path.join(save_dir, "coons_surface_y0.png"))
-        plt.close(fig3)
-
-        # ---- Проекція z=0 (xy) ----
-        fig4 = plt.figure()
-        plt.pcolormesh(X, Y, Z, shading='auto', cmap='viridis')
-        plt.xlabel('x'); plt.ylabel('y'); plt.title('Projection z=0 (xy)')
-        plt.colorbar(label='z')
-        fig4.savefig(os.path.join(save_dir, "coons_surface_z0.png"))
-        plt.close(fig4)
+        self.renderer.render(self.get_params(), save_dir)
 
         tk.messagebox.showinfo("Saved", f"Files saved in:\n{save_dir}")
 
+    def export_mesh(self):
+        # Геометрія поверхні у файл; сітка пишеться смугами, без фігур matplotlib
+        path = filedialog.asksaveasfilename(
+            defaultextension=".stl",
+            filetypes=[("Binary STL", "*.stl"), ("Binary PLY", "*.ply"), ("NumPy array", "*.npy")])
+        if not path:
+            return
+        export_surface(path, *self.get_params(), Nu=EXPORT_RES, Nv=EXPORT_RES)
+        tk.messagebox.showinfo("Saved", f"Mesh {EXPORT_RES}x{EXPORT_RES} saved in:\n{path}")
+
+    def close(self):
+        # Процеси пулу рендерингу завершуються разом з вікном
+        self.renderer.close()
+        self.root.destroy()
+
 if __name__ == "__main__":
     root = tk.Tk()
     app = CoonsApp(root)
@@ -0,0 +1,113 @@
+import numpy as np
+
+# ---- Сітка патчів Кунса зі спільними межами ----
+# Сітка nu x nv патчів задається вузлами corners (nu+1, nv+1, 3) і кривими між ними.
+# Крива - це відрізок між двома вузлами плюс bump-зміщення sin^2(pi*t) * вектор амплітуди:
+#   u_amp (nu, nv+1, 3) - криві вздовж u (C0, C1 патчів), крива (i, j) з'єднує вузли (i, j), (i+1, j)
+#   v_amp (nu+1, nv, 3) - криві вздовж v (D0, D1 патчів), крива (i, j) з'єднує вузли (i, j), (i, j+1)
+# Патч (i, j) має C0 = u[i, j], C1 = u[i, j+1], D0 = v[i, j], D1 = v[i+1, j]. Кожна крива
+# зберігається один раз, тож сусідні патчі інтерполюють ту саму криву на спільному шві.
+
+
+def bump_profile(t):
+    # sin^2(pi*t) з точними нулями на кінцях, щоб кінці кривих збігалися з вузлами
+    b = np.sin(np.pi * t) ** 2
+    b[(t == 0) | (t == 1)] = 0
+    return b
+
+
+class PatchGrid:
+    def __init__(self, corners, u_amp=None, v_amp=None):
+        self.corners = np.ascontiguousarray(corners, dtype=float)
+        nu, nv = self.corners.shape[0] - 1, self.corners.shape[1] - 1
+        if nu < 1 or nv < 1 or self.corners.shape[2:] != (3,):
+            raise ValueError("corners має бути масивом (nu+1, nv+1, 3)")
+        self.nu, self.nv = nu, nv
+        self.u_amp = np.zeros((nu, nv + 1, 3)) if u_amp is None else np.ascontiguousarray(u_amp, dtype=float)
+        self.v_amp = np.zeros((nu + 1, nv, 3)) if v_amp is None else np.ascontiguousarray(v_amp, dtype=float)
+        if self.u_amp.shape != (nu, nv + 1, 3) or self.v_amp.shape != (nu + 1, nv, 3):
+            raise ValueError("u_amp має бути (nu, nv+1, 3), v_amp - (nu+1, nv, 3)")
+
+    @classmethod
+    def from_params(cls, P00,P10,P01,P11,amp_C0,amp_C1,amp_D0,amp_D1):
+        # Один патч, що збігається з Q() і build_surface
+        corners = np.array([[P00, P01], [P10, P11]], dtype=float)
+        u_amp = np.array([[[0, 0, amp_C0], [amp_C1, 0, 0]]], dtype=float)
+        v_amp = np.array([[[amp_D0, 0, 0]], [[0, amp_D1, 0]]], dtype=float)
+        return cls(corners, u_amp, v_amp)
+
+    @property
+    def shape(self):
+        return self.nu, self.nv
+
+    def curves(self, N):
+        # Вибірки всіх кривих у N точках: (nu, nv+1, N, 3) і (nu+1, nv, N, 3)
+        t = np.linspace(0, 1, N)
+        b = bump_profile(t)[:, None]
+        c = self.corners
+        u_curves = ((1 - t)[:, None] * c[:-1, :, None] + t[:, None] * c[1:, :, None] +
+                    b * self.u_amp[:, :, None])
+        v_curves = ((1 - t)[:, None] * c[:, :-1, None] + t[:, None] * c[:, 1:, None] +
+                    b * self.v_amp[:, :, None])
+        return u_curves, v_curves
+
+    def evaluate(self, N=50):
+        # Усі патчі одним пакетним matmul; результат (nu, nv, N, N, 3), осі - (i, j, u, v).
+        # Для кожного патча і координати Q = L(u) @ R(v), як у build_surface:
+        #   L = [bump(u)*a(C0), bump(u)*a(C1), 1-u, u],  R = [1-v, v, D0(v), D1(v)]
+        t = np.linspace(0, 1, N)
+        b = bump_profile(t)
+        u_curves, v_curves = self.curves(N)
+        nu, nv = self.shape
+
+        L = np.empty((nu, nv, 3, N, 4))
+        L[..., 0] = self.u_amp[:, :-1, :, None] * b
+        L[..., 1] = self.u_amp[:, 1:, :, None] * b
+        L[..., 2] = 1 - t
+        L[..., 3] = t
+
+        R = np.empty((nu, nv, 3, 4, N))
+        R[:, :, :, 0] = 1 - t
+        R[:, :, :, 1] = t
+        R[:, :, :, 2] = np.moveaxis(v_curves[:-1], -1, 2)
+        R[:, :, :, 3] = np.moveaxis(v_curves[1:], -1, 2)
+
+        S = np.moveaxis(L @ R, 2, -1)
+        # Межові рядки беруться прямо зі спільних кривих: шви сусідніх патчів збігаються побітово
+        S[:, :, :, 0] = u_curves[:, :-1]
+        S[:, :, :, -1] = u_curves[:, 1:]
+        S[:, :, 0] = v_curves[:-1]
+        S[:, :, -1] = v_curves[1:]
+        return S
+
+    def evaluate_at(self, i, j, u, v):
+        # Точки (u, v) патчів (i, j); масиви однакової форми, результат (..., 3)
+        i, j = np.asarray(i), np.asarray(j)
+        u = np.asarray(u, dtype=float)[..., None]
+        v = np.asarray(v, dtype=float)[..., None]
+        c = self.corners
+        P00, P10, P01, P11 = c[i, j], c[i + 1, j], c[i, j + 1], c[i + 1, j + 1]
+        bu = np.sin(np.pi * u) ** 2
+        bv = np.sin(np.pi * v) ** 2
+        S = (1-u)*(1-v)*P00 + u*(1-v)*P10 + (1-u)*v*P01 + u*v*P11
+        S += (1-v)*bu*self.u_amp[i, j] + v*bu*self.u_amp[i, j + 1]
+        S += (1-u)*bv*self.v_amp[i, j] + u*bv*self.v_amp[i + 1, j]
+        return S
+
+    def assemble(self, N=50, patches=None):
+        # Спільна сітка (nu*(N-1)+1, nv*(N-1)+1, 3): дублікати на швах відкидаються
+        S = self.evaluate(N) if patches is None else patches
+        nu, nv = self.shape
+        n = N - 1
+        grid = np.empty((nu * n + 1, nv * n + 1, 3))
+        grid[:-1, :-1] = S[:, :, :-1, :-1].transpose(0, 2, 1, 3, 4).reshape(nu * n, nv * n, 3)
+        grid[-1, :-1] = S[-1, :, -1, :-1].reshape(nv * n, 3)
+        grid[:-1, -1] = S[:, -1, :-1, -1].reshape(nu * n, 3)
+        grid[-1, -1] = S[-1, -1, -1, -1]
+        return grid
+
+    def seam_gap(self, patches):
+        # Найбільший розрив між сусідніми патчами на спільних швах (0 для C0-неперервності)
+        gap_u = np.abs(patches[1:, :, 0] - patches[:-1, :, -1]).max(initial=0)
+        gap_v = np.abs(patches[:, 1:, :, 0] - patches[:, :-1, :, -1]).max(initial=0)
+        return max(gap_u, gap_v)
@@ -0,0 +1,314 @@
+import numpy as np
+
+from coons import derivatives, evaluate, grid_derivatives
+
+# ---- Запити до поверхні Кунса: найближча точка і перетин з променем ----
+# Патч розбивається на n x n клітинок (n = 2**depth), над ними будується ієрархія обмежувальних
+# паралелепіпедів (BVH) у формі квадродерева: вузол рівня l покриває блок 2**(depth-l) клітинок.
+# Запити обходять дерево пакетом, рівень за рівнем, для всіх точок одночасно, а кандидати
+# з листків уточнюються методом Ньютона на аналітичній Q(u, v).
+
+CHUNK = 65536          # кількість запитів, що обробляються одним пакетом
+NEWTON_STEPS = 12
+NEWTON_TOL = 1e-9
+
+
+class SurfaceBVH:
+    def __init__(self, P00,P10,P01,P11,amp_C0,amp_C1,amp_D0,amp_D1, depth=6):
+        self.params = (P00,P10,P01,P11,amp_C0,amp_C1,amp_D0,amp_D1)
+        self.depth = depth
+        n = self.n = 1 << depth
+        S, _, _, Suu, _, Svv = grid_derivatives(*self.params, Nu=n + 1, Nv=n + 1)
+        self.vertices = S
+
+        # Листки: межі чотирьох кутів клітинки плюс запас на випуклість поверхні між ними.
+        # Похибка білінійної інтерполяції не перевищує (h^2/8)(|Q_uu| + |Q_vv|), h = 1/n;
+        # максимум по кутах множиться на 2 як запас на значення всередині клітинки
+        corners = np.stack((S[:-1, :-1], S[1:, :-1], S[:-1, 1:], S[1:, 1:]))
+        curv = np.abs(Suu) + np.abs(Svv)
+        curv = np.stack((curv[:-1, :-1], curv[1:, :-1], curv[:-1, 1:], curv[1:, 1:])).max(axis=0)
+        pad = 2 * curv / (8 * n * n) + 1e-12
+        lo, hi = corners.min(axis=0) - pad, corners.max(axis=0) + pad
+        # Поверхня клітинки відхиляється від її двох трикутників не більше ніж на цей запас:
+        # похибка білінійної інтерполяції плюс відхилення білінійного патча від трикутників
+        twist = np.linalg.norm(S[:-1, :-1] - S[1:, :-1] - S[:-1, 1:] + S[1:, 1:], axis=-1)
+        self.slack = np.linalg.norm(pad, axis=-1) + twist / 4
+
+        # Рівні дерева від кореня (1 x 1) до листків (n x n)
+        self.lo, self.hi, self.rep = [None] * (depth + 1), [None] * (depth + 1), [None] * (depth + 1)
+        self.lo[depth], self.hi[depth] = lo, hi
+        for level in range(depth - 1, -1, -1):
+            m = 1 << level
+            self.lo[level] = self.lo[level + 1].reshape(m, 2, m, 2, 3).min(axis=(1, 3))
+            self.hi[level] = self.hi[level + 1].reshape(m, 2, m, 2, 3).max(axis=(1, 3))
+        # Точка поверхні в центрі кожного вузла дає верхню оцінку відстані
+        for level in range(depth + 1):
+            c = (np.arange(1 << level) + 0.5) / (1 << level)
+            U, V = np.meshgrid(c, c, indexing="ij")
+            self.rep[level] = evaluate(U, V, *self.params)
+
+    # ---- Найближча точка ----
+    def closest_point(self, points, chunk=CHUNK):
+        # Повертає (u, v, distance) для кожної точки (N, 3)
+        points = np.asarray(points, dtype=float).reshape(-1, 3)
+        u, v, dist = (np.empty(len(points)) for _ in range(3))
+        for start in range(0, len(points), chunk):
+            part = slice(start, start + chunk)
+            u[part], v[part], dist[part] = self._closest_chunk(points[part])
+        return u, v, dist
+
+    def _closest_chunk(self, points):
+        Q = len(points)
+        q = np.arange(Q)
+        a = b = np.zeros(Q, dtype=np.intp)
+        best = np.full(Q, np.inf)   # квадрат верхньої оцінки відстані
+        for level in range(self.depth + 1):
+            p = points[q]
+            lb = (np.maximum(0, np.maximum(self.lo[level][a, b] - p, p - self.hi[level][a, b])) ** 2).sum(axis=1)
+            ub = ((self.rep[level][a, b] - p) ** 2).sum(axis=1)
+            np.minimum.at(best, q, ub)
+            keep = lb <= best[q] * (1 + 1e-9)
+            q, a, b = q[keep], a[keep], b[keep]
+            if level < self.depth:
+                # Чотири дочірні вузли кожного вузла, що лишився
+                q = np.repeat(q, 4)
+                a = np.repeat(2 * a, 4) + np.tile([0, 0, 1, 1], len(a))
+                b = np.repeat(2 * b, 4) + np.tile([0, 1, 0, 1], len(b))
+
+        # Для листків точніша нижня оцінка - відстань до трикутників клітинки мінус запас.
+        # Спершу Ньютон лише з найближчої клітинки кожної точки: знайдений локальний мінімум
+        # відкидає решту кандидатів, чия нижня оцінка вже гірша. Відкидати можна лише за
+        # результатом, що справді зійшовся, інакше перевіряються всі клітинки-кандидати
+        p = points[q]
+        S = self.vertices
+        tri = np.minimum(triangle_distance(p, S[a, b], S[a + 1, b], S[a + 1, b + 1]),
+                         triangle_distance(p, S[a, b], S[a + 1, b + 1], S[a, b + 1]))
+        lb = np.maximum(0, tri - self.slack[a, b]) ** 2
+        order = np.lexsort((tri, q))
+        first = order[np.unique(q[order], return_index=True)[1]]
+        u, v, d2, converged = self._newton_closest(points[q[first]], (a[first] + 0.5) / self.n,
+                                                   (b[first] + 0.5) / self.n)
+        best[q[first]] = d2
+        best_u, best_v = np.zeros(Q), np.zeros(Q)
+        best_u[q[first]], best_v[q[first]] = u, v
+        bound = np.full(Q, np.inf)
+        bound[q[first]] = np.where(converged, d2, np.inf)
+
+        rest = lb < bound[q] * (1 - 1e-9)
+        rest[first] = False
+        q, a, b = q[rest], a[rest], b[rest]
+        u, v, d2, _ = self._newton_closest(points[q], (a + 0.5) / self.n, (b + 0.5) / self.n)
+        order = np.lexsort((d2, q))
+        first = order[np.unique(q[order], return_index=True)[1]]
+        better = d2[first] < best[q[first]]
+        q, first = q[first][better], first[better]
+        best[q], best_u[q], best_v[q] = d2[first], u[first], v[first]
+        return best_u, best_v, np.sqrt(best)
+
+    def _newton_closest(self, p, u, v):
+        # Мінімізація |Q(u,v) - p|^2 / 2 у квадраті [0,1]^2. Де гессіан не додатно визначений,
+        # береться крок Гаусса-Ньютона (без других похідних). На межі квадрата, якщо градієнт
+        # виводить назовні, змінна фіксується і крок робиться лише по іншій. Крок, що збільшує
+        # відстань, зменшується вдвічі, тож результат не гірший за початкову точку.
+        # Якщо жодна з половин кроку Ньютона не зменшує відстань, пробується проєкція
+        # градієнтного кроку з масштабом Гаусса-Ньютона.
+        # Повертає також маску точок, де проєкція градієнта на квадрат справді зникла
+        u, v = u.copy(), v.copy()
+        d2 = ((evaluate(u, v, *self.params) - p) ** 2).sum(axis=1)
+        active = np.arange(len(p))
+        for _ in range(NEWTON_STEPS):
+            if not len(active):
+                break
+            ua, va, pa = u[active], v[active], p[active]
+            S, Su, Sv, Suu, Suv, Svv = derivatives(ua, va, *self.params)
+            d = S - pa
+            gu, gv = (Su * d).sum(axis=1), (Sv * d).sum(axis=1)
+            E, F, G = (Su * Su).sum(axis=1), (Su * Sv).sum(axis=1), (Sv * Sv).sum(axis=1)
+            huu, huv, hvv = E + (Suu * d).sum(axis=1), F + (Suv * d).sum(axis=1), G + (Svv * d).sum(axis=1)
+            fix_u = ((ua <= 0) & (gu > 0)) | ((ua >= 1) & (gu < 0))
+            fix_v = ((va <= 0) & (gv > 0)) | ((va >= 1) & (gv < 0))
+            # Одновимірні кроки вздовж межі
+            cu = np.where(huu > 0, huu, E)
+            cv = np.where(hvv > 0, hvv, G)
+            newton = (huu * hvv - huv * huv > 0) & (huu > 0)
+            huu, huv, hvv = np.where(newton, huu, E), np.where(newton, huv, F), np.where(newton, hvv, G)
+            det = huu * hvv - huv * huv
+            det = np.where(det > 0, det, np.inf)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                step_u = np.where(fix_v, gu / cu, (hvv * gu - huv * gv) / det)
+                step_v = np.where(fix_u, gv / cv, (huu * gv - huv * gu) / det)
+                grad_u, grad_v = gu / E, gv / G
+            for step in (step_u, step_v, grad_u, grad_v):
+                step[~np.isfinite(step)] = 0
+            step_u[fix_u] = 0
+            step_v[fix_v] = 0
+            # Крок укорочується до межі квадрата, а не обрізається по ній: обрізаний крок змінює
+            # напрям і може перестрибнути в інший локальний мінімум уздовж межі
+            with np.errstate(divide='ignore', invalid='ignore'):
+                room_u = np.where(step_u > 0, ua, 1 - ua) / np.abs(step_u)
+                room_v = np.where(step_v > 0, va, 1 - va) / np.abs(step_v)
+            scale = np.minimum(1, np.fmin(room_u, room_v))
+            scale[np.isnan(scale)] = 1
+            step_u *= scale
+            step_v *= scale
+
+            moved = np.zeros(len(active), dtype=bool)
+            pending = np.arange(len(active))
+            for step_u, step_v in ((step_u, step_v), (grad_u, grad_v)):
+                for _ in range(8):
+                    un = clip_unit(ua[pending] - step_u[pending])
+                    vn = clip_unit(va[pending] - step_v[pending])
+                    dn = ((evaluate(un, vn, *self.params) - pa[pending]) ** 2).sum(axis=1)
+                    ok = dn <= d2[active[pending]]
+                    idx = active[pending[ok]]
+                    moved[pending[ok]] = (np.abs(u[idx] - un[ok]) + np.abs(v[idx] - vn[ok])) > 1e-13
+                    u[idx], v[idx], d2[idx] = un[ok], vn[ok], dn[ok]
+                    pending = pending[~ok]
+                    if not len(pending):
+                        break
+                    step_u[pending] /= 2
+                    step_v[pending] /= 2
+            # Точки, що вже не рухаються, зупиняються
+            active = active[moved]
+
+        # Збіжність: дотична складова Q - p, без складових, що виводять за межу квадрата
+        S, Su, Sv = derivatives(u, v, *self.params)[:3]
+        d = S - p
+        gu, gv = (Su * d).sum(axis=1), (Sv * d).sum(axis=1)
+        gu[((u <= 0) & (gu > 0)) | ((u >= 1) & (gu < 0))] = 0
+        gv[((v <= 0) & (gv > 0)) | ((v >= 1) & (gv < 0))] = 0
+        with np.errstate(divide='ignore', invalid='ignore'):
+            residual = np.hypot(gu / np.linalg.norm(Su, axis=1), gv / np.linalg.norm(Sv, axis=1))
+        converged = residual <= NEWTON_TOL * (1 + np.sqrt(d2))
+        return u, v, d2, converged
+
+    # ---- Перетин з променем ----
+    def intersect(self, origins, directions, chunk=CHUNK, tol=1e-10):
+        # Повертає (hit, t, u, v): найближчий перетин променя o + t*d, t >= 0, з патчем
+        origins = np.asarray(origins, dtype=float).reshape(-1, 3)
+        directions = np.broadcast_to(np.asarray(directions, dtype=float), origins.shape)
+        hit = np.zeros(len(origins), dtype=bool)
+        t, u, v = (np.full(len(origins), np.nan) for _ in range(3))
+        for start in range(0, len(origins), chunk):
+            part = slice(start, start + chunk)
+            hit[part], t[part], u[part], v[part] = self._intersect_chunk(origins[part], directions[part], tol)
+        return hit, t, u, v
+
+    def _intersect_chunk(self, origins, directions, tol):
+        R = len(origins)
+        inv = 1 / np.where(directions == 0, 1e-300, directions)
+        q = np.arange(R)
+        a = b = np.zeros(R, dtype=np.intp)
+        for level in range(self.depth + 1):
+            o, di = origins[q], inv[q]
+            t1 = (self.lo[level][a, b] - o) * di
+            t2 = (self.hi[level][a, b] - o) * di
+            t_near = np.minimum(t1, t2).max(axis=1)
+            t_far = np.maximum(t1, t2).min(axis=1)
+            keep = t_far >= np.maximum(t_near, 0)
+            q, a, b = q[keep], a[keep], b[keep]
+            if level < self.depth:
+                q = np.repeat(q, 4)
+                a = np.repeat(2 * a, 4) + np.tile([0, 0, 1, 1], len(a))
+                b = np.repeat(2 * b, 4) + np.tile([0, 1, 0, 1], len(b))
+
+        # Початкове наближення: перетин з трикутниками клітинки, інакше - її центр
+        u0, v0, t0 = self._triangle_guess(origins[q], directions[q], a, b)
+        u, v, t, ok = self._newton_ray(origins[q], directions[q], u0, v0, t0, tol)
+        q, u, v, t = q[ok], u[ok], v[ok], t[ok]
+        order = np.lexsort((t, q))
+        q, first = np.unique(q[order], return_index=True)
+        hit = np.zeros(R, dtype=bool)
+        best_t, best_u, best_v = (np.full(R, np.nan) for _ in range(3))
+        hit[q] = True
+        best_t[q], best_u[q], best_v[q] = t[order][first], u[order][first], v[order][first]
+        return hit, best_t, best_u, best_v
+
+    def _triangle_guess(self, o, d, a, b):
+        # Меллер-Трумбор для трикутників (00, 10, 11) і (00, 11, 01) клітинки (a, b)
+        S, n = self.vertices, self.n
+        p00, p10, p01, p11 = S[a, b], S[a + 1, b], S[a, b + 1], S[a + 1, b + 1]
+        u = (a + 0.5) / n
+        v = (b + 0.5) / n
+        t = ((evaluate(u, v, *self.params) - o) * d).sum(axis=1) / (d * d).sum(axis=1)
+        for p1, p2, (du1, dv1), (du2, dv2) in ((p10, p11, (1, 0), (1, 1)), (p11, p01, (1, 1), (0, 1))):
+            e1, e2 = p1 - p00, p2 - p00
+            h = np.cross(d, e2)
+            det = (e1 * h).sum(axis=1)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                s = o - p00
+                bu = (s * h).sum(axis=1) / det
+                qv = np.cross(s, e1)
+                bv = (d * qv).sum(axis=1) / det
+                tt = (e2 * qv).sum(axis=1) / det
+            inside = (np.abs(det) > 0) & (bu >= 0) & (bv >= 0) & (bu + bv <= 1) & (tt >= 0)
+            u = np.where(inside, (a + bu * du1 + bv * du2) / n, u)
+            v = np.where(inside, (b + bu * dv1 + bv * dv2) / n, v)
+            t = np.where(inside, tt, t)
+        return u, v, t
+
+    def _newton_ray(self, o, d, u, v, t, tol):
+        # Розв'язок Q(u, v) - (o + t*d) = 0 як системи 3x3 [Q_u, Q_v, -d] * (du, dv, dt) = -F
+        for _ in range(NEWTON_STEPS):
+            S, Su, Sv = derivatives(u, v, *self.params)[:3]
+            F = S - o - t[:, None] * d
+            J = np.stack((Su, Sv, -d), axis=2)
+            singular = np.abs(np.linalg.det(J)) < 1e-300
+            J[singular] = np.eye(3)
+            step = np.linalg.solve(J, -F[..., None])[..., 0]
+            step[singular] = 0
+            u = np.clip(u + step[:, 0], 0, 1)
+            v = np.clip(v + step[:, 1], 0, 1)
+            t = t + step[:, 2]
+        residual = np.linalg.norm(evaluate(u, v, *self.params) - o - t[:, None] * d, axis=1)
+        scale = 1 + np.abs(t) * np.linalg.norm(d, axis=1)
+        ok = (residual <= tol * scale) & (t >= 0)
+        return u, v, t, ok
+
+
+def clip_unit(x, eps=1e-12):
+    # Обрізання до [0, 1]; значення, що не дотягують до межі лише на похибку округлення,
+    # кладуться точно на межу, інакше вона не стає активною на наступному кроці
+    return np.where(x < eps, 0.0, np.where(x > 1 - eps, 1.0, x))
+
+
+def triangle_distance(p, a, b, c):
+    # Відстань від точок p до трикутників (a, b, c), усі масиви (N, 3). Найближча точка
+    # шукається за областями Вороного вершин, ребер і грані трикутника
+    ab, ac, ap = b - a, c - a, p - a
+    d1, d2 = (ab * ap).sum(axis=1), (ac * ap).sum(axis=1)
+    bp = p - b
+    d3, d4 = (ab * bp).sum(axis=1), (ac * bp).sum(axis=1)
+    cp = p - c
+    d5, d6 = (ab * cp).sum(axis=1), (ac * cp).sum(axis=1)
+    va, vb, vc = d3 * d6 - d5 * d4, d5 * d2 - d1 * d6, d1 * d4 - d3 * d2
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Усередині грані
+        denom = va + vb + vc
+        s, t = vb / denom, vc / denom
+        # Ребра ab, ac, bc
+        edge_ab = (vc <= 0) & (d1 >= 0) & (d3 <= 0)
+        edge_ac = (vb <= 0) & (d2 >= 0) & (d6 <= 0)
+        edge_bc = (va <= 0) & (d4 - d3 >= 0) & (d5 - d6 >= 0)
+        s = np.where(edge_ab, d1 / (d1 - d3), s)
+        t = np.where(edge_ab, 0, t)
+        s = np.where(edge_ac, 0, s)
+        t = np.where(edge_ac, d2 / (d2 - d6), t)
+        w = (d4 - d3) / ((d4 - d3) + (d5 - d6))
+        s = np.where(edge_bc, 1 - w, s)
+        t = np.where(edge_bc, w, t)
+    # Вершини a, b, c
+    at_a, at_b, at_c = (d1 <= 0) & (d2 <= 0), (d3 >= 0) & (d4 <= d3), (d6 >= 0) & (d5 <= d6)
+    s = np.where(at_a | at_c, 0, np.where(at_b, 1, s))
+    t = np.where(at_a | at_b, 0, np.where(at_c, 1, t))
+    closest = a + s[:, None] * ab + t[:, None] * ac
+    return np.linalg.norm(p - closest, axis=1)
+
+
+def closest_point(points, P00,P10,P01,P11,amp_C0,amp_C1,amp_D0,amp_D1, depth=6):
+    return SurfaceBVH(P00,P10,P01,P11,amp_C0,amp_C1,amp_D0,amp_D1, depth).closest_point(points)
+
+
+def intersect(origins, directions, P00,P10,P01,P11,amp_C0,amp_C1,amp_D0,amp_D1, depth=6):
+    return SurfaceBVH(P00,P10,P01,P11,amp_C0,amp_C1,amp_D0,amp_D1, depth).intersect(origins, directions)
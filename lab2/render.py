@@ -0,0 +1,162 @@
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from mpl_toolkits.mplot3d import Axes3D  # реєструє проекцію '3d'
+
+from coons import DEFAULT_PARAMS, PARAM_NAMES, build_surface, unpack_params
+
+# ---- Рендеринг проекцій без дисплея ----
+# Кожна фігура створюється напряму як Figure з полотном Agg, без pyplot і його глобального
+# стану, тож рендеринг не потребує Tk і безпечно виконується в окремих процесах
+
+PROJECTIONS = ("3D", "x0", "y0", "z0")
+RESOLUTION = 50
+
+
+def render_projection(kind, X, Y, Z, path, dpi=100):
+    fig = Figure()
+    FigureCanvasAgg(fig)
+    if kind == "3D":
+        ax = fig.add_subplot(111, projection='3d')
+        ax.plot_surface(X,Y,Z,rstride=1,cstride=1,linewidth=0, alpha=0.9, cmap='viridis')
+    else:
+        # Проекція на координатну площину: (горизонталь, вертикаль, підписи осей, назва)
+        h, w, hl, wl, title = {
+            "x0": (Y, Z, 'y', 'z', 'Projection x=0 (yz)'),
+            "y0": (X, Z, 'x', 'z', 'Projection y=0 (xz)'),
+            "z0": (X, Y, 'x', 'y', 'Projection z=0 (xy)'),
+        }[kind]
+        ax = fig.add_subplot(111)
+        mesh = ax.pcolormesh(h, w, Z, shading='auto', cmap='viridis')
+        ax.set_xlabel(hl); ax.set_ylabel(wl); ax.set_title(title)
+        fig.colorbar(mesh, ax=ax, label='z')
+    fig.savefig(path, dpi=dpi)
+    return path
+
+
+def projection_paths(out_dir, prefix="coons_surface", kinds=PROJECTIONS):
+    return {kind: os.path.join(out_dir, f"{prefix}_{kind}.png") for kind in kinds}
+
+
+def _render_job(params, paths, N, dpi):
+    # Робота одного процесу: поверхня (з кешу процесу) і всі її проекції
+    X, Y, Z = build_surface(*params, Nu=N, Nv=N)
+    for kind, path in paths.items():
+        render_projection(kind, X, Y, Z, path, dpi)
+    return list(paths.values())
+
+
+class ProjectionRenderer:
+    # Пул процесів для рендерингу проекцій. Одна конфігурація розкладається на окремі
+    # проекції, у пакетному режимі одиниця роботи - конфігурація з усіма її проекціями
+    def __init__(self, workers=None, N=RESOLUTION, dpi=100):
+        self.workers = workers or os.cpu_count() or 1
+        self.N = N
+        self.dpi = dpi
+        self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def _executor(self):
+        if self._pool is None:
+            # spawn, а не fork: у GUI пул створюється, поки фоновий потік може тримати замок кешу
+            # поверхонь, і копія процесу з уже захопленим замком зависла б у build_surface
+            self._pool = ProcessPoolExecutor(max_workers=self.workers,
+                                             mp_context=multiprocessing.get_context("spawn"))
+        return self._pool
+
+    def render(self, params, out_dir, prefix="coons_surface", kinds=PROJECTIONS):
+        # Усі проекції однієї конфігурації паралельно; повертає список файлів
+        os.makedirs(out_dir, exist_ok=True)
+        paths = projection_paths(out_dir, prefix, kinds)
+        if self.workers == 1:
+            return _render_job(params, paths, self.N, self.dpi)
+        futures = [self._executor().submit(_render_job, params, {kind: path}, self.N, self.dpi)
+                   for kind, path in paths.items()]
+        return [path for future in futures for path in future.result()]
+
+    def sweep(self, configs, out_dir, prefix="coons", kinds=PROJECTIONS):
+        # Пакетний рендеринг: configs - ітерований набір кортежів параметрів.
+        # Повертає генератор (номер, файли) у порядку конфігурацій
+        configs = list(configs)
+        os.makedirs(out_dir, exist_ok=True)
+        paths = [projection_paths(out_dir, f"{prefix}_{index:05d}", kinds) for index in range(len(configs))]
+        if self.workers == 1:
+            results = map(_render_job, configs, paths, itertools.repeat(self.N), itertools.repeat(self.dpi))
+        else:
+            # Порції по кілька конфігурацій зменшують накладні витрати на передачу задач
+            results = self._executor().map(_render_job, configs, paths,
+                                           itertools.repeat(self.N), itertools.repeat(self.dpi),
+                                           chunksize=max(1, len(configs) // (4 * self.workers)))
+        return enumerate(results)
+
+
+def render_projections(P00,P10,P01,P11,amp_C0,amp_C1,amp_D0,amp_D1, out_dir=".", N=RESOLUTION,
+                       workers=None, prefix="coons_surface", kinds=PROJECTIONS):
+    with ProjectionRenderer(workers, N) as renderer:
+        return renderer.render((P00,P10,P01,P11,amp_C0,amp_C1,amp_D0,amp_D1), out_dir, prefix, kinds)
+
+
+# ---- Командний рядок ----
+def parse_range(text):
+    # "name=a:b:n" - n рівномірних значень від a до b; "name=a,b,c" - перелік значень
+    name, _, spec = text.partition("=")
+    if name not in PARAM_NAMES:
+        raise argparse.ArgumentTypeError(f"невідомий параметр {name!r}")
+    if ":" in spec:
+        a, b, n = spec.split(":")
+        values = np.linspace(float(a), float(b), int(n)).tolist()
+    else:
+        values = [float(x) for x in spec.split(",")]
+    return name, values
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Рендеринг проекцій поверхні Кунса без дисплея")
+    parser.add_argument("out_dir")
+    parser.add_argument("--sweep", type=parse_range, action="append", default=[], metavar="NAME=A:B:N",
+                        help="діапазон параметра; кілька --sweep дають декартів добуток")
+    parser.add_argument("--set", type=parse_range, action="append", default=[], metavar="NAME=VALUE",
+                        help="фіксоване значення параметра")
+    parser.add_argument("--projections", nargs="+", choices=PROJECTIONS, default=list(PROJECTIONS))
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--res", type=int, default=RESOLUTION)
+    parser.add_argument("--dpi", type=int, default=100)
+    args = parser.parse_args(argv)
+
+    base = dict(DEFAULT_PARAMS)
+    for name, values in args.set:
+        base[name] = values[0]
+    names = [name for name, _ in args.sweep]
+    grid = list(itertools.product(*(values for _, values in args.sweep)))
+    configs = [dict(base, **dict(zip(names, combo))) for combo in grid]
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    # Параметри кожного номера зберігаються поруч із зображеннями
+    with ProjectionRenderer(args.workers, args.res, args.dpi) as renderer, \
+            open(os.path.join(args.out_dir, "manifest.jsonl"), "w") as manifest:
+        results = renderer.sweep((unpack_params(c) for c in configs), args.out_dir, kinds=args.projections)
+        for index, paths in results:
+            manifest.write(json.dumps({"index": index, "params": configs[index], "files": paths}) + "\n")
+            print(f"{index + 1}/{len(configs)}", file=sys.stderr, end="\r")
+    print(file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
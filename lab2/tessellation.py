@@ -0,0 +1,108 @@
+import numpy as np
+
+from coons import evaluate
+
+# ---- Адаптивна тріангуляція поверхні Кунса ----
+# Область (u, v) покривається деревом прямокутних клітинок на цілочисельній решітці розміру
+# base * 2**max_level. Клітинка ділиться, поки відхилення поверхні в центрі та серединах
+# ребер від її трикутників перевищує tol. Листки тріангулюються так, що
+# спільне ребро сусідніх клітинок має однаковий набір вершин з обох боків - без тріщин.
+
+
+def cell_error(i0, j0, su, sv, N, params):
+    # Відхилення поверхні від трикутників клітинки: у серединах ребер уздовж u та v
+    # і в центрі (на діагоналі c00-c11). Повертає похибки (по u, по v, у центрі)
+    du = np.stack([np.zeros_like(su), su, np.zeros_like(su), su, su / 2, su / 2, su / 2, np.zeros_like(su), su], axis=1)
+    dv = np.stack([np.zeros_like(sv), np.zeros_like(sv), sv, sv, sv / 2, np.zeros_like(sv), sv, sv / 2, sv / 2], axis=1)
+    S = evaluate((i0[:, None] + du) / N, (j0[:, None] + dv) / N, *params)
+    c00, c10, c01, c11 = S[:, 0], S[:, 1], S[:, 2], S[:, 3]
+    dist = lambda p, q: np.linalg.norm(p - q, axis=1)
+    err_u = np.maximum(dist(S[:, 5], (c00 + c10) / 2), dist(S[:, 6], (c01 + c11) / 2))
+    err_v = np.maximum(dist(S[:, 7], (c00 + c01) / 2), dist(S[:, 8], (c10 + c11) / 2))
+    err_c = dist(S[:, 4], (c00 + c11) / 2)
+    return err_u, err_v, err_c
+
+
+def refine(N, base, tol, params):
+    # Листки дерева як масиви (i0, j0, su, sv) у координатах решітки. Клітинка ділиться
+    # лише в тому напрямку, де поверхня викривлена, тож пласкі напрямки не згущуються
+    s = N // base
+    i0, j0 = (a.ravel() for a in np.meshgrid(np.arange(base) * s, np.arange(base) * s, indexing="ij"))
+    su, sv = np.full(i0.size, s), np.full(i0.size, s)
+    leaves = []
+    while i0.size:
+        err_u, err_v, err_c = cell_error(i0, j0, su, sv, N, params)
+        split_u = (err_u > tol) & (su > 1)
+        split_v = (err_v > tol) & (sv > 1)
+        # Закручена клітинка (похибка лише на діагоналі) ділиться в обох напрямках
+        twist = (err_c > tol) & ~split_u & ~split_v
+        split_u |= twist & (su > 1)
+        split_v |= twist & (sv > 1)
+        leaf = ~split_u & ~split_v
+        leaves.append((i0[leaf], j0[leaf], su[leaf], sv[leaf]))
+
+        i0, j0, su, sv, split_u, split_v = (x[~leaf] for x in (i0, j0, su, sv, split_u, split_v))
+        su = np.where(split_u, su // 2, su)
+        sv = np.where(split_v, sv // 2, sv)
+        # Кожна клітинка дає 2 або 4 дочірні: зсуви (0|su) x (0|sv)
+        children = [(i0, j0, np.ones(i0.size, dtype=bool)),
+                    (i0 + su, j0, split_u),
+                    (i0, j0 + sv, split_v),
+                    (i0 + su, j0 + sv, split_u & split_v)]
+        i0 = np.concatenate([ci[m] for ci, _, m in children])
+        j0 = np.concatenate([cj[m] for _, cj, m in children])
+        su, sv = (np.concatenate([x[m] for _, _, m in children]) for x in (su, sv))
+    return tuple(np.concatenate(parts) for parts in zip(*leaves))
+
+
+def tessellate(P00,P10,P01,P11,amp_C0,amp_C1,amp_D0,amp_D1,tol=1e-3,base=4,max_level=6):
+    # Повертає (vertices (V, 3), triangles (T, 3) int32, uv (V, 2))
+    params = (P00,P10,P01,P11,amp_C0,amp_C1,amp_D0,amp_D1)
+    N = base << max_level
+    i0, j0, su, sv = refine(N, base, tol, params)
+    i1, j1 = i0 + su, j0 + sv
+
+    # Усі кути листків на решітці; вершини на ребрі листка - це кути його сусідів
+    corner = np.zeros((N + 1, N + 1), dtype=bool)
+    for ci, cj in ((i0, j0), (i1, j0), (i0, j1), (i1, j1)):
+        corner[ci, cj] = True
+    # Префіксні суми для підрахунку вершин на відрізку ребра
+    along_i = np.vstack((np.zeros((1, N + 1), dtype=np.intp), np.cumsum(corner, axis=0)))
+    along_j = np.hstack((np.zeros((N + 1, 1), dtype=np.intp), np.cumsum(corner, axis=1)))
+    count = (along_i[i1 + 1, j0] - along_i[i0, j0] + along_i[i1 + 1, j1] - along_i[i0, j1] +
+             along_j[i0, j1 + 1] - along_j[i0, j0] + along_j[i1, j1 + 1] - along_j[i1, j0] - 4)
+
+    # Ключ вершини на подвоєній решітці (центри найдрібніших клітинок - у півкроці)
+    M = 2 * N + 1
+    def key(i2, j2):
+        return i2 * M + j2
+
+    # Клітинки без висячих вершин - два трикутники
+    plain = count == 4
+    a = key(2 * i0[plain], 2 * j0[plain])
+    b = key(2 * i1[plain], 2 * j0[plain])
+    c = key(2 * i1[plain], 2 * j1[plain])
+    d = key(2 * i0[plain], 2 * j1[plain])
+    tri_keys = [np.column_stack((a, b, c)), np.column_stack((a, c, d))]
+
+    # Решта - віяло з центру клітинки через усі вершини на її межі (проти годинникової стрілки)
+    fans = []
+    for ci, cj, a, b in zip(i0[~plain].tolist(), j0[~plain].tolist(), su[~plain].tolist(), sv[~plain].tolist()):
+        ru, rv = np.arange(a), np.arange(b)
+        ring = np.concatenate((
+            np.column_stack((ci + ru, np.full(a, cj))),
+            np.column_stack((np.full(b, ci + a), cj + rv)),
+            np.column_stack((ci + a - ru, np.full(a, cj + b))),
+            np.column_stack((np.full(b, ci), cj + b - rv)),
+        ))
+        ring = ring[corner[ring[:, 0], ring[:, 1]]]
+        ring_keys = key(2 * ring[:, 0], 2 * ring[:, 1])
+        center = key(2 * ci + a, 2 * cj + b)
+        fans.append(np.column_stack((np.full(len(ring_keys), center), ring_keys, np.roll(ring_keys, -1))))
+    tri_keys.extend(fans)
+
+    keys, triangles = np.unique(np.concatenate(tri_keys), return_inverse=True)
+    triangles = triangles.reshape(-1, 3).astype(np.int32)
+    uv = np.column_stack((keys // M, keys % M)) / (2 * N)
+    vertices = evaluate(uv[:, 0], uv[:, 1], *params)
+    return vertices, triangles, uv
@@ -0,0 +1,32 @@
+import numpy as np
+
+from coons import DEFAULT_PARAMS, evaluate, unpack_params
+from query import SurfaceBVH
+
+PARAMS = unpack_params(DEFAULT_PARAMS)
+
+
+def dense_distance(points, n=401):
+    # Відстань до вузлів щільної сітки - верхня оцінка справжньої відстані до патча
+    g = np.linspace(0, 1, n)
+    U, V = np.meshgrid(g, g, indexing="ij")
+    S = evaluate(U.ravel(), V.ravel(), *PARAMS)
+    d2 = (points * points).sum(axis=1)[:, None] - 2 * points @ S.T + (S * S).sum(axis=1)
+    return np.sqrt(np.maximum(0, d2).min(axis=1))
+
+
+# ---- Найближча точка на межі патча ----
+def test_closest_point_in_corner():
+    # Крок Ньютона з центру кутової клітинки виводить далеко за квадрат
+    u, v, d = SurfaceBVH(*PARAMS).closest_point([[1.4114396, 1.07499477, 1.28508777]])
+    assert u[0] == 1 and v[0] == 1
+    assert np.isclose(d[0], 0.64048178)
+
+
+def test_closest_point_on_boundary_matches_dense_grid():
+    points = np.random.default_rng(0).uniform(-1.5, 2.5, size=(2000, 3))
+    u, v, d = SurfaceBVH(*PARAMS).closest_point(points)
+    on_boundary = (u == 0) | (u == 1) | (v == 0) | (v == 1)
+    assert on_boundary.mean() > 0.5
+    assert np.allclose(np.linalg.norm(evaluate(u, v, *PARAMS) - points, axis=1), d)
+    assert np.all(d <= dense_distance(points) + 1e-9)
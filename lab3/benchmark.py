@@ -0,0 +1,196 @@
+import argparse
+import json
+import platform
+import sys
+import time
+import numpy as np
+
+from clipping import CLIPPERS, WindowIndex, clip_prioritized
+
+# --- РОБОЧІ НАВАНТАЖЕННЯ ---
+SCENE = 1000.0
+WINDOW = (250.0, 250.0, 750.0, 750.0)
+
+
+def gen_inside(rng, n):
+    x_min, y_min, x_max, y_max = WINDOW
+    return np.column_stack((rng.uniform(x_min, x_max, n), rng.uniform(y_min, y_max, n),
+                            rng.uniform(x_min, x_max, n), rng.uniform(y_min, y_max, n)))
+
+
+def gen_outside(rng, n):
+    # Обидва кінці в одній смузі зовні вікна - тривіальна невидимість
+    x_min, y_min, x_max, y_max = WINDOW
+    seg = rng.uniform(0, SCENE, (n, 4))
+    side = rng.integers(0, 4, n)
+    for k, (col, lo, hi) in enumerate(((0, 0, x_min), (0, x_max, SCENE), (1, 0, y_min), (1, y_max, SCENE))):
+        rows = side == k
+        seg[rows, col] = rng.uniform(lo, hi, rows.sum())
+        seg[rows, col + 2] = rng.uniform(lo, hi, rows.sum())
+    return seg
+
+
+def gen_crossing(rng, n):
+    # Один кінець усередині вікна, інший - зовні
+    x_min, y_min, x_max, y_max = WINDOW
+    inside = gen_inside(rng, n)[:, :2]
+    angle = rng.uniform(0, 2 * np.pi, n)
+    length = SCENE * 0.75
+    outside = inside + length * np.column_stack((np.cos(angle), np.sin(angle)))
+    return np.column_stack((inside, outside))
+
+
+def gen_mixed(rng, n):
+    return rng.uniform(0, SCENE, (n, 4))
+
+
+def gen_long(rng, n):
+    # Довгі відрізки, що проходять через вікно: багато рівнів поділу для середньої точки
+    center = gen_inside(rng, n)[:, :2]
+    angle = rng.uniform(0, 2 * np.pi, n)
+    length = rng.uniform(1e4, 1e5, n)[:, None]
+    d = np.column_stack((np.cos(angle), np.sin(angle))) * length
+    return np.column_stack((center - d, center + d))
+
+
+def gen_windows(rng, count, size=(10, 120)):
+    lo = rng.uniform(0, SCENE, (count, 2))
+    size = rng.uniform(*size, (count, 2))
+    return [{"bounds": tuple(np.concatenate((lo[k], lo[k] + size[k])).tolist()), "priority": k}
+            for k in range(count)]
+
+
+def gen_small_windows(rng, count):
+    # Дрібні вікна - густа сітка індексу, довгий відрізок перетинає сотні клітинок
+    return gen_windows(rng, count, size=(5, 15))
+
+
+def gen_short(rng, n):
+    start = rng.uniform(0, SCENE, (n, 2))
+    return np.column_stack((start, start + rng.uniform(-60, 60, (n, 2))))
+
+
+def gen_chords(rng, n):
+    # Хорди через усю сцену: кінці на протилежних сторонах
+    a, b = rng.uniform(0, SCENE, n), rng.uniform(0, SCENE, n)
+    seg = np.column_stack((np.zeros(n), a, np.full(n, SCENE), b))
+    vertical = rng.random(n) < 0.5
+    seg[vertical] = seg[vertical][:, [1, 0, 3, 2]]
+    return seg
+
+
+WORKLOADS = {
+    "inside": gen_inside,
+    "outside": gen_outside,
+    "crossing": gen_crossing,
+    "mixed": gen_mixed,
+    "long": gen_long,
+    "many-windows": gen_short,
+    "through-many-windows": gen_chords,
+}
+
+# Навантаження з багатьма вікнами: генератор вікон
+WINDOW_SETS = {
+    "many-windows": gen_windows,
+    "through-many-windows": gen_small_windows,
+}
+
+
+# --- ВИМІРЮВАННЯ ---
+def percentiles(samples_ns):
+    p50, p99 = np.percentile(samples_ns, [50, 99])
+    return float(p50), float(p99)
+
+
+def run_scalar(clipper, seg, windows):
+    # Затримка кожного виклику окремо
+    latencies = np.empty(len(seg), dtype=np.int64)
+    rows = seg.tolist()
+    if windows is None:
+        clip = clipper.clip
+        x_min, y_min, x_max, y_max = WINDOW
+        for i, (x1, y1, x2, y2) in enumerate(rows):
+            t = time.perf_counter_ns()
+            clip(x1, y1, x2, y2, x_min, y_min, x_max, y_max)
+            latencies[i] = time.perf_counter_ns() - t
+    else:
+        index = WindowIndex(windows)
+        for i, (x1, y1, x2, y2) in enumerate(rows):
+            t = time.perf_counter_ns()
+            for window in index.candidates(x1, y1, x2, y2):
+                if clipper.clip(x1, y1, x2, y2, *window["bounds"]) is not None:
+                    break
+            latencies[i] = time.perf_counter_ns() - t
+    return latencies
+
+
+def run_batch(clipper, seg, windows, chunk):
+    # Затримка обробки однієї порції з chunk відрізків
+    latencies = []
+    index = WindowIndex(windows) if windows is not None else None
+    for start in range(0, len(seg), chunk):
+        part = seg[start:start + chunk]
+        t = time.perf_counter_ns()
+        if index is None:
+            clipper.clip_batch(part, WINDOW)
+        else:
+            clip_prioritized(part, windows, clipper, index)
+        latencies.append(time.perf_counter_ns() - t)
+    return np.array(latencies, dtype=np.int64)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Бенчмарк алгоритмів відсікання відрізків")
+    parser.add_argument("--sizes", type=float, nargs="+", default=[1e3, 1e4, 1e5, 1e6, 1e7])
+    parser.add_argument("--workloads", nargs="+", choices=sorted(WORKLOADS), default=list(WORKLOADS))
+    parser.add_argument("--algorithms", nargs="+", choices=sorted(CLIPPERS), default=list(CLIPPERS))
+    parser.add_argument("--modes", nargs="+", choices=("scalar", "batch"), default=["scalar", "batch"])
+    parser.add_argument("--windows", type=int, default=1000, help="кількість вікон у навантаженнях з багатьма вікнами")
+    parser.add_argument("--chunk", type=int, default=65536, help="розмір порції для пакетного режиму")
+    parser.add_argument("--scalar-limit", type=int, default=100000,
+                        help="скалярний режим вимірюється на перших N відрізках навантаження")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", help="файл для результатів у форматі JSON Lines (за замовчуванням stdout)")
+    args = parser.parse_args(argv)
+
+    out = open(args.output, "w") if args.output else sys.stdout
+    env = {"python": platform.python_version(), "numpy": np.__version__, "machine": platform.machine()}
+    try:
+        for workload in args.workloads:
+            for size in args.sizes:
+                n = int(size)
+                # Кожне навантаження відтворюване: той самий seed дає ті самі відрізки і вікна
+                rng = np.random.default_rng([args.seed, n, sorted(WORKLOADS).index(workload)])
+                seg = WORKLOADS[workload](rng, n)
+                windows = WINDOW_SETS[workload](rng, args.windows) if workload in WINDOW_SETS else None
+
+                for name in args.algorithms:
+                    clipper = CLIPPERS[name]
+                    for mode in args.modes:
+                        if mode == "scalar":
+                            measured = seg[:args.scalar_limit]
+                            latencies = run_scalar(clipper, measured, windows)
+                        else:
+                            measured = seg
+                            latencies = run_batch(clipper, measured, windows, args.chunk)
+                        total = latencies.sum() / 1e9
+                        p50, p99 = percentiles(latencies)
+                        record = {
+                            "workload": workload, "size": n, "algorithm": name, "mode": mode,
+                            "measured": len(measured), "windows": len(windows) if windows else 1,
+                            "seconds": total, "segments_per_sec": len(measured) / total if total else None,
+                            "p50_ns": p50, "p99_ns": p99,
+                            "latency_unit": "segment" if mode == "scalar" else f"chunk of {args.chunk}",
+                            "seed": args.seed, **env,
+                        }
+                        out.write(json.dumps(record) + "\n")
+                        out.flush()
+                        print(f"{workload:>12} {n:>9} {name:>18} {mode:>6} "
+                              f"{record['segments_per_sec'] or 0:>14.0f} seg/s", file=sys.stderr)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
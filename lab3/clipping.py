@@ -0,0 +1,894 @@
+import argparse
+import itertools
+import sys
+import numpy as np
+
+# --- ВІКНА ВІДСІКАННЯ З ПРІОРИТЕТАМИ ---
+WINDOWS = [
+    {"bounds": (50, 50, 250, 250), "priority": 1, "color": "#e74c3c", "name": "Вікно 1 (пріоритет 1)"},
+    {"bounds": (150, 100, 280, 200), "priority": 2, "color": "#3498db", "name": "Вікно 2 (пріоритет 2)"},
+    {"bounds": (80, 150, 220, 270), "priority": 3, "color": "#f39c12", "name": "Вікно 3 (пріоритет 3)"},
+]
+
+# Коди для алгоритму Коена-Сазерленда
+INSIDE = 0  # 0000
+LEFT   = 1  # 0001
+RIGHT  = 2  # 0010
+BOTTOM = 4  # 0100
+TOP    = 8  # 1000
+
+# Статуси відрізка після відсікання кількома вікнами
+STATUS_INVISIBLE = 0
+STATUS_VISIBLE   = 1
+STATUS_PARTIAL   = 2
+
+
+# --- АЛГОРИТМИ ---
+def as_segments(segments):
+    # Масив відрізків форми (N, 4): x1, y1, x2, y2
+    return np.asarray(segments, dtype=float).reshape(-1, 4)
+
+
+def as_bounds(bounds, n):
+    # Межі вікна: один кортеж (x_min, y_min, x_max, y_max) або масив (N, 4) - окреме вікно для кожного відрізка
+    b = np.broadcast_to(np.asarray(bounds, dtype=float), (n, 4))
+    return b[:, 0], b[:, 1], b[:, 2], b[:, 3]
+
+
+def inside_mask(x, y, x_min, y_min, x_max, y_max):
+    return (x_min <= x) & (x <= x_max) & (y_min <= y) & (y <= y_max)
+
+
+def outside_mask(x1, y1, x2, y2, x_min, y_min, x_max, y_max):
+    # Тривіальна невидимість: обидва кінці з одного боку від межі вікна
+    return (((x1 < x_min) & (x2 < x_min)) | ((x1 > x_max) & (x2 > x_max)) |
+            ((y1 < y_min) & (y2 < y_min)) | ((y1 > y_max) & (y2 > y_max)))
+
+
+# --- ПРОСТОРОВИЙ ІНДЕКС ВІКОН ---
+class WindowIndex:
+    # Рівномірна сітка над межами вікон: кожна клітинка зберігає ранги вікон (за пріоритетом),
+    # що її перетинають. Для короткого відрізка перевіряються вікна з клітинок його габаритного
+    # прямокутника, для довгого - лише з клітинок, через які він проходить.
+    MAX_CELLS_PER_AXIS = 1024
+
+    def __init__(self, windows, cell_size=None):
+        self.windows = windows
+        # ранг -> індекс вікна у windows
+        self.order = np.array(sorted(range(len(windows)), key=lambda k: windows[k]["priority"]), dtype=np.intp)
+        self.bounds = np.array([windows[k]["bounds"] for k in self.order], dtype=float).reshape(-1, 4)
+        self._cell_lists = None
+
+        if not len(self.bounds):
+            self.origin = np.zeros(2)
+            self.cell_size = 1.0
+            self.shape = (1, 1)
+            self.cell_start = np.zeros(2, dtype=np.intp)
+            self.cell_ranks = np.zeros(0, dtype=np.intp)
+            return
+
+        lo = self.bounds[:, :2].min(axis=0)
+        hi = self.bounds[:, 2:].max(axis=0)
+        if cell_size is None:
+            sizes = self.bounds[:, 2:] - self.bounds[:, :2]
+            cell_size = max(float(sizes.mean()), float((hi - lo).max()) / self.MAX_CELLS_PER_AXIS, 1e-9)
+        self.origin = lo
+        self.cell_size = float(cell_size)
+        nx, ny = np.minimum(np.floor((hi - lo) / self.cell_size).astype(np.intp) + 1, self.MAX_CELLS_PER_AXIS)
+        self.shape = (int(nx), int(ny))
+
+        # Розгортаємо кожне вікно у список клітинок, які воно покриває
+        ix0, iy0 = self.cell_of(self.bounds[:, 0], self.bounds[:, 1])
+        ix1, iy1 = self.cell_of(self.bounds[:, 2], self.bounds[:, 3])
+        ranks, cells = self._expand(ix0, iy0, ix1, iy1)
+
+        order = np.lexsort((ranks, cells))
+        self.cell_ranks = ranks[order]
+        counts = np.bincount(cells, minlength=nx * ny)
+        self.cell_start = np.concatenate(([0], np.cumsum(counts)))
+
+    def cell_of(self, x, y):
+        nx, ny = self.shape
+        ix = np.clip(np.floor((np.asarray(x) - self.origin[0]) / self.cell_size), 0, nx - 1).astype(np.intp)
+        iy = np.clip(np.floor((np.asarray(y) - self.origin[1]) / self.cell_size), 0, ny - 1).astype(np.intp)
+        return ix, iy
+
+    def _expand(self, ix0, iy0, ix1, iy1):
+        # Для кожного прямокутника клітинок [ix0..ix1] x [iy0..iy1] повертає (номер прямокутника, номер клітинки)
+        w = ix1 - ix0 + 1
+        counts = w * (iy1 - iy0 + 1)
+        owner = np.repeat(np.arange(len(counts)), counts)
+        local = np.arange(owner.size) - np.repeat(np.cumsum(counts) - counts, counts)
+        ix = ix0[owner] + local % w[owner]
+        iy = iy0[owner] + local // w[owner]
+        return owner, iy * self.shape[0] + ix
+
+    def candidates(self, x1, y1, x2, y2):
+        # Вікна (у порядку пріоритету), які не відкидаються для відрізка тривіально
+        if self._cell_lists is None:
+            self._cell_lists = [self.cell_ranks[a:b].tolist()
+                                for a, b in zip(self.cell_start[:-1].tolist(), self.cell_start[1:].tolist())]
+            self._bounds_list = self.bounds.tolist()
+        x_lo, x_hi = min(x1, x2), max(x1, x2)
+        y_lo, y_hi = min(y1, y2), max(y1, y2)
+        nx, ny = self.shape
+        ox, oy = self.origin.tolist()
+        ix0, ix1 = (min(max(int((v - ox) // self.cell_size), 0), nx - 1) for v in (x_lo, x_hi))
+        iy0, iy1 = (min(max(int((v - oy) // self.cell_size), 0), ny - 1) for v in (y_lo, y_hi))
+
+        if (ix1 - ix0 + 1) * (iy1 - iy0 + 1) > len(self._bounds_list):
+            # Габарит довгого відрізка покриває більше клітинок, ніж є вікон - дешевше перевірити всі вікна
+            ranks = range(len(self._bounds_list))
+        else:
+            ranks = set()
+            for iy in range(iy0, iy1 + 1):
+                for ix in range(ix0, ix1 + 1):
+                    ranks.update(self._cell_lists[iy * nx + ix])
+            ranks = sorted(ranks)
+        result = []
+        for r in ranks:
+            x_min, y_min, x_max, y_max = self._bounds_list[r]
+            if not (x_hi < x_min or x_lo > x_max or y_hi < y_min or y_lo > y_max):
+                result.append(self.windows[self.order[r]])
+        return result
+
+    def _walk(self, seg):
+        # Клітинки, через які проходить кожен відрізок (а не весь його габарит): вздовж головної осі
+        # відрізок ріжеться на смуги шириною в одну клітинку, у кожній смузі - діапазон клітинок
+        # другої осі між входом і виходом. Повертає (номер відрізка, номер клітинки)
+        nx, ny = self.shape
+        g = (seg - np.tile(self.origin, 2)) / self.cell_size
+        swap = np.abs(g[:, 3] - g[:, 1]) > np.abs(g[:, 2] - g[:, 0])
+        u0, u1 = np.where(swap, g[:, 1], g[:, 0]), np.where(swap, g[:, 3], g[:, 2])
+        v0, v1 = np.where(swap, g[:, 0], g[:, 1]), np.where(swap, g[:, 2], g[:, 3])
+        nu, nv = np.where(swap, ny, nx), np.where(swap, nx, ny)
+        # Частина відрізка поза сіткою вздовж головної осі не може перетнути жодне вікно
+        u_lo = np.clip(np.minimum(u0, u1), 0, nu)
+        u_hi = np.clip(np.maximum(u0, u1), 0, nu)
+        c0 = np.minimum(np.floor(u_lo), nu - 1).astype(np.intp)
+        c1 = np.minimum(np.floor(u_hi), nu - 1).astype(np.intp)
+
+        count = c1 - c0 + 1
+        owner = np.repeat(np.arange(len(seg)), count)
+        c = c0[owner] + np.arange(owner.size) - np.repeat(np.cumsum(count) - count, count)
+        du = (u1 - u0)[owner]
+        slope = np.divide((v1 - v0)[owner], du, out=np.zeros(owner.size), where=du != 0)
+        va = v0[owner] + (np.maximum(c, u_lo[owner]) - u0[owner]) * slope
+        vb = v0[owner] + (np.minimum(c + 1, u_hi[owner]) - u0[owner]) * slope
+        # Невеликий допуск, щоб дотик до межі клітинки не губився через округлення
+        top = nv[owner] - 1
+        r0 = np.clip(np.floor(np.minimum(va, vb) - 1e-9), 0, top).astype(np.intp)
+        r1 = np.clip(np.floor(np.maximum(va, vb) + 1e-9), 0, top).astype(np.intp)
+
+        s = swap[owner]
+        strip, cells = self._expand(np.where(s, r0, c), np.where(s, c, r0), np.where(s, r1, c), np.where(s, c, r1))
+        return owner[strip], cells
+
+    def candidate_pairs(self, segments):
+        # Пари (індекс відрізка, ранг вікна), відсортовані за відрізком і пріоритетом
+        seg = as_segments(segments)
+        if not len(self.bounds) or not len(seg):
+            return np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.intp)
+        x_lo, x_hi = np.minimum(seg[:, 0], seg[:, 2]), np.maximum(seg[:, 0], seg[:, 2])
+        y_lo, y_hi = np.minimum(seg[:, 1], seg[:, 3]), np.maximum(seg[:, 1], seg[:, 3])
+        ix0, iy0 = self.cell_of(x_lo, y_lo)
+        ix1, iy1 = self.cell_of(x_hi, y_hi)
+
+        # Короткі відрізки беруть усі клітинки габариту, довгі (габарит більший за подвоєний
+        # периметр у клітинках) - лише клітинки вздовж самого відрізка
+        w, h = ix1 - ix0 + 1, iy1 - iy0 + 1
+        long = w * h > 2 * (w + h)
+        short = np.flatnonzero(~long)
+        box_idx, box_cells = self._expand(ix0[short], iy0[short], ix1[short], iy1[short])
+        walk_idx, walk_cells = self._walk(seg[long])
+        seg_idx = np.concatenate((short[box_idx], np.flatnonzero(long)[walk_idx]))
+        cells = np.concatenate((box_cells, walk_cells))
+
+        per_cell = self.cell_start[cells + 1] - self.cell_start[cells]
+        seg_idx = np.repeat(seg_idx, per_cell)
+        local = np.arange(seg_idx.size) - np.repeat(np.cumsum(per_cell) - per_cell, per_cell)
+        ranks = self.cell_ranks[np.repeat(self.cell_start[cells], per_cell) + local]
+
+        # Для габариту пара лишається лише в одній клітинці - тій, де лежить нижній лівий кут перетину
+        # габаритів відрізка і вікна; решта - дублікати або тривіально невидимі.
+        # Під час обходу цей кут може лишитися осторонь, тож дублікати довгих відрізків прибираються після сортування
+        b = self.bounds[ranks]
+        s_xlo, s_xhi, s_ylo, s_yhi = x_lo[seg_idx], x_hi[seg_idx], y_lo[seg_idx], y_hi[seg_idx]
+        overlap = ~((s_xhi < b[:, 0]) | (s_xlo > b[:, 2]) | (s_yhi < b[:, 1]) | (s_ylo > b[:, 3]))
+        ref_x, ref_y = self.cell_of(np.maximum(s_xlo, b[:, 0]), np.maximum(s_ylo, b[:, 1]))
+        keep = overlap & (long[seg_idx] | (ref_y * self.shape[0] + ref_x == np.repeat(cells, per_cell)))
+
+        key = np.sort(seg_idx[keep] * len(self.bounds) + ranks[keep])
+        key = key[np.diff(key, prepend=-1) != 0]
+        return key // len(self.bounds), key % len(self.bounds)
+
+    def first_rejecting(self, segments, limit=None, block=64):
+        # Ранг першого вікна, яке тривіально відкидає відрізок (len(bounds), якщо такого немає).
+        # Вікна перевіряються блоками лише для ще не визначених відрізків; limit - ранги, далі яких
+        # шукати не потрібно
+        seg = as_segments(segments)
+        n, count = len(seg), len(self.bounds)
+        first = np.full(n, count, dtype=np.intp)
+        active = np.arange(n) if limit is None else np.flatnonzero(np.asarray(limit) > 0)
+        for start in range(0, count, block):
+            if not active.size:
+                break
+            x_min, y_min, x_max, y_max = self.bounds[start:start + block].T
+            x1, y1, x2, y2 = (seg[active, k][:, None] for k in range(4))
+            out = outside_mask(x1, y1, x2, y2, x_min, y_min, x_max, y_max)
+            hit = out.any(axis=1)
+            first[active[hit]] = start + out[hit].argmax(axis=1)
+            active = active[~hit]
+            if limit is not None:
+                active = active[limit[active] > start + block]
+        return first
+
+
+_index_cache = {}
+
+
+def get_window_index(windows):
+    # Індекс перебудовується лише тоді, коли змінюються межі або пріоритети вікон
+    key = tuple((tuple(w["bounds"]), w["priority"]) for w in windows)
+    index = _index_cache.get(key)
+    if index is None:
+        if len(_index_cache) >= 8:
+            _index_cache.clear()
+        index = _index_cache[key] = WindowIndex(windows)
+    return index
+
+
+def clip_prioritized(segments, windows, clipper, index=None):
+    # Відсікання набору відрізків кількома вікнами з пріоритетами за один векторний прохід.
+    # Повертає (координати, статус, індекс вікна, ознака тривіальної невидимості хоча б для одного вікна)
+    seg = as_segments(segments)
+    n = len(seg)
+    if index is None:
+        index = get_window_index(windows)
+    clipped = np.full((n, 4), np.nan)
+    status = np.full(n, STATUS_INVISIBLE, dtype=np.int8)
+    window_idx = np.full(n, -1, dtype=np.intp)
+    hit_rank = np.full(n, len(index.bounds), dtype=np.intp)
+
+    seg_idx, ranks = index.candidate_pairs(seg)
+    if seg_idx.size:
+        # Номер кандидата в межах свого відрізка: k-й раунд перевіряє k-те за пріоритетом вікно
+        first = np.concatenate(([True], seg_idx[1:] != seg_idx[:-1]))
+        starts = np.flatnonzero(first)
+        pos = np.arange(seg_idx.size) - np.repeat(starts, np.diff(np.append(starts, seg_idx.size)))
+        by_round = np.argsort(pos, kind="stable")
+        round_start = np.searchsorted(pos[by_round], np.arange(pos.max() + 2))
+    else:
+        round_start = np.zeros(1, dtype=np.intp)
+
+    resolved = np.zeros(n, dtype=bool)
+    for k in range(len(round_start) - 1):
+        p = by_round[round_start[k]:round_start[k + 1]]
+        p = p[~resolved[seg_idx[p]]]
+        if not p.size:
+            continue
+        s, r = seg_idx[p], ranks[p]
+        x_min, y_min, x_max, y_max = index.bounds[r].T
+        x1, y1, x2, y2 = seg[s].T
+
+        # Перша ітерація: перевірка повної видимості
+        full = inside_mask(x1, y1, x_min, y_min, x_max, y_max) & inside_mask(x2, y2, x_min, y_min, x_max, y_max)
+        clipped[s[full]] = seg[s[full]]
+        status[s[full]] = STATUS_VISIBLE
+
+        # Часткова видимість - застосовуємо алгоритм відсікання (тривіально невидимих серед кандидатів немає)
+        rest = ~full
+        res, vis = clipper.clip_batch(seg[s[rest]], index.bounds[r[rest]])
+        clipped[s[rest][vis]] = res[vis]
+        status[s[rest][vis]] = STATUS_PARTIAL
+
+        hit = full.copy()
+        hit[rest] = vis
+        resolved[s[hit]] = True
+        window_idx[s[hit]] = index.order[r[hit]]
+        hit_rank[s[hit]] = r[hit]
+
+    # Серед кандидатів довгого відрізка немає вікон, які він оминає, хоча й не відкидається ними
+    # тривіально, тож ознака рахується окремо: чи відкинуло його тривіально вікно з вищим пріоритетом
+    rejected = index.first_rejecting(seg, hit_rank) < hit_rank
+    return clipped, status, window_idx, rejected
+
+
+class SimpleClipper:
+    @staticmethod
+    def clip(x1, y1, x2, y2, x_min, y_min, x_max, y_max):
+        if (x_min <= x1 <= x_max and y_min <= y1 <= y_max and
+            x_min <= x2 <= x_max and y_min <= y2 <= y_max):
+            return (x1, y1, x2, y2)
+        return CohenSutherlandClipper.clip(x1, y1, x2, y2, x_min, y_min, x_max, y_max)
+
+    @staticmethod
+    def clip_batch(segments, bounds):
+        seg = as_segments(segments)
+        x_min, y_min, x_max, y_max = as_bounds(bounds, len(seg))
+        full = (inside_mask(seg[:, 0], seg[:, 1], x_min, y_min, x_max, y_max) &
+                inside_mask(seg[:, 2], seg[:, 3], x_min, y_min, x_max, y_max))
+        rest = ~full
+        res, vis = CohenSutherlandClipper.clip_batch(seg[rest], np.column_stack((x_min, y_min, x_max, y_max))[rest])
+        clipped = seg.copy()
+        clipped[rest] = res
+        visible = full.copy()
+        visible[rest] = vis
+        return clipped, visible
+
+
+class CohenSutherlandClipper:
+    @staticmethod
+    def compute_code(x, y, x_min, y_min, x_max, y_max):
+        code = INSIDE
+        if x < x_min: code |= LEFT
+        elif x > x_max: code |= RIGHT
+        if y < y_min: code |= BOTTOM
+        elif y > y_max: code |= TOP
+        return code
+
+    @staticmethod
+    def clip(x1, y1, x2, y2, x_min, y_min, x_max, y_max):
+        code1 = CohenSutherlandClipper.compute_code(x1, y1, x_min, y_min, x_max, y_max)
+        code2 = CohenSutherlandClipper.compute_code(x2, y2, x_min, y_min, x_max, y_max)
+        accept = False
+
+        while True:
+            if code1 == 0 and code2 == 0:
+                accept = True
+                break
+            elif (code1 & code2) != 0:
+                break
+            else:
+                code_out = code1 if code1 != 0 else code2
+
+                if code_out & TOP:
+                    x = x1 + (x2 - x1) * (y_max - y1) / (y2 - y1)
+                    y = y_max
+                elif code_out & BOTTOM:
+                    x = x1 + (x2 - x1) * (y_min - y1) / (y2 - y1)
+                    y = y_min
+                elif code_out & RIGHT:
+                    y = y1 + (y2 - y1) * (x_max - x1) / (x2 - x1)
+                    x = x_max
+                elif code_out & LEFT:
+                    y = y1 + (y2 - y1) * (x_min - x1) / (x2 - x1)
+                    x = x_min
+
+                if code_out == code1:
+                    x1, y1 = x, y
+                    code1 = CohenSutherlandClipper.compute_code(x1, y1, x_min, y_min, x_max, y_max)
+                else:
+                    x2, y2 = x, y
+                    code2 = CohenSutherlandClipper.compute_code(x2, y2, x_min, y_min, x_max, y_max)
+
+        if accept:
+            return (x1, y1, x2, y2)
+        return None
+
+    @staticmethod
+    def compute_codes(x, y, x_min, y_min, x_max, y_max):
+        code = np.where(x < x_min, LEFT, np.where(x > x_max, RIGHT, INSIDE))
+        code |= np.where(y < y_min, BOTTOM, np.where(y > y_max, TOP, INSIDE))
+        return code
+
+    @staticmethod
+    def clip_batch(segments, bounds):
+        # Той самий алгоритм для масиву відрізків (N, 4): на кожному кроці
+        # обробляються лише ще не визначені відрізки.
+        # Повертає координати (NaN для невидимих) та маску видимості
+        seg = as_segments(segments)
+        n = len(seg)
+        x_min, y_min, x_max, y_max = as_bounds(bounds, n)
+        x1, y1, x2, y2 = seg.T.copy()
+        code1 = CohenSutherlandClipper.compute_codes(x1, y1, x_min, y_min, x_max, y_max)
+        code2 = CohenSutherlandClipper.compute_codes(x2, y2, x_min, y_min, x_max, y_max)
+        visible = np.zeros(n, dtype=bool)
+        active = np.arange(n)
+
+        while active.size:
+            c1, c2 = code1[active], code2[active]
+            accept = (c1 == 0) & (c2 == 0)
+            visible[active[accept]] = True
+            active = active[~accept & ((c1 & c2) == 0)]
+            if not active.size:
+                break
+
+            c1, c2 = code1[active], code2[active]
+            ax1, ay1, ax2, ay2 = x1[active], y1[active], x2[active], y2[active]
+            bx_min, by_min, bx_max, by_max = x_min[active], y_min[active], x_max[active], y_max[active]
+            code_out = np.where(c1 != 0, c1, c2)
+
+            top = (code_out & TOP) != 0
+            bottom = ~top & ((code_out & BOTTOM) != 0)
+            right = ~top & ~bottom & ((code_out & RIGHT) != 0)
+            left = ~top & ~bottom & ~right
+
+            x = np.empty(active.size)
+            y = np.empty(active.size)
+            for mask, edge in ((top, by_max), (bottom, by_min)):
+                x[mask] = ax1[mask] + (ax2[mask] - ax1[mask]) * (edge[mask] - ay1[mask]) / (ay2[mask] - ay1[mask])
+                y[mask] = edge[mask]
+            for mask, edge in ((right, bx_max), (left, bx_min)):
+                y[mask] = ay1[mask] + (ay2[mask] - ay1[mask]) * (edge[mask] - ax1[mask]) / (ax2[mask] - ax1[mask])
+                x[mask] = edge[mask]
+
+            first = c1 != 0
+            i1, i2 = active[first], active[~first]
+            x1[i1], y1[i1] = x[first], y[first]
+            x2[i2], y2[i2] = x[~first], y[~first]
+            code1[i1] = CohenSutherlandClipper.compute_codes(x1[i1], y1[i1], x_min[i1], y_min[i1], x_max[i1], y_max[i1])
+            code2[i2] = CohenSutherlandClipper.compute_codes(x2[i2], y2[i2], x_min[i2], y_min[i2], x_max[i2], y_max[i2])
+
+        clipped = np.column_stack((x1, y1, x2, y2))
+        clipped[~visible] = np.nan
+        return clipped, visible
+
+
+class MidpointClipper:
+    @staticmethod
+    def clip(x1, y1, x2, y2, x_min, y_min, x_max, y_max):
+        def is_visible(x, y):
+            return x_min <= x <= x_max and y_min <= y <= y_max
+
+        # Дерево поділу обходиться з явним стеком замість рекурсії. Ліві половини
+        # обробляються першими, тож перший видимий листок дає початок результату, а останній - кінець
+        start = end = None
+        stack = [(x1, y1, x2, y2)]
+        while stack:
+            x1, y1, x2, y2 = stack.pop()
+
+            if is_visible(x1, y1) and is_visible(x2, y2):
+                leaf = (x1, y1, x2, y2)
+            elif ((x1 < x_min and x2 < x_min) or (x1 > x_max and x2 > x_max) or
+                  (y1 < y_min and y2 < y_min) or (y1 > y_max and y2 > y_max)):
+                continue
+            elif abs(x1 - x2) < 1 and abs(y1 - y2) < 1:
+                if not is_visible(x1, y1):
+                    continue
+                leaf = (x1, y1, x1, y1)
+            else:
+                xm, ym = (x1 + x2) / 2, (y1 + y2) / 2
+                stack.append((xm, ym, x2, y2))
+                stack.append((x1, y1, xm, ym))
+                continue
+
+            if start is None:
+                start = leaf[:2]
+            end = leaf[2:]
+
+        if start is None:
+            return None
+        return start + end
+
+    @staticmethod
+    def clip_batch(segments, bounds):
+        # Поділ обходиться в ширину для всіх відрізків одразу: кожен вузол - частина відрізка
+        # з параметричним інтервалом [t, t + w]. Результат рекурсії - початок найлівішого
+        # видимого листка і кінець найправішого, тому зберігаємо лише їх.
+        seg = as_segments(segments)
+        n = len(seg)
+        x_min, y_min, x_max, y_max = as_bounds(bounds, n)
+        clipped = np.full((n, 4), np.nan)
+        best_lo = np.full(n, np.inf)
+        best_hi = np.full(n, -np.inf)
+
+        # Відрізки з нескінченними координатами ніколи не стають меншими за піксель
+        owner = np.flatnonzero(np.isfinite(seg).all(axis=1))
+        x1, y1, x2, y2 = seg[owner].T
+        t = np.zeros(owner.size)
+        w = 1.0
+
+        while owner.size:
+            bx_min, by_min, bx_max, by_max = x_min[owner], y_min[owner], x_max[owner], y_max[owner]
+            vis1 = inside_mask(x1, y1, bx_min, by_min, bx_max, by_max)
+            vis2 = inside_mask(x2, y2, bx_min, by_min, bx_max, by_max)
+            accept = vis1 & vis2
+            reject = ~accept & outside_mask(x1, y1, x2, y2, bx_min, by_min, bx_max, by_max)
+            tiny = ~accept & ~reject & (np.abs(x1 - x2) < 1) & (np.abs(y1 - y2) < 1)
+            leaf = accept | (tiny & vis1)
+
+            # Листки одного відрізка не перетинаються, тож мінімальне t визначає єдиний листок
+            lo, hi = t[leaf], t[leaf] + w
+            o = owner[leaf]
+            np.minimum.at(best_lo, o, lo)
+            np.maximum.at(best_hi, o, hi)
+            first = lo == best_lo[o]
+            clipped[o[first], 0] = x1[leaf][first]
+            clipped[o[first], 1] = y1[leaf][first]
+            last = hi == best_hi[o]
+            end_x = np.where(accept[leaf], x2[leaf], x1[leaf])
+            end_y = np.where(accept[leaf], y2[leaf], y1[leaf])
+            clipped[o[last], 2] = end_x[last]
+            clipped[o[last], 3] = end_y[last]
+
+            # Ділимо далі лише вузли, які ще можуть змінити найлівіший або найправіший листок
+            split = ~accept & ~reject & ~tiny
+            split &= (t < best_lo[owner]) | (t + w > best_hi[owner])
+            owner, x1, y1, x2, y2, t = owner[split], x1[split], y1[split], x2[split], y2[split], t[split]
+            xm, ym = (x1 + x2) / 2, (y1 + y2) / 2
+            w /= 2
+            owner = np.concatenate((owner, owner))
+            x1, x2 = np.concatenate((x1, xm)), np.concatenate((xm, x2))
+            y1, y2 = np.concatenate((y1, ym)), np.concatenate((ym, y2))
+            t = np.concatenate((t, t + w))
+
+        visible = np.isfinite(best_lo)
+        return clipped, visible
+
+
+class IterativeMidpointClipper:
+    # Варіант Сазерленда-Коена, у якому точка перетину з межею шукається не діленням,
+    # а двійковим пошуком середньою точкою (як в апаратній реалізації). Кількість кроків
+    # обмежена log2 довжини відрізка. У цілочисельному режимі координати переводяться у
+    # фіксовану кому (FIXED_SHIFT дробових бітів), а середина - це зсув (a + b) >> 1
+    FIXED_SHIFT = 16
+
+    @staticmethod
+    def clip(x1, y1, x2, y2, x_min, y_min, x_max, y_max):
+        return IterativeMidpointClipper._clip(x1, y1, x2, y2, x_min, y_min, x_max, y_max, False)
+
+    @staticmethod
+    def clip_int(x1, y1, x2, y2, x_min, y_min, x_max, y_max):
+        f = IterativeMidpointClipper.FIXED_SHIFT
+        res = IterativeMidpointClipper._clip(*(int(v) << f for v in (x1, y1, x2, y2, x_min, y_min, x_max, y_max)),
+                                             True)
+        if res is None:
+            return None
+        half = 1 << (f - 1)
+        return tuple((v + half) >> f for v in res)
+
+    @staticmethod
+    def _clip(x1, y1, x2, y2, x_min, y_min, x_max, y_max, integer):
+        code = CohenSutherlandClipper.compute_code
+        one = 1 << IterativeMidpointClipper.FIXED_SHIFT if integer else 1
+        code1 = code(x1, y1, x_min, y_min, x_max, y_max)
+        code2 = code(x2, y2, x_min, y_min, x_max, y_max)
+
+        while True:
+            if code1 == 0 and code2 == 0:
+                return (x1, y1, x2, y2)
+            if code1 & code2:
+                return None
+
+            # Рухаємо зовнішній кінець до межі, яку він порушує
+            swapped = code1 == 0
+            if swapped:
+                x1, y1, x2, y2, code1, code2 = x2, y2, x1, y1, code2, code1
+            bit = code1 & -code1
+
+            # Двійковий пошук до точності в піксель: (ox, oy) - зовні межі, (ix, iy) - з внутрішнього боку
+            ox, oy, ix, iy = x1, y1, x2, y2
+            while abs(ix - ox) >= one or abs(iy - oy) >= one:
+                if integer:
+                    xm, ym = (ox + ix) >> 1, (oy + iy) >> 1
+                else:
+                    xm, ym = (ox + ix) / 2, (oy + iy) / 2
+                if code(xm, ym, x_min, y_min, x_max, y_max) & bit:
+                    ox, oy = xm, ym
+                else:
+                    ix, iy = xm, ym
+
+            x1, y1 = ix, iy
+            code1 = code(x1, y1, x_min, y_min, x_max, y_max)
+            if swapped:
+                x1, y1, x2, y2, code1, code2 = x2, y2, x1, y1, code2, code1
+
+    @staticmethod
+    def clip_batch(segments, bounds, integer=False):
+        seg = as_segments(segments)
+        n = len(seg)
+        x_min, y_min, x_max, y_max = as_bounds(bounds, n)
+        x1, y1, x2, y2 = seg.T.copy()
+        one = 1
+        if integer:
+            f = IterativeMidpointClipper.FIXED_SHIFT
+            one = 1 << f
+            x1, y1, x2, y2, x_min, y_min, x_max, y_max = (
+                v.astype(np.int64) << f for v in (x1, y1, x2, y2, x_min, y_min, x_max, y_max))
+        codes = CohenSutherlandClipper.compute_codes
+        code1 = codes(x1, y1, x_min, y_min, x_max, y_max)
+        code2 = codes(x2, y2, x_min, y_min, x_max, y_max)
+        visible = np.zeros(n, dtype=bool)
+        active = np.arange(n)
+
+        while active.size:
+            c1, c2 = code1[active], code2[active]
+            accept = (c1 == 0) & (c2 == 0)
+            visible[active[accept]] = True
+            active = active[~accept & ((c1 & c2) == 0)]
+            if not active.size:
+                break
+
+            c1, c2 = code1[active], code2[active]
+            first = c1 != 0
+            bit = np.where(first, c1 & -c1, c2 & -c2)
+            ox = np.where(first, x1[active], x2[active])
+            oy = np.where(first, y1[active], y2[active])
+            ix = np.where(first, x2[active], x1[active])
+            iy = np.where(first, y2[active], y1[active])
+            bx_min, by_min, bx_max, by_max = x_min[active], y_min[active], x_max[active], y_max[active]
+
+            search = np.arange(active.size)
+            while True:
+                search = search[(np.abs(ix[search] - ox[search]) >= one) | (np.abs(iy[search] - oy[search]) >= one)]
+                if not search.size:
+                    break
+                if integer:
+                    xm, ym = (ox[search] + ix[search]) >> 1, (oy[search] + iy[search]) >> 1
+                else:
+                    xm, ym = (ox[search] + ix[search]) / 2, (oy[search] + iy[search]) / 2
+                out = (codes(xm, ym, bx_min[search], by_min[search], bx_max[search], by_max[search])
+                       & bit[search]) != 0
+                ox[search[out]], oy[search[out]] = xm[out], ym[out]
+                ix[search[~out]], iy[search[~out]] = xm[~out], ym[~out]
+
+            i1, i2 = active[first], active[~first]
+            x1[i1], y1[i1] = ix[first], iy[first]
+            x2[i2], y2[i2] = ix[~first], iy[~first]
+            code1[i1] = codes(x1[i1], y1[i1], x_min[i1], y_min[i1], x_max[i1], y_max[i1])
+            code2[i2] = codes(x2[i2], y2[i2], x_min[i2], y_min[i2], x_max[i2], y_max[i2])
+
+        clipped = np.column_stack((x1, y1, x2, y2))
+        if integer:
+            clipped = (clipped + (one >> 1)) >> IterativeMidpointClipper.FIXED_SHIFT
+        clipped = clipped.astype(float)
+        clipped[~visible] = np.nan
+        return clipped, visible
+
+
+class LiangBarskyClipper:
+    @staticmethod
+    def clip(x1, y1, x2, y2, x_min, y_min, x_max, y_max):
+        dx, dy = x2 - x1, y2 - y1
+        t0, t1 = 0.0, 1.0
+        for p, q in ((-dx, x1 - x_min), (dx, x_max - x1), (-dy, y1 - y_min), (dy, y_max - y1)):
+            if p == 0:
+                # Відрізок паралельний межі і лежить зовні
+                if q < 0:
+                    return None
+                continue
+            r = q / p
+            if p < 0:
+                if r > t1:
+                    return None
+                if r > t0:
+                    t0 = r
+            else:
+                if r < t0:
+                    return None
+                if r < t1:
+                    t1 = r
+        return (x1 + t0 * dx, y1 + t0 * dy, x1 + t1 * dx, y1 + t1 * dy)
+
+    @staticmethod
+    def clip_batch(segments, bounds):
+        seg = as_segments(segments)
+        n = len(seg)
+        x_min, y_min, x_max, y_max = as_bounds(bounds, n)
+        x1, y1, x2, y2 = seg.T
+        dx, dy = x2 - x1, y2 - y1
+        t0, t1 = np.zeros(n), np.ones(n)
+        visible = np.ones(n, dtype=bool)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            for p, q in ((-dx, x1 - x_min), (dx, x_max - x1), (-dy, y1 - y_min), (dy, y_max - y1)):
+                visible &= ~((p == 0) & (q < 0))
+                r = q / p
+                entering, leaving = p < 0, p > 0
+                t0 = np.where(entering & (r > t0), r, t0)
+                t1 = np.where(leaving & (r < t1), r, t1)
+        visible &= t0 <= t1
+        clipped = np.column_stack((x1 + t0 * dx, y1 + t0 * dy, x1 + t1 * dx, y1 + t1 * dy))
+        clipped[~visible] = np.nan
+        return clipped, visible
+
+
+class CyrusBeckClipper:
+    @staticmethod
+    def edges(polygon):
+        # Ребра опуклого многокутника як (точка на ребрі, внутрішня нормаль) для будь-якого обходу
+        pts = np.asarray(polygon, dtype=float).reshape(-1, 2)
+        if len(pts) < 3:
+            raise ValueError("вікно Кіруса-Бека має містити щонайменше 3 вершини")
+        nxt = np.roll(pts, -1, axis=0)
+        area = np.sum(pts[:, 0] * nxt[:, 1] - nxt[:, 0] * pts[:, 1])
+        sign = 1.0 if area > 0 else -1.0
+        normals = sign * np.column_stack((pts[:, 1] - nxt[:, 1], nxt[:, 0] - pts[:, 0]))
+        return [(ax, ay, nx, ny) for (ax, ay), (nx, ny) in zip(pts.tolist(), normals.tolist())]
+
+    @staticmethod
+    def rectangle(x_min, y_min, x_max, y_max):
+        return [(x_min, y_min), (x_max, y_min), (x_max, y_max), (x_min, y_max)]
+
+    @staticmethod
+    def clip(x1, y1, x2, y2, x_min, y_min, x_max, y_max):
+        return CyrusBeckClipper.clip_polygon(x1, y1, x2, y2,
+                                             CyrusBeckClipper.rectangle(x_min, y_min, x_max, y_max))
+
+    @staticmethod
+    def clip_polygon(x1, y1, x2, y2, polygon):
+        dx, dy = x2 - x1, y2 - y1
+        t0, t1 = 0.0, 1.0
+        for ax, ay, nx, ny in CyrusBeckClipper.edges(polygon):
+            num = nx * (x1 - ax) + ny * (y1 - ay)
+            den = nx * dx + ny * dy
+            if den == 0:
+                if num < 0:
+                    return None
+                continue
+            t = -num / den
+            if den > 0:
+                t0 = max(t0, t)
+            else:
+                t1 = min(t1, t)
+            if t0 > t1:
+                return None
+        return (x1 + t0 * dx, y1 + t0 * dy, x1 + t1 * dx, y1 + t1 * dy)
+
+    @staticmethod
+    def clip_batch(segments, bounds):
+        seg = as_segments(segments)
+        x_min, y_min, x_max, y_max = as_bounds(bounds, len(seg))
+        # Ребра прямокутника з внутрішніми нормалями (як у edges), окремі для кожного рядка
+        pts = CyrusBeckClipper.rectangle(x_min, y_min, x_max, y_max)
+        sign = np.where((x_max - x_min) * (y_max - y_min) > 0, 1.0, -1.0)
+        edges = [(ax, ay, sign * (ay - by), sign * (bx - ax))
+                 for (ax, ay), (bx, by) in zip(pts, pts[1:] + pts[:1])]
+        return CyrusBeckClipper._clip_edges(seg, edges)
+
+    @staticmethod
+    def clip_polygon_batch(segments, polygon):
+        return CyrusBeckClipper._clip_edges(as_segments(segments), CyrusBeckClipper.edges(polygon))
+
+    @staticmethod
+    def _clip_edges(seg, edges):
+        n = len(seg)
+        x1, y1, x2, y2 = seg.T
+        dx, dy = x2 - x1, y2 - y1
+        t0, t1 = np.zeros(n), np.ones(n)
+        visible = np.ones(n, dtype=bool)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            for ax, ay, nx, ny in edges:
+                num = nx * (x1 - ax) + ny * (y1 - ay)
+                den = nx * dx + ny * dy
+                visible &= ~((den == 0) & (num < 0))
+                t = -num / den
+                t0 = np.where(den > 0, np.maximum(t0, t), t0)
+                t1 = np.where(den < 0, np.minimum(t1, t), t1)
+        visible &= t0 <= t1
+        clipped = np.column_stack((x1 + t0 * dx, y1 + t0 * dy, x1 + t1 * dx, y1 + t1 * dy))
+        clipped[~visible] = np.nan
+        return clipped, visible
+
+
+CLIPPERS = {
+    "simple": SimpleClipper,
+    "cohen-sutherland": CohenSutherlandClipper,
+    "midpoint": MidpointClipper,
+    "midpoint-iterative": IterativeMidpointClipper,
+    "liang-barsky": LiangBarskyClipper,
+    "cyrus-beck": CyrusBeckClipper,
+}
+
+
+# --- ПОТОКОВА ОБРОБКА ФАЙЛІВ ---
+SEGMENT_DTYPE = np.dtype("<f8")
+
+
+def detect_format(path):
+    if path.endswith(".csv") or path == "-":
+        return "csv"
+    if path.endswith(".npy"):
+        return "npy"
+    return "bin"
+
+
+def read_segments(path, fmt, chunk_size):
+    # Читає відрізки порціями по chunk_size рядків, не завантажуючи весь файл у пам'ять
+    if fmt == "npy":
+        data = np.load(path, mmap_mode="r")
+        data = data.reshape(-1, 4)
+        for start in range(0, len(data), chunk_size):
+            yield np.asarray(data[start:start + chunk_size], dtype=float)
+        return
+
+    if path == "-":
+        f = sys.stdin if fmt == "csv" else sys.stdin.buffer
+    else:
+        f = open(path, "r" if fmt == "csv" else "rb")
+    try:
+        while True:
+            if fmt == "csv":
+                lines = list(itertools.islice(f, chunk_size))
+                if not lines:
+                    break
+                chunk = np.loadtxt(lines, delimiter=",", ndmin=2)
+                if chunk.size == 0:
+                    continue
+            else:
+                raw = f.read(chunk_size * 4 * SEGMENT_DTYPE.itemsize)
+                if not raw:
+                    break
+                if len(raw) % (4 * SEGMENT_DTYPE.itemsize):
+                    raise ValueError(f"{path}: розмір файлу не кратний одному відрізку (4 x float64)")
+                chunk = np.frombuffer(raw, dtype=SEGMENT_DTYPE)
+            yield chunk.reshape(-1, 4)
+    finally:
+        if f not in (sys.stdin, sys.stdin.buffer):
+            f.close()
+
+
+def write_npy_header(f, rows):
+    # Заголовок .npy для масиву (rows, 4) float64. Кількість рядків наперед невідома, тому спершу
+    # пишеться заголовок з rows=0, а після останньої порції - справжній; numpy резервує місце
+    # під довгу розмірність, тож довжина заголовка однакова і дані не зсуваються
+    np.lib.format.write_array_header_1_0(f, {"descr": np.lib.format.dtype_to_descr(SEGMENT_DTYPE),
+                                             "fortran_order": False, "shape": (rows, 4)})
+
+
+def write_segments(f, segments, fmt):
+    if fmt == "csv":
+        np.savetxt(f, segments, delimiter=",", fmt="%.17g")
+    else:
+        f.write(np.ascontiguousarray(segments, dtype=SEGMENT_DTYPE).tobytes())
+
+
+def clip_stream(chunks, windows, clipper, keep_invisible=False):
+    # Відсікає кожну порцію і повертає видимі частини (або всі рядки з NaN для невидимих)
+    for chunk in chunks:
+        clipped, status, _, _ = clip_prioritized(chunk, windows, clipper)
+        if not keep_invisible:
+            clipped = clipped[status != STATUS_INVISIBLE]
+        yield clipped
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Відсікання відрізків прямокутними вікнами без графічного інтерфейсу")
+    parser.add_argument("input", help="файл з відрізками x1,y1,x2,y2 (.csv, .npy або сирі float64; '-' - stdin)")
+    parser.add_argument("output", help="файл для результату (.csv, .npy або сирі float64; '-' - stdout)")
+    parser.add_argument("-a", "--algorithm", choices=sorted(CLIPPERS), default="cohen-sutherland")
+    parser.add_argument("-w", "--window", nargs=4, type=float, action="append",
+                        metavar=("X_MIN", "Y_MIN", "X_MAX", "Y_MAX"),
+                        help="вікно відсікання; можна вказати кілька, пріоритет - у порядку появи")
+    parser.add_argument("--all-windows", action="store_true", help="використати всі вікна WINDOWS")
+    parser.add_argument("--input-format", choices=("csv", "npy", "bin"))
+    parser.add_argument("--output-format", choices=("csv", "npy", "bin"))
+    parser.add_argument("--chunk-size", type=int, default=65536)
+    parser.add_argument("--keep-invisible", action="store_true",
+                        help="зберігати порядок рядків, записуючи NaN для невидимих відрізків")
+    args = parser.parse_args(argv)
+
+    if args.window:
+        windows = [{"bounds": tuple(b), "priority": i} for i, b in enumerate(args.window)]
+    elif args.all_windows:
+        windows = WINDOWS
+    else:
+        windows = [WINDOWS[0]]
+
+    in_fmt = args.input_format or detect_format(args.input)
+    out_fmt = args.output_format or detect_format(args.output)
+    if out_fmt == "npy" and args.output == "-":
+        parser.error("формат npy потребує файлу: заголовок дописується після останньої порції")
+
+    chunks = read_segments(args.input, in_fmt, args.chunk_size)
+    if args.output == "-":
+        out = sys.stdout if out_fmt == "csv" else sys.stdout.buffer
+    else:
+        out = open(args.output, "w" if out_fmt == "csv" else "wb")
+    try:
+        rows = 0
+        if out_fmt == "npy":
+            write_npy_header(out, rows)
+        for clipped in clip_stream(chunks, windows, CLIPPERS[args.algorithm], args.keep_invisible):
+            write_segments(out, clipped, out_fmt)
+            rows += len(clipped)
+        if out_fmt == "npy":
+            out.seek(0)
+            write_npy_header(out, rows)
+    finally:
+        if out not in (sys.stdout, sys.stdout.buffer):
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
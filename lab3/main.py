@@ -2,20 +2,16 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 import random
 import time
+import numpy as np
 
-# --- ВІКНА ВІДСІКАННЯ З ПРІОРИТЕТАМИ ---
-WINDOWS = [
-    {"bounds": (50, 50, 250, 250), "priority": 1, "color": "#e74c3c", "name": "Вікно 1 (пріоритет 1)"},
-    {"bounds": (150, 100, 280, 200), "priority": 2, "color": "#3498db", "name": "Вікно 2 (пріоритет 2)"},
-    {"bounds": (80, 150, 220, 270), "priority": 3, "color": "#f39c12", "name": "Вікно 3 (пріоритет 3)"},
-]
+from clipping import (WINDOWS, STATUS_VISIBLE, STATUS_PARTIAL,
+                      SimpleClipper, CohenSutherlandClipper, MidpointClipper, clip_prioritized)
+
+# Алгоритм для кожного з трьох полотен
+CANVAS_CLIPPERS = (SimpleClipper, CohenSutherlandClipper, MidpointClipper)
+# Скільки відрізків малюється за один виклик after(), щоб інтерфейс лишався чутливим
+RENDER_CHUNK = 300
 
-# Коди для алгоритму Коена-Сазерленда
-INSIDE = 0  # 0000
-LEFT   = 1  # 0001
-RIGHT  = 2  # 0010
-BOTTOM = 4  # 0100
-TOP    = 8  # 1000
 
 class ClipperApp:
     def __init__(self, root):
@@ -33,6 +29,8 @@ class ClipperApp:
         self.max_random_lines = tk.IntVar(value=5)
         self.animation_speed = tk.IntVar(value=500)
         self.use_multiple_windows = tk.BooleanVar(value=False)
+        self.render_job = None      # запланована порція малювання (after)
+        self.rendered_count = 0     # скільки відрізків уже намальовано
         
         self.setup_ui()
 
@@ -72,10 +70,10 @@ class ClipperApp:
                      "selectcolor": "#34495e", "activebackground": "#2c3e50"}
         
         tk.Checkbutton(settings_frame, text="Показувати оригінал", 
-                      variable=self.show_original, command=self.update_display, **chk_style).pack(side=tk.LEFT, padx=10)
+                      variable=self.show_original, command=self.apply_visibility, **chk_style).pack(side=tk.LEFT, padx=10)
         
         tk.Checkbutton(settings_frame, text="Показувати вікна", 
-                      variable=self.show_windows, command=self.update_display, **chk_style).pack(side=tk.LEFT, padx=10)
+                      variable=self.show_windows, command=self.apply_visibility, **chk_style).pack(side=tk.LEFT, padx=10)
         
         # tk.Checkbutton(settings_frame, text="Показувати кроки", 
         #               variable=self.show_steps, **chk_style).pack(side=tk.LEFT, padx=10)
@@ -89,7 +87,7 @@ class ClipperApp:
         
         tk.Label(slider_frame, text="Відрізків:", font=("Segoe UI", 9), 
                 bg="#2c3e50", fg="white").pack(side=tk.LEFT, padx=5)
-        tk.Scale(slider_frame, from_=1, to=20, orient=tk.HORIZONTAL,
+        tk.Scale(slider_frame, from_=1, to=5000, orient=tk.HORIZONTAL,
                 variable=self.max_random_lines, length=150,
                 bg="#34495e", fg="white", highlightthickness=0).pack(side=tk.LEFT, padx=5)
         
@@ -176,7 +174,9 @@ class ClipperApp:
                 
                 self.current_line_start = None
                 self.status_bar.config(text=f"Відрізок додано | Всього: {len(self.user_lines)}")
-                self.update_display()
+                # Клипуємо і малюємо лише новий відрізок (або його підхопить поточне порційне малювання)
+                if self.render_job is None:
+                    self.render_pending()
 
     def on_canvas_motion(self, event):
         if not self.drawing_mode or self.current_line_start is None:
@@ -212,183 +212,89 @@ class ClipperApp:
         self.update_display()
 
     def update_display(self):
+        # Повне перемалювання: потрібне лише коли змінюється набір вікон або всі відрізки
+        self.cancel_render()
         for canvas in self.canvases:
             canvas.delete("all")
             
-            # Малюємо вікна відсікання
-            if self.show_windows.get():
-                if self.use_multiple_windows.get():
-                    for window in WINDOWS:
-                        x1, y1, x2, y2 = window["bounds"]
-                        canvas.create_rectangle(x1, y1, x2, y2, 
-                                              outline=window["color"], width=2, dash=(5, 3))
-                        canvas.create_text(x1+5, y1+5, text=f"P{window['priority']}", 
-                                         anchor="nw", fill=window["color"], 
-                                         font=("Segoe UI", 8, "bold"))
-                else:
-                    x1, y1, x2, y2 = WINDOWS[0]["bounds"]
-                    canvas.create_rectangle(x1, y1, x2, y2, 
-                                          outline=WINDOWS[0]["color"], width=2, dash=(5, 3))
-        
-        if not self.user_lines:
-            return
-        
-        # Обробка для кожного алгоритму
-        self.process_lines(self.canvases[0], self.user_lines, SimpleClipper.clip)
-        self.process_lines(self.canvases[1], self.user_lines, CohenSutherlandClipper.clip)
-        self.process_lines(self.canvases[2], self.user_lines, MidpointClipper.clip)
-
-    def process_lines(self, canvas, lines, clip_func):
-        visible_count = 0
-        invisible_count = 0
-        partial_count = 0
-        
-        windows = WINDOWS if self.use_multiple_windows.get() else [WINDOWS[0]]
-        
-        for (p1, p2) in lines:
-            # Малюємо оригінал
-            if self.show_original.get():
-                canvas.create_line(p1[0], p1[1], p2[0], p2[1], 
-                                 fill="#bdc3c7", width=1, dash=(2, 2))
-            
-            # Обробка з пріоритетом вікон
-            clipped = False
-            for window in sorted(windows, key=lambda w: w["priority"]):
-                x_min, y_min, x_max, y_max = window["bounds"]
-                
-                # Перша ітерація: перевірка повної видимості
-                if (x_min <= p1[0] <= x_max and y_min <= p1[1] <= y_max and
-                    x_min <= p2[0] <= x_max and y_min <= p2[1] <= y_max):
-                    # Повністю видимий
-                    canvas.create_line(p1[0], p1[1], p2[0], p2[1], 
-                                     fill="#27ae60", width=3)
-                    for x, y in [p1, p2]:
-                        canvas.create_oval(x-3, y-3, x+3, y+3, 
-                                         fill="#2ecc71", outline="#27ae60")
-                    visible_count += 1
-                    clipped = True
-                    break
-                
-                # Перевірка повної невидимості
-                if ((p1[0] < x_min and p2[0] < x_min) or 
-                    (p1[0] > x_max and p2[0] > x_max) or
-                    (p1[1] < y_min and p2[1] < y_min) or 
-                    (p1[1] > y_max and p2[1] > y_max)):
-                    # Повністю невидимий (показуємо червоним якщо показуються кроки)
-                    if self.show_steps.get():
-                        canvas.create_line(p1[0], p1[1], p2[0], p2[1], 
-                                         fill="#e74c3c", width=1, dash=(1, 3))
-                    continue
-                
-                # Часткова видимість - застосовуємо алгоритм відсікання
-                result = clip_func(p1[0], p1[1], p2[0], p2[1], 
-                                  x_min, y_min, x_max, y_max)
-                
-                if result:
-                    rx1, ry1, rx2, ry2 = result
-                    canvas.create_line(rx1, ry1, rx2, ry2, 
-                                     fill="#f39c12", width=3)
-                    for x, y in [(rx1, ry1), (rx2, ry2)]:
-                        canvas.create_oval(x-3, y-3, x+3, y+3, 
-                                         fill="#f39c12", outline="#e67e22")
-                    partial_count += 1
-                    clipped = True
-                    break
-            
-            if not clipped:
-                invisible_count += 1
+            # Малюємо вікна відсікання (обидва набори, видимість керується тегами)
+            for window in WINDOWS:
+                x1, y1, x2, y2 = window["bounds"]
+                tags = ("windows", "windows_multi", "windows_single") if window is WINDOWS[0] else ("windows", "windows_multi")
+                canvas.create_rectangle(x1, y1, x2, y2, 
+                                      outline=window["color"], width=2, dash=(5, 3), tags=tags)
+                canvas.create_text(x1+5, y1+5, text=f"P{window['priority']}", 
+                                 anchor="nw", fill=window["color"], 
+                                 font=("Segoe UI", 8, "bold"), tags=("windows", "windows_multi"))
+        
+        self.apply_visibility()
+        self.rendered_count = 0
+        self.render_pending()
 
+    def apply_visibility(self):
+        # Перемикачі лише ховають або показують шари з відповідними тегами
+        multi = self.use_multiple_windows.get()
+        show_windows = self.show_windows.get()
+        for canvas in self.canvases:
+            canvas.itemconfigure("windows", state=tk.HIDDEN)
+            if show_windows:
+                canvas.itemconfigure("windows_multi" if multi else "windows_single", state=tk.NORMAL)
+            canvas.itemconfigure("original", state=tk.NORMAL if self.show_original.get() else tk.HIDDEN)
 
-# --- АЛГОРИТМИ ---
-class SimpleClipper:
-    @staticmethod
-    def clip(x1, y1, x2, y2, x_min, y_min, x_max, y_max):
-        if (x_min <= x1 <= x_max and y_min <= y1 <= y_max and
-            x_min <= x2 <= x_max and y_min <= y2 <= y_max):
-            return (x1, y1, x2, y2)
-        return CohenSutherlandClipper.clip(x1, y1, x2, y2, x_min, y_min, x_max, y_max)
-
-
-class CohenSutherlandClipper:
-    @staticmethod
-    def compute_code(x, y, x_min, y_min, x_max, y_max):
-        code = INSIDE
-        if x < x_min: code |= LEFT
-        elif x > x_max: code |= RIGHT
-        if y < y_min: code |= BOTTOM
-        elif y > y_max: code |= TOP
-        return code
-
-    @staticmethod
-    def clip(x1, y1, x2, y2, x_min, y_min, x_max, y_max):
-        code1 = CohenSutherlandClipper.compute_code(x1, y1, x_min, y_min, x_max, y_max)
-        code2 = CohenSutherlandClipper.compute_code(x2, y2, x_min, y_min, x_max, y_max)
-        accept = False
-
-        while True:
-            if code1 == 0 and code2 == 0:
-                accept = True
-                break
-            elif (code1 & code2) != 0:
-                break
-            else:
-                code_out = code1 if code1 != 0 else code2
-
-                if code_out & TOP:
-                    x = x1 + (x2 - x1) * (y_max - y1) / (y2 - y1)
-                    y = y_max
-                elif code_out & BOTTOM:
-                    x = x1 + (x2 - x1) * (y_min - y1) / (y2 - y1)
-                    y = y_min
-                elif code_out & RIGHT:
-                    y = y1 + (y2 - y1) * (x_max - x1) / (x2 - x1)
-                    x = x_max
-                elif code_out & LEFT:
-                    y = y1 + (y2 - y1) * (x_min - x1) / (x2 - x1)
-                    x = x_min
+    def cancel_render(self):
+        if self.render_job is not None:
+            self.root.after_cancel(self.render_job)
+            self.render_job = None
 
-                if code_out == code1:
-                    x1, y1 = x, y
-                    code1 = CohenSutherlandClipper.compute_code(x1, y1, x_min, y_min, x_max, y_max)
-                else:
-                    x2, y2 = x, y
-                    code2 = CohenSutherlandClipper.compute_code(x2, y2, x_min, y_min, x_max, y_max)
+    def render_pending(self):
+        # Малює ще не намальовані відрізки порціями по RENDER_CHUNK, віддаючи керування
+        # циклу подій між порціями, щоб інтерфейс не зависав на великих сценах
+        self.render_job = None
+        start = self.rendered_count
+        lines = self.user_lines[start:start + RENDER_CHUNK]
+        if not lines:
+            return
+        
+        # Обробка для кожного алгоритму
+        for canvas, clipper in zip(self.canvases, CANVAS_CLIPPERS):
+            self.process_lines(canvas, lines, clipper)
+        self.rendered_count = start + len(lines)
 
-        if accept:
-            return (x1, y1, x2, y2)
-        return None
+        if self.rendered_count < len(self.user_lines):
+            self.render_job = self.root.after(1, self.render_pending)
 
+    def process_lines(self, canvas, lines, clipper):
+        windows = WINDOWS if self.use_multiple_windows.get() else [WINDOWS[0]]
 
-class MidpointClipper:
-    @staticmethod
-    def clip(x1, y1, x2, y2, x_min, y_min, x_max, y_max):
-        def is_visible(x, y):
-            return x_min <= x <= x_max and y_min <= y <= y_max
+        segments = np.array([(p1[0], p1[1], p2[0], p2[1]) for (p1, p2) in lines], dtype=float)
+        clipped, status, _, rejected = clip_prioritized(segments, windows, clipper)
 
-        if is_visible(x1, y1) and is_visible(x2, y2):
-            return (x1, y1, x2, y2)
-            
-        if ((x1 < x_min and x2 < x_min) or (x1 > x_max and x2 > x_max) or
-            (y1 < y_min and y2 < y_min) or (y1 > y_max and y2 > y_max)):
-            return None
+        original_state = tk.NORMAL if self.show_original.get() else tk.HIDDEN
+        for i, (p1, p2) in enumerate(lines):
+            # Малюємо оригінал
+            canvas.create_line(p1[0], p1[1], p2[0], p2[1], 
+                             fill="#bdc3c7", width=1, dash=(2, 2),
+                             state=original_state, tags=("segment", "original"))
 
-        if abs(x1 - x2) < 1 and abs(y1 - y2) < 1:
-            if is_visible(x1, y1): 
-                return (x1, y1, x1, y1)
-            return None
+            # Повністю невидимий хоча б для одного вікна (показуємо червоним якщо показуються кроки)
+            if rejected[i] and self.show_steps.get():
+                canvas.create_line(p1[0], p1[1], p2[0], p2[1], 
+                                 fill="#e74c3c", width=1, dash=(1, 3), tags=("segment", "steps"))
 
-        xm, ym = (x1 + x2) / 2, (y1 + y2) / 2
-        
-        res1 = MidpointClipper.clip(x1, y1, xm, ym, x_min, y_min, x_max, y_max)
-        res2 = MidpointClipper.clip(xm, ym, x2, y2, x_min, y_min, x_max, y_max)
-        
-        if res1 and res2:
-            return (res1[0], res1[1], res2[2], res2[3])
-        elif res1:
-            return res1
-        elif res2:
-            return res2
-        return None
+            if status[i] == STATUS_VISIBLE:
+                # Повністю видимий
+                canvas.create_line(p1[0], p1[1], p2[0], p2[1], 
+                                 fill="#27ae60", width=3, tags=("segment", "visible"))
+                for x, y in [p1, p2]:
+                    canvas.create_oval(x-3, y-3, x+3, y+3, 
+                                     fill="#2ecc71", outline="#27ae60", tags=("segment", "visible"))
+            elif status[i] == STATUS_PARTIAL:
+                rx1, ry1, rx2, ry2 = clipped[i]
+                canvas.create_line(rx1, ry1, rx2, ry2, 
+                                 fill="#f39c12", width=3, tags=("segment", "partial"))
+                for x, y in [(rx1, ry1), (rx2, ry2)]:
+                    canvas.create_oval(x-3, y-3, x+3, y+3, 
+                                     fill="#f39c12", outline="#e67e22", tags=("segment", "partial"))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,102 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+
+from clipping import CohenSutherlandClipper, as_segments, clip_prioritized
+
+# Вихідні масиви clip_prioritized: (назва, dtype, кількість стовпців)
+OUTPUTS = (
+    ("clipped", np.float64, 4),
+    ("status", np.int8, 1),
+    ("window_idx", np.intp, 1),
+    ("rejected", np.bool_, 1),
+)
+
+
+def _attach(name):
+    # Дочірній процес лише під'єднується до пам'яті; звільняє її батьківський процес.
+    # До Python 3.13 блок повторно реєструється у спільному resource_tracker, що нешкідливо
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+
+def _view(shm, n, dtype, cols):
+    shape = (n, cols) if cols > 1 else (n,)
+    return np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+
+def _clip_chunk(names, n, start, stop, windows, clipper):
+    # Робота одного процесу: читає порцію зі спільної пам'яті і пише результат туди ж
+    blocks = [_attach(name) for name in names]
+    try:
+        segments = _view(blocks[0], n, np.float64, 4)
+        outputs = [_view(shm, n, dtype, cols) for shm, (_, dtype, cols) in zip(blocks[1:], OUTPUTS)]
+        results = clip_prioritized(segments[start:stop], windows, clipper)
+        for out, res in zip(outputs, results):
+            out[start:stop] = res
+        del segments, outputs
+    finally:
+        for shm in blocks:
+            shm.close()
+    return stop - start
+
+
+class ParallelClipper:
+    # Пул процесів, що відсікає великі масиви відрізків порціями. Масиви не серіалізуються:
+    # вхід і результати лежать у спільній пам'яті, процесам передаються лише назви блоків і межі порцій
+    def __init__(self, workers=None, chunk_size=262144):
+        if chunk_size < 1:
+            # Інакше порції нульового розміру не покривають вхід, а range() падає з незрозумілою помилкою
+            raise ValueError(f"chunk_size - кількість відрізків у порції, має бути щонайменше 1, отримано {chunk_size}")
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def clip(self, segments, windows, clipper=CohenSutherlandClipper):
+        # Повертає те саме, що clip_prioritized, у порядку вхідних відрізків
+        seg = as_segments(segments)
+        n = len(seg)
+        if self.workers == 1 or n <= self.chunk_size:
+            return clip_prioritized(seg, windows, clipper)
+
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+
+        sizes = [seg.nbytes] + [n * cols * np.dtype(dtype).itemsize for _, dtype, cols in OUTPUTS]
+        blocks = []
+        try:
+            for size in sizes:
+                blocks.append(shared_memory.SharedMemory(create=True, size=max(size, 1)))
+            _view(blocks[0], n, np.float64, 4)[:] = seg
+            names = [shm.name for shm in blocks]
+
+            futures = [self._pool.submit(_clip_chunk, names, n, start, min(start + self.chunk_size, n),
+                                         windows, clipper)
+                       for start in range(0, n, self.chunk_size)]
+            for future in futures:
+                future.result()
+
+            return tuple(_view(shm, n, dtype, cols).copy() for shm, (_, dtype, cols) in zip(blocks[1:], OUTPUTS))
+        finally:
+            for shm in blocks:
+                shm.close()
+                shm.unlink()
+
+
+def clip_parallel(segments, windows, clipper=CohenSutherlandClipper, workers=None, chunk_size=262144):
+    with ParallelClipper(workers, chunk_size) as pool:
+        return pool.clip(segments, windows, clipper)